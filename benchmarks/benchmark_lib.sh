@@ -104,6 +104,10 @@ wait_for_server_ready() {
 #   --max-concurrency: Max concurrency
 #   --result-filename: Result filename without extension
 #   --result-dir: Result directory
+#   --conc-list: Space-separated concurrencies to benchmark one after another against the same
+#                server (optional). When it holds more than one value, --max-concurrency must be
+#                the largest, --num-prompts is scaled down proportionally for each concurrency,
+#                and results go to <result-filename>_conc<conc>.json
 run_benchmark_serving() {
     set +x
     local model=""
@@ -116,6 +120,7 @@ run_benchmark_serving() {
     local max_concurrency=""
     local result_filename=""
     local result_dir=""
+    local conc_list=""
 
     # Parse arguments
     while [[ $# -gt 0 ]]; do
@@ -160,6 +165,10 @@ run_benchmark_serving() {
                 result_dir="$2"
                 shift 2
                 ;;
+            --conc-list)
+                conc_list="$2"
+                shift 2
+                ;;
             *)
                 echo "Unknown parameter: $1"
                 return 1
@@ -213,23 +222,36 @@ run_benchmark_serving() {
     local BENCH_SERVING_DIR=$(mktemp -d /tmp/bmk-XXXXXX)
     git clone https://github.com/kimbochen/bench_serving.git "$BENCH_SERVING_DIR"
 
-    # Run benchmark
-    set -x
-    python3 "$BENCH_SERVING_DIR/benchmark_serving.py" \
-        --model "$model" \
-        --backend "$backend" \
-        --base-url "http://0.0.0.0:$port" \
-        --dataset-name random \
-        --random-input-len "$input_len" \
-        --random-output-len "$output_len" \
-        --random-range-ratio "$random_range_ratio" \
-        --num-prompts "$num_prompts" \
-        --max-concurrency "$max_concurrency" \
-        --request-rate inf \
-        --ignore-eos \
-        --save-result \
-        --percentile-metrics 'ttft,tpot,itl,e2el' \
-        --result-dir "$result_dir" \
-        --result-filename "$result_filename.json"
-    set +x
+    local concs=($conc_list)
+    if [[ ${#concs[@]} -le 1 ]]; then
+        concs=("$max_concurrency")
+    fi
+
+    # Run benchmark for each concurrency
+    local conc
+    for conc in "${concs[@]}"; do
+        local conc_result_filename="$result_filename"
+        if [[ ${#concs[@]} -gt 1 ]]; then
+            conc_result_filename="${result_filename}_conc${conc}"
+        fi
+
+        set -x
+        python3 "$BENCH_SERVING_DIR/benchmark_serving.py" \
+            --model "$model" \
+            --backend "$backend" \
+            --base-url "http://0.0.0.0:$port" \
+            --dataset-name random \
+            --random-input-len "$input_len" \
+            --random-output-len "$output_len" \
+            --random-range-ratio "$random_range_ratio" \
+            --num-prompts "$(( num_prompts * conc / max_concurrency ))" \
+            --max-concurrency "$conc" \
+            --request-rate inf \
+            --ignore-eos \
+            --save-result \
+            --percentile-metrics 'ttft,tpot,itl,e2el' \
+            --result-dir "$result_dir" \
+            --result-filename "$conc_result_filename.json"
+        set +x
+    done
 }
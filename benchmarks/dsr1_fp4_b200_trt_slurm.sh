@@ -3,7 +3,7 @@
 # === Required Env Vars ===
 # MODEL
 # TP
-# CONC
+# CONC (server settings derived from it are mirrored in utils/matrix_logic/server_settings.py)
 # ISL
 # OSL
 # MAX_MODEL_LEN
@@ -114,5 +114,6 @@ run_benchmark_serving \
     --random-range-ratio "$RANDOM_RANGE_RATIO" \
     --num-prompts $(( $CONC * 10 )) \
     --max-concurrency "$CONC" \
+    --conc-list "$CONC_LIST" \
     --result-filename "$RESULT_FILENAME" \
     --result-dir /workspace/
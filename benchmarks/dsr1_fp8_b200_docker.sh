@@ -4,7 +4,7 @@
 # MODEL
 # PORT
 # TP
-# CONC
+# CONC (server settings derived from it are mirrored in utils/matrix_logic/server_settings.py)
 # ISL
 # OSL
 # RANDOM_RANGE_RATIO
@@ -59,5 +59,6 @@ run_benchmark_serving \
     --random-range-ratio "$RANDOM_RANGE_RATIO" \
     --num-prompts "$NUM_PROMPTS" \
     --max-concurrency "$CONC" \
+    --conc-list "$CONC_LIST" \
     --result-filename "$RESULT_FILENAME" \
     --result-dir /workspace/
\ No newline at end of file
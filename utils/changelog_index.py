@@ -0,0 +1,174 @@
+"""Index linking benchmark results to the changelog entries whose sweeps produced them.
+
+process_changelog.py records the config key and pr-link each job was run for in the changelog
+metadata, keyed by the input hash that the job's results carry (see job_inputs.py). `build`
+joins the results of a run-sweep.yml run with its metadata and appends them to the index, and
+`query` shows what the matching runs changed, as deltas against the previous indexed run of the
+same config key:
+
+    python3 utils/changelog_index.py build --index changelog_index.json \\
+        --metadata changelog_metadata.json --results agg_bmk.json
+    python3 utils/changelog_index.py query --index changelog_index.json \\
+        --pr 159 --config-key gptoss-fp4-h200-vllm
+
+The index is a JSON list of records in run order, each holding head_ref, base_ref, pr_link,
+config_key and the result itself.
+"""
+import argparse
+import json
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import NamedTuple
+
+from summarize import load_results, summarize, summarize_deltas
+
+
+class RunComparison(NamedTuple):
+    head_ref: str
+    pr_link: str
+    config_key: str
+    results: list
+    # Results of the previous indexed run of the same config key, empty for its first run
+    baseline_results: list
+
+
+def link_results(metadata, results):
+    """Index records of the results of one sweep.
+
+    Results reused from the result cache are not indexed: their input hash maps to the job of
+    this sweep that they stood in for, but they were measured by the earlier sweep that ran it,
+    which already indexed them.
+
+    Args:
+        metadata: Changelog metadata of the sweep, as written by process_changelog.py.
+        results: Results of the sweep.
+
+    Returns:
+        Tuple of (records, unlinked, reused), where unlinked are the results without an input
+        hash of a job of the sweep and reused are those taken from the result cache.
+    """
+    origins = metadata.get('job_origins', {})
+    cached = set(metadata.get('cached_input_hashes', ()))
+    records, unlinked, reused = [], [], []
+    for result in results:
+        if result.get('input_hash') in cached:
+            reused.append(result)
+            continue
+        origin = origins.get(result.get('input_hash'))
+        if origin is None:
+            unlinked.append(result)
+            continue
+        records.append({
+            'head_ref': metadata['head_ref'],
+            'base_ref': metadata['base_ref'],
+            'pr_link': origin['pr-link'],
+            'config_key': origin['config-key'],
+            'result': result,
+        })
+    return records, unlinked, reused
+
+
+def update_index(index, records):
+    """Append records to the index, replacing those of an earlier run of the same head_ref and config key."""
+    rerun = {(r['head_ref'], r['config_key']) for r in records}
+    return [r for r in index if (r['head_ref'], r['config_key']) not in rerun] + records
+
+
+def matches_pr(pr_link, pr):
+    """Whether a pr-link refers to pr, given as a PR number or a full link."""
+    pr = str(pr).rstrip('/')
+    return pr_link.rstrip('/') == pr or pr_link.rstrip('/').endswith(f"/pull/{pr}")
+
+
+def query_index(index, pr=None, config_key=None):
+    """Runs of the index matching a PR and a config key pattern, each with its baseline.
+
+    A run is all results of one config key at one head_ref. Its baseline is the previous run of
+    the same config key in the index, so the deltas show what the change of the run did.
+
+    Returns:
+        List of RunComparison, in index order.
+    """
+    runs = {}
+    for record in index:
+        runs.setdefault((record['head_ref'], record['config_key']), []).append(record)
+
+    comparisons = []
+    previous = {}
+    for (head_ref, key), records in runs.items():
+        results = [record['result'] for record in records]
+        pr_link = records[0]['pr_link']
+        if (pr is None or matches_pr(pr_link, pr)) and (config_key is None or fnmatchcase(key, config_key)):
+            comparisons.append(RunComparison(head_ref, pr_link, key, results, previous.get(key, [])))
+        previous[key] = results
+    return comparisons
+
+
+def load_index(index_path):
+    """Load an index, or an empty one if the file doesn't exist."""
+    if not Path(index_path).exists():
+        return []
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def build(args):
+    with open(args.metadata) as f:
+        metadata = json.load(f)
+    records, unlinked, reused = link_results(metadata, load_results(args.results))
+    index = update_index(load_index(args.index), records)
+    with open(args.index, 'w') as f:
+        json.dump(index, f, indent=2)
+
+    config_keys = {record['config_key'] for record in records}
+    print(f"Indexed {len(records)} result(s) of {len(config_keys)} config key(s) at {metadata['head_ref']}",
+          file=sys.stderr)
+    if reused:
+        print(f"Skipped {len(reused)} result(s) reused from earlier sweeps, which indexed them",
+              file=sys.stderr)
+    if unlinked:
+        print(f"Warning: {len(unlinked)} result(s) have no input hash of a job of this sweep and were not indexed",
+              file=sys.stderr)
+
+
+def query(args):
+    comparisons = query_index(load_index(args.index), args.pr, args.config_key)
+    if not comparisons:
+        print("No indexed runs match the query.", file=sys.stderr)
+        sys.exit(1)
+
+    for comparison in comparisons:
+        sys.stdout.write(f"# {comparison.config_key} at {comparison.head_ref} ({comparison.pr_link})\n\n")
+        if comparison.baseline_results:
+            summarize_deltas(comparison.results, comparison.baseline_results, sys.stdout)
+        else:
+            sys.stdout.write("No earlier run of this config key is indexed.\n\n")
+            summarize(comparison.results, sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Link benchmark results to the changelog entries that produced them')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Add the results of a sweep to the index')
+    build_parser.add_argument('--index', required=True, help='Index JSON to update (created if missing)')
+    build_parser.add_argument('--metadata', required=True,
+                              help='Changelog metadata JSON of the sweep, as uploaded by run-sweep.yml')
+    build_parser.add_argument('--results', required=True,
+                              help='Results directory or aggregated results JSON of the sweep')
+    build_parser.set_defaults(func=build)
+
+    query_parser = subparsers.add_parser(
+        'query', help='Show the changes of matching runs against the previous run of the same config key')
+    query_parser.add_argument('--index', required=True, help='Index JSON to query')
+    query_parser.add_argument('--pr', help='PR number or pr-link of the changelog entry (e.g., 159)')
+    query_parser.add_argument('--config-key', help='Config key, wildcards allowed (e.g., gptoss-fp4-*-vllm)')
+    query_parser.set_defaults(func=query)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,7 +10,11 @@ agg_results = []
 for result_path in results_dir.rglob(f'*.json'):
     with open(result_path) as f:
         result = json.load(f)
-    agg_results.append(result)
+    # Aggregated files, e.g. the cached results reused by process_changelog.py, hold a list of results
+    if isinstance(result, list):
+        agg_results.extend(result)
+    else:
+        agg_results.append(result)
 
 with open(f'agg_{exp_name}.json', 'w') as f:
     json.dump(agg_results, f, indent=2)
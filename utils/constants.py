@@ -1,4 +1,5 @@
 MASTER_CONFIGS = [".github/configs/amd-master.yaml",
                   ".github/configs/nvidia-master.yaml"]
 RUNNER_CONFIG = ".github/configs/runners.yaml"
+SEQ_LEN_PROFILES = ".github/configs/seq-len-profiles.yaml"
 GENERATE_SWEEPS_PY_SCRIPT = "utils/matrix_logic/generate_sweep_configs.py"
\ No newline at end of file
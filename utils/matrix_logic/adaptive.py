@@ -0,0 +1,123 @@
+"""Adaptive concurrency search for single-node sweeps.
+
+Instead of running every value of the conc-start..conc-end ladder, an adaptive sweep first runs a
+coarse subset of the ladder (coarse_conc_values), then repeatedly refines between measured points
+(refine_conc_values) until the throughput curve has plateaued or latency has exceeded the SLO
+everywhere that is left unmeasured. Series that the results don't cover at all, e.g. of configs
+added since the coarse pass, start over with their coarse pass.
+"""
+import json
+from pathlib import Path
+
+# Minimum relative throughput gain between two measured concurrencies for the interval between
+# them to be refined
+DEFAULT_PLATEAU_THRESHOLD = 0.05
+
+
+def coarse_conc_values(conc_values: list, stride: int) -> list:
+    """Every stride-th value of a concurrency ladder, always including the last one."""
+    if stride < 1:
+        raise ValueError(f"Adaptive stride must be at least 1, got {stride}.")
+    coarse = conc_values[::stride]
+    if conc_values and coarse[-1] != conc_values[-1]:
+        coarse.append(conc_values[-1])
+    return coarse
+
+
+def sweep_point_key(model_prefix, precision, framework, runner, isl, osl, tp, ep, dp_attn, spec_decoding):
+    """Identify one concurrency series: everything about a single-node job except conc."""
+    return (model_prefix, precision, framework, runner, int(isl), int(osl), int(tp), int(ep),
+            str(dp_attn).lower() == 'true', spec_decoding)
+
+
+def result_point_key(result: dict):
+    """sweep_point_key of a single-node result JSON as written by process_result.py."""
+    return sweep_point_key(
+        result['infmax_model_prefix'], result['precision'], result['framework'], result['hw'],
+        result['isl'], result['osl'], result['tp'], result['ep'], result['dp_attention'],
+        result.get('spec_decoding', 'none'),
+    )
+
+
+def iter_results(path):
+    """Yield results from a results directory or an aggregated results JSON."""
+    path = Path(path)
+    files = sorted(path.rglob('*.json')) if path.is_dir() else [path]
+    for result_file in files:
+        with open(result_file) as f:
+            data = json.load(f)
+        yield from data if isinstance(data, list) else [data]
+
+
+def iter_single_node_results(path):
+    """Yield single-node results from a results directory or an aggregated results JSON."""
+    return (result for result in iter_results(path) if not result.get('is_multinode'))
+
+
+def load_measurements(path: str) -> dict:
+    """Load single-node results from a results directory or an aggregated results JSON.
+
+    Returns:
+        Dict mapping sweep_point_key to a dict of conc -> result.
+    """
+    measurements = {}
+    for result in iter_single_node_results(path):
+        measurements.setdefault(result_point_key(result), {})[int(result['conc'])] = result
+    if not measurements:
+        raise ValueError(f"No results found in '{path}'.")
+    return measurements
+
+
+def meets_slo(result: dict, min_intvty=None, max_ttft=None) -> bool:
+    """Whether a result meets the latency bounds; max_ttft is in ms, results store seconds."""
+    if min_intvty is not None and result['median_intvty'] < min_intvty:
+        return False
+    if max_ttft is not None and result['median_ttft'] * 1000 > max_ttft:
+        return False
+    return True
+
+
+def refine_conc_values(conc_values: list, measured: dict,
+                       plateau_threshold: float = DEFAULT_PLATEAU_THRESHOLD,
+                       min_intvty=None, max_ttft=None) -> list:
+    """Pick the next concurrencies to run for one series.
+
+    For every pair of adjacent measured values of the ladder with unmeasured values in between,
+    the middle one is scheduled unless
+      - the lower end already misses the SLO (latency only grows with concurrency), or
+      - throughput gained less than plateau_threshold (relative) across the interval, in which case
+        points in between are dominated by the lower end for all practical purposes.
+
+    Args:
+        conc_values: Full concurrency ladder of the search-space entry.
+        measured: Dict of conc -> result for the concurrencies that have been run.
+
+    Returns:
+        Concurrencies to run next, ascending. Empty once the search has converged.
+    """
+    measured_idx = [i for i, conc in enumerate(conc_values) if conc in measured]
+    refine = []
+    for lo, hi in zip(measured_idx, measured_idx[1:]):
+        if hi - lo < 2:
+            continue
+        low, high = measured[conc_values[lo]], measured[conc_values[hi]]
+        if not meets_slo(low, min_intvty, max_ttft):
+            continue
+        if low['tput_per_gpu'] <= 0 or high['tput_per_gpu'] / low['tput_per_gpu'] - 1 < plateau_threshold:
+            continue
+        refine.append(conc_values[(lo + hi) // 2])
+    return refine
+
+
+def format_unmeasured_report(series: list, stride=None) -> str:
+    """Summarize the series a refinement pass found no measurements for.
+
+    Args:
+        series: (config key, isl, osl, tp) tuples.
+        stride: Adaptive stride of their coarse pass, or None if they run their full ladder.
+    """
+    fallback = f"their coarse pass (stride {stride})" if stride is not None else "their full ladder"
+    lines = [f"No measurements for {len(series)} series, running {fallback}"]
+    for key, isl, osl, tp in series:
+        lines.append(f"  {key} isl={isl} osl={osl} tp={tp}")
+    return "\n".join(lines)
@@ -0,0 +1,55 @@
+"""Time the matrix validation modes of generate_sweep_configs.py on the real master configs.
+
+Generates the sweep of every config key with per-entry validation, with bulk validation of the
+whole matrix, and without validation, and prints the best time of each:
+
+    python3 utils/matrix_logic/bench_validation.py [--copies 100]
+
+--copies repeats the generated matrix to time larger matrices. Not part of the unit tests, as
+the timings depend on the machine.
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# Ensure sibling modules are importable regardless of how script is invoked
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_sweep_configs import generate_config_key_sweep
+from validation import Fields, load_config_files, validate_matrix_entries, validate_matrix_entry
+
+MASTER_CONFIG_FILES = [
+    str(Path(__file__).resolve().parents[2] / ".github" / "configs" / name)
+    for name in ("nvidia-master.yaml", "amd-master.yaml")
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--copies', type=int, default=1,
+                        help='Number of copies of the generated matrix to validate (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timings to take the best of (default: 5)')
+    args = parser.parse_args()
+
+    master_config = load_config_files(MASTER_CONFIG_FILES)
+    keys = list(master_config)
+    entries = generate_config_key_sweep(keys, master_config, validate_entries=False) * args.copies
+
+    def best_time(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    generate = best_time(lambda: generate_config_key_sweep(keys, master_config, validate_entries=False))
+    per_entry = best_time(lambda: [validate_matrix_entry(entry, Fields.PREFILL.value in entry)
+                                   for entry in entries])
+    bulk = best_time(lambda: validate_matrix_entries(entries))
+
+    print(f"{len(entries)} entries")
+    print(f"generation:           {generate * 1000:8.2f} ms")
+    print(f"per-entry validation: {per_entry * 1000:8.2f} ms")
+    print(f"bulk validation:      {bulk * 1000:8.2f} ms ({per_entry / bulk:.2f}x per-entry)")
+
+
+if __name__ == "__main__":
+    main()
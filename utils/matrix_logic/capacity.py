@@ -0,0 +1,139 @@
+"""Checks of master config search spaces against the hardware of their runners.
+
+validation.py only checks the structure of the master configs, so a search space that can never
+run (a TP degree larger than a node, weights larger than the GPUs they are sharded over) is only
+found out once a job has been allocated GPUs and fails. check_capacity compares every
+search-space entry with the hardware profile of its runner type before any matrix is generated:
+
+- Unschedulable layouts are errors: a single-node TP degree beyond the GPUs of one node, or a
+  multinode worker that spans nodes without using whole nodes. Multinode weights are assumed to be
+  sharded over all GPUs of a worker.
+- Weights that don't fit in the HBM of the GPUs they are sharded over are errors, as the server
+  is guaranteed to run out of memory while loading.
+- Weights that leave less than MIN_KV_CACHE_FRACTION of the usable HBM for the KV cache are
+  warnings: the server starts, but can only hold a few sequences.
+
+Weight sizes are approximate checkpoint sizes per model prefix and precision; combinations
+without a known size are only checked for schedulability.
+"""
+import sys
+from typing import NamedTuple
+
+from validation import Fields
+
+
+class HardwareProfile(NamedTuple):
+    gpus_per_node: int
+    hbm_gb: float
+
+
+# Hardware of the nodes of each runner type in runners.yaml
+HARDWARE_PROFILES = {
+    'h100': HardwareProfile(gpus_per_node=8, hbm_gb=80),
+    'h200': HardwareProfile(gpus_per_node=8, hbm_gb=141),
+    'b200': HardwareProfile(gpus_per_node=8, hbm_gb=180),
+    'b200-trt': HardwareProfile(gpus_per_node=8, hbm_gb=180),
+    'mi300x': HardwareProfile(gpus_per_node=8, hbm_gb=192),
+    'mi325x': HardwareProfile(gpus_per_node=8, hbm_gb=256),
+    'mi355x': HardwareProfile(gpus_per_node=8, hbm_gb=288),
+    'gb200': HardwareProfile(gpus_per_node=4, hbm_gb=186),
+}
+
+# Approximate checkpoint sizes in GB, by model prefix and precision
+WEIGHTS_GB = {
+    ('dsr1', 'fp8'): 690,
+    ('dsr1', 'fp4'): 390,
+    ('gptoss', 'fp4'): 65,
+}
+
+# Fraction of HBM an engine gives to weights and KV cache; the rest holds activations and graphs
+USABLE_HBM_FRACTION = 0.9
+
+# Warn when the weights leave less than this fraction of the usable HBM for the KV cache
+MIN_KV_CACHE_FRACTION = 0.1
+
+
+def _worker_gpus(role: str, worker: dict, profile: HardwareProfile) -> int:
+    """GPUs of one multinode worker.
+
+    Some multinode recipes ignore tp and ep and size their workers by the number of nodes of each
+    role, passed as PREFILL_NODES / DECODE_NODES in additional-settings.
+    """
+    nodes_setting = f"{role.upper()}_NODES="
+    for setting in worker.get(Fields.ADDITIONAL_SETTINGS.value) or []:
+        if setting.startswith(nodes_setting):
+            return int(setting[len(nodes_setting):]) * profile.gpus_per_node // worker[Fields.NUM_WORKER.value]
+    return max(worker[Fields.TP.value], worker.get(Fields.EP.value, 1))
+
+
+def _layouts(config: dict, profile: HardwareProfile):
+    """Yield (description, GPUs) of every distinct server or worker layout in a master config entry."""
+    seen = set()
+    for seq_len_config in config[Fields.SEQ_LEN_CONFIGS.value]:
+        for bmk in seq_len_config[Fields.SEARCH_SPACE.value]:
+            if config.get(Fields.MULTINODE.value, False):
+                layouts = [(f"{role} worker of {gpus} GPUs", gpus)
+                           for role in (Fields.PREFILL.value, Fields.DECODE.value)
+                           for gpus in [_worker_gpus(role, bmk[role], profile)]]
+            else:
+                layouts = [(f"tp={bmk[Fields.TP.value]}", bmk[Fields.TP.value])]
+            for layout in layouts:
+                if layout not in seen:
+                    seen.add(layout)
+                    yield layout
+
+
+def weights_gb_per_gpu(config: dict, gpus: int):
+    """Weights each of the GPUs of a server holds, or None if the checkpoint size is unknown."""
+    weights_gb = WEIGHTS_GB.get((config[Fields.MODEL_PREFIX.value], config[Fields.PRECISION.value]))
+    return None if weights_gb is None else weights_gb / gpus
+
+
+def check_capacity(master_config: dict) -> tuple:
+    """Check every search space of a validated master config against its runner's hardware.
+
+    Returns:
+        Tuple of (errors, warnings), each a list of messages naming the config key and layout.
+    """
+    errors, warnings = [], []
+    for key, config in master_config.items():
+        profile = HARDWARE_PROFILES.get(config[Fields.RUNNER.value])
+        if profile is None:
+            warnings.append(f"{key}: no hardware profile for runner '{config[Fields.RUNNER.value]}', "
+                            f"capacity not checked")
+            continue
+        multinode = config.get(Fields.MULTINODE.value, False)
+
+        for layout, gpus in _layouts(config, profile):
+            if not multinode and gpus > profile.gpus_per_node:
+                errors.append(f"{key}: {layout} needs more GPUs than the {profile.gpus_per_node} "
+                              f"of a {config[Fields.RUNNER.value]} node")
+                continue
+            if multinode and gpus > profile.gpus_per_node and gpus % profile.gpus_per_node:
+                errors.append(f"{key}: {layout} spans nodes of {profile.gpus_per_node} GPUs "
+                              f"without using whole nodes")
+                continue
+
+            weights_gb = weights_gb_per_gpu(config, gpus)
+            if weights_gb is None:
+                continue
+            if weights_gb > profile.hbm_gb:
+                errors.append(f"{key}: {layout} puts {weights_gb:.0f} GB of weights on each GPU, "
+                              f"more than its {profile.hbm_gb:g} GB of HBM")
+            elif weights_gb > profile.hbm_gb * USABLE_HBM_FRACTION * (1 - MIN_KV_CACHE_FRACTION):
+                warnings.append(f"{key}: {layout} puts {weights_gb:.0f} GB of weights on each GPU, "
+                                f"leaving little of its {profile.hbm_gb:g} GB of HBM for the KV cache")
+    return errors, warnings
+
+
+def enforce_capacity(master_config: dict) -> None:
+    """Report capacity warnings on stderr and raise on capacity errors.
+
+    Raises:
+        ValueError: If any search space can't be scheduled or is guaranteed to run out of memory.
+    """
+    errors, warnings = check_capacity(master_config)
+    for warning in warnings:
+        print(f"Warning: {warning}", file=sys.stderr)
+    if errors:
+        raise ValueError("Master config search spaces exceed runner capacity:\n" + "\n".join(errors))
@@ -0,0 +1,253 @@
+"""Runtime estimates for matrix entries, fit from historical results.
+
+The benchmark phase of a job is modeled as seconds per prompt-token, i.e.
+duration / (num_prompts * (isl + osl)), following a power law in concurrency. The law is fit by
+least squares in log-log space at the most specific level that has data:
+(hw, framework, isl, osl), then (hw, framework), (hw) and finally all results. Every job also
+pays a fixed startup overhead for pulling the image, loading weights and warming up the server,
+which result files do not capture.
+"""
+import heapq
+import math
+from collections import defaultdict
+
+from adaptive import iter_results
+from validation import PROMPTS_PER_CONC, Fields
+
+DEFAULT_STARTUP_MINUTES = 15.0
+
+# Benchmark minutes assumed when there are no historical results at all
+DEFAULT_BENCHMARK_MINUTES = 10.0
+
+# Concurrency exponent assumed when a level only has results at one concurrency: throughput
+# scales linearly with concurrency, so each prompt takes 1/conc of the per-request latency
+DEFAULT_CONC_EXPONENT = -1.0
+
+
+def result_duration(result: dict) -> float:
+    """Benchmark duration of a result in seconds.
+
+    Results from before process_result.py recorded durations are estimated from the measured
+    throughput instead.
+    """
+    if 'duration' in result:
+        return result['duration']
+    gpus = result['num_prefill_gpu'] + result['num_decode_gpu'] if result.get('is_multinode') else result['tp']
+    return result_num_prompts(result) * (result['isl'] + result['osl']) / (result['tput_per_gpu'] * gpus)
+
+
+def result_num_prompts(result: dict) -> int:
+    """Number of prompts a result was measured with, as recorded or by the default multiplier."""
+    return result.get('num_prompts') or int(result['conc']) * PROMPTS_PER_CONC
+
+
+def fit_power_law(points: list) -> tuple:
+    """Least squares fit of y = a + b * x, with b = DEFAULT_CONC_EXPONENT if x doesn't vary."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return mean_y - DEFAULT_CONC_EXPONENT * mean_x, DEFAULT_CONC_EXPONENT
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return mean_y - slope * mean_x, slope
+
+
+class RuntimeModel:
+    """Estimated runtime of matrix entries, fit from historical results."""
+
+    def __init__(self, results, startup_minutes: float = DEFAULT_STARTUP_MINUTES):
+        self.startup_minutes = startup_minutes
+
+        points = defaultdict(list)
+        for r in results:
+            if r['tput_per_gpu'] <= 0:
+                continue
+            x = math.log(int(r['conc']))
+            y = math.log(result_duration(r) / (result_num_prompts(r) * (r['isl'] + r['osl'])))
+            for level in self._levels(r['hw'], r['framework'], r['isl'], r['osl']):
+                points[level].append((x, y))
+        self._fits = {level: fit_power_law(level_points) for level, level_points in points.items()}
+
+    @property
+    def has_history(self) -> bool:
+        """Whether any historical results were fit, i.e. estimates are not just the defaults."""
+        return bool(self._fits)
+
+    @classmethod
+    def from_history(cls, history_dir: str, startup_minutes: float = DEFAULT_STARTUP_MINUTES):
+        """Fit from every results directory or aggregated results JSON under history_dir."""
+        return cls(iter_results(history_dir), startup_minutes)
+
+    @staticmethod
+    def _levels(hw, framework, isl, osl):
+        """Fit levels from most to least specific."""
+        return [(hw, framework, int(isl), int(osl)), (hw, framework), (hw,), ()]
+
+    def benchmark_seconds(self, hw: str, framework: str, isl: int, osl: int, conc: int,
+                          num_prompts: int = None) -> float:
+        """Estimated duration of the benchmark phase of one concurrency."""
+        num_prompts = num_prompts or conc * PROMPTS_PER_CONC
+        for level in self._levels(hw, framework, isl, osl):
+            if level in self._fits:
+                a, b = self._fits[level]
+                return math.exp(a + b * math.log(conc)) * num_prompts * (isl + osl)
+        return DEFAULT_BENCHMARK_MINUTES * 60
+
+    def estimate_minutes(self, entry: dict) -> float:
+        """Estimated wall-clock minutes of a matrix entry, including startup."""
+        concs = entry[Fields.CONC.value]
+        concs = concs if isinstance(concs, list) else [concs]
+        seconds = sum(
+            self.benchmark_seconds(entry[Fields.RUNNER.value], entry[Fields.FRAMEWORK.value],
+                                   entry[Fields.ISL.value], entry[Fields.OSL.value], conc)
+            for conc in concs)
+        return self.startup_minutes + seconds / 60
+
+
+def entry_gpus(entry: dict) -> int:
+    """Number of GPUs a matrix entry occupies."""
+    if Fields.PREFILL.value in entry:
+        prefill, decode = entry[Fields.PREFILL.value], entry[Fields.DECODE.value]
+        return (prefill[Fields.NUM_WORKER.value] * prefill[Fields.TP.value]
+                + decode[Fields.NUM_WORKER.value] * decode[Fields.TP.value])
+    return entry[Fields.TP.value]
+
+
+def entry_gpu_hours(entry: dict) -> float:
+    return entry[Fields.EST_MINUTES.value] / 60 * entry_gpus(entry)
+
+
+def series_key(entry: dict) -> tuple:
+    """Everything about a single-node matrix entry except its concurrency.
+
+    The exp-name tells apart seq-len profiles that share isl and osl.
+    """
+    return tuple(entry[field.value] for field in (
+        Fields.IMAGE, Fields.MODEL, Fields.MODEL_PREFIX, Fields.PRECISION, Fields.FRAMEWORK,
+        Fields.RUNNER, Fields.ISL, Fields.OSL, Fields.RANDOM_RANGE_RATIO, Fields.EXP_NAME,
+        Fields.TP, Fields.EP, Fields.DP_ATTN, Fields.SPEC_DECODING))
+
+
+def _batch_groups(matrix_values: list, batch_key) -> list:
+    """Group of each entry: batch_key(entry) for single-node entries, or its own index."""
+    return [batch_key(entry) if batch_key and Fields.PREFILL.value not in entry else idx
+            for idx, entry in enumerate(matrix_values)]
+
+
+def batched_gpu_hours(matrix_values: list, batch_key=None,
+                      startup_minutes: float = DEFAULT_STARTUP_MINUTES) -> float:
+    """Estimated GPU-hours of entries once those with the same batch_key share a server launch.
+
+    Entries must carry est-minutes that include a startup of startup_minutes each. Without a
+    batch_key every entry pays its own startup.
+    """
+    total = sum(entry_gpu_hours(entry) for entry in matrix_values)
+    if batch_key is None:
+        return total
+    seen = set()
+    for group, entry in zip(_batch_groups(matrix_values, batch_key), matrix_values):
+        if group in seen:
+            total -= startup_minutes / 60 * entry_gpus(entry)
+        seen.add(group)
+    return total
+
+
+def trim_to_budget(matrix_values: list, budget_gpu_hours: float, batch_key=None,
+                   startup_minutes: float = DEFAULT_STARTUP_MINUTES) -> tuple:
+    """Drop the lowest-value entries until the estimated GPU-hours fit the budget.
+
+    Only interior points of single-node concurrency ladders are dropped: the lowest and highest
+    concurrency of each series and all multi-node entries are kept. The value of an interior
+    point is the log2 ratio of its neighbors' concurrencies, i.e. the gap (in doublings) that
+    dropping it would leave in the ladder, so ladders are thinned evenly rather than truncated.
+    Ties go to the more expensive point.
+
+    Entries must carry est-minutes. If batch_key is given, single-node entries with the same
+    batch_key(entry) will run against one server launch, so they are charged a single startup of
+    startup_minutes, and dropping one of them only saves its benchmark time.
+
+    Returns:
+        Tuple of (kept entries, dropped entries), both in matrix order.
+    """
+    total = batched_gpu_hours(matrix_values, batch_key, startup_minutes)
+    if total <= budget_gpu_hours:
+        return matrix_values, []
+
+    # GPU-hours of the shared startup of each batch, and how many of its entries are left
+    shared_minutes = startup_minutes if batch_key else 0.0
+    groups = _batch_groups(matrix_values, batch_key)
+    group_sizes = defaultdict(int)
+    for group in groups:
+        group_sizes[group] += 1
+
+    def cost(idx):
+        entry = matrix_values[idx]
+        return (entry[Fields.EST_MINUTES.value] - shared_minutes) / 60 * entry_gpus(entry)
+
+    series = defaultdict(list)
+    for idx, entry in enumerate(matrix_values):
+        if Fields.PREFILL.value not in entry:
+            series[series_key(entry)].append(idx)
+
+    prev, nxt = {}, {}
+    for indices in series.values():
+        indices.sort(key=lambda idx: matrix_values[idx][Fields.CONC.value])
+        for a, b in zip(indices, indices[1:]):
+            nxt[a], prev[b] = b, a
+
+    def value(idx):
+        return math.log2(matrix_values[nxt[idx]][Fields.CONC.value] / matrix_values[prev[idx]][Fields.CONC.value])
+
+    version = defaultdict(int)
+    heap = [(value(idx), -cost(idx), idx, 0) for idx in prev if idx in nxt]
+    heapq.heapify(heap)
+
+    dropped = set()
+    while total > budget_gpu_hours and heap:
+        _, neg_cost, idx, entry_version = heapq.heappop(heap)
+        if idx in dropped or entry_version != version[idx]:
+            continue
+        dropped.add(idx)
+        total += neg_cost
+        group_sizes[groups[idx]] -= 1
+        if not group_sizes[groups[idx]]:
+            total -= shared_minutes / 60 * entry_gpus(matrix_values[idx])
+
+        before, after = prev.pop(idx), nxt.pop(idx)
+        nxt[before], prev[after] = after, before
+        for neighbor in (before, after):
+            if neighbor in prev and neighbor in nxt:
+                version[neighbor] += 1
+                heapq.heappush(heap, (value(neighbor), -cost(neighbor), neighbor, version[neighbor]))
+
+    kept = [entry for idx, entry in enumerate(matrix_values) if idx not in dropped]
+    return kept, [entry for idx, entry in enumerate(matrix_values) if idx in dropped]
+
+
+def format_runtime_report(matrix_values: list, dropped: list = (), budget_gpu_hours: float = None,
+                          dropped_gpu_hours: float = None) -> str:
+    """Summarize estimated runtime of a matrix and what was dropped to fit a budget.
+
+    dropped_gpu_hours is what dropping saved, if that isn't the estimate of the dropped entries,
+    e.g. because they would have shared a server launch.
+    """
+    gpu_hours = sum(entry_gpu_hours(entry) for entry in matrix_values)
+    longest = max((entry[Fields.EST_MINUTES.value] for entry in matrix_values), default=0)
+    lines = [f"Estimated {len(matrix_values)} job(s), {gpu_hours:.2f} GPU-hours "
+             f"(longest job {longest:.1f} minutes)"]
+    if budget_gpu_hours is not None:
+        dropped_hours = (dropped_gpu_hours if dropped_gpu_hours is not None
+                         else sum(entry_gpu_hours(entry) for entry in dropped))
+        lines.append(f"Budget {budget_gpu_hours:.2f} GPU-hours: dropped {len(dropped)} point(s) "
+                     f"worth {dropped_hours:.2f} GPU-hours")
+        if gpu_hours > budget_gpu_hours:
+            lines.append("Warning: the budget cannot be met without dropping the ends of concurrency "
+                         "ladders or multi-node entries")
+        for entry in dropped:
+            lines.append(
+                f"  {entry[Fields.MODEL_PREFIX.value]}-{entry[Fields.PRECISION.value]}-"
+                f"{entry[Fields.RUNNER.value]}-{entry[Fields.FRAMEWORK.value]} "
+                f"isl={entry[Fields.ISL.value]} osl={entry[Fields.OSL.value]} tp={entry[Fields.TP.value]} "
+                f"ep={entry[Fields.EP.value]} conc={entry[Fields.CONC.value]}")
+    return "\n".join(lines)
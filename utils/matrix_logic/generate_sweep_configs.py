@@ -1,26 +1,69 @@
 import json
 import argparse
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Ensure sibling modules are importable regardless of how script is invoked
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from validation import (
+    DEFAULT_RANDOM_RANGE_RATIO,
     validate_matrix_entry,
+    validate_matrix_entries,
     load_config_files,
     load_runner_file,
+    load_seq_len_profiles,
+    get_config_index,
     Fields
 )
+from adaptive import (
+    DEFAULT_PLATEAU_THRESHOLD,
+    coarse_conc_values,
+    format_unmeasured_report,
+    load_measurements,
+    refine_conc_values,
+    sweep_point_key,
+)
+from capacity import enforce_capacity
+from cost_model import (
+    DEFAULT_STARTUP_MINUTES,
+    RuntimeModel,
+    batched_gpu_hours,
+    format_runtime_report,
+    trim_to_budget,
+)
+from identity import assign_job_ids, diff_matrices, format_diff_report, iter_matrix_entries
+from kv_cache import fit_conc_range, format_kv_conc_report, max_concurrency
+from pruning import (
+    DEFAULT_PRUNE_MARGIN,
+    DEFAULT_PRUNE_MIN_SWEEPS,
+    consistently_dominated,
+    format_pruning_report,
+    load_history,
+)
+from scheduling import MAX_MATRIX_JOBS, format_schedule_report, schedule_lpt, shard_lpt
+from server_settings import conc_server_settings
+
+@lru_cache(maxsize=None)
+def seq_len_stoi() -> dict:
+    """Sequence length profile names to (isl, osl), from .github/configs/seq-len-profiles.yaml.
+
+    Loaded on first use, so that importing this module doesn't read the profiles file.
+    """
+    return {
+        name: (profile[Fields.ISL.value], profile[Fields.OSL.value])
+        for name, profile in load_seq_len_profiles().items()
+    }
 
-seq_len_stoi = {
-    "1k1k": (1024, 1024),
-    "1k8k": (1024, 8192),
-    "8k1k": (8192, 1024)
-}
 
-# Reverse mapping for exp-name generation
-seq_len_itos = {v: k for k, v in seq_len_stoi.items()}
+@lru_cache(maxsize=None)
+def seq_len_itos() -> dict:
+    """Reverse mapping of seq_len_stoi for exp-name generation; the first profile of an isl/osl pair names it."""
+    itos = {}
+    for name, lengths in seq_len_stoi().items():
+        itos.setdefault(lengths, name)
+    return itos
 
 
 def seq_len_to_str(isl: int, osl: int) -> str:
@@ -29,10 +72,90 @@ def seq_len_to_str(isl: int, osl: int) -> str:
     Returns the short name (e.g., '1k1k') if it exists in the mapping,
     otherwise returns 'isl_osl' format.
     """
-    return seq_len_itos.get((isl, osl), f"{isl}_{osl}")
+    return seq_len_itos().get((isl, osl), f"{isl}_{osl}")
+
+
+def seq_len_config_name(seq_len_config: dict) -> str:
+    """Name of a master config seq-len-config: its profile, or the name of its isl/osl pair."""
+    return seq_len_config.get(Fields.PROFILE.value) or seq_len_to_str(
+        seq_len_config[Fields.ISL.value], seq_len_config[Fields.OSL.value])
+
+
+def entry_seq_len_name(entry: dict) -> str:
+    """Seq-len name of a generated entry, recorded in its exp-name <model-prefix>_<seq-len name>.
+
+    Unlike seq_len_to_str, this tells apart profiles that share isl and osl.
+    """
+    return entry[Fields.EXP_NAME.value].removeprefix(f"{entry[Fields.MODEL_PREFIX.value]}_")
 
 
-def generate_full_sweep(args, all_config_data, runner_data):
+def seq_len_random_range_ratio(seq_len_config: dict) -> float:
+    return seq_len_config.get(Fields.RANDOM_RANGE_RATIO.value, DEFAULT_RANDOM_RANGE_RATIO)
+
+
+def expand_conc_values(bmk: dict, step_size: int = 2) -> list:
+    """Expand the concurrency values of a search-space entry.
+
+    Returns the entry's conc-list if given, otherwise conc-start, conc-start * step_size, ...
+    capped at and always including conc-end.
+    """
+    if Fields.CONC_LIST.value in bmk:
+        return list(bmk[Fields.CONC_LIST.value])
+
+    conc_start = bmk[Fields.CONC_START.value]
+    conc_end = bmk[Fields.CONC_END.value]
+    conc_values = []
+    conc = conc_start
+    while conc <= conc_end:
+        conc_values.append(conc)
+        if conc == conc_end:
+            break
+        conc *= step_size
+        if conc > conc_end:
+            conc = conc_end
+    return conc_values
+
+
+def conc_batch_key(entry: dict) -> tuple:
+    """Key of the job batch_conc_entries merges a single-node entry into: all of its fields but
+    conc and est-minutes, and the server settings its benchmark script derives from conc."""
+    fields = tuple((field, value) for field, value in entry.items()
+                   if field not in (Fields.CONC.value, Fields.EST_MINUTES.value))
+    return fields, conc_server_settings(entry)
+
+
+def batch_conc_entries(matrix_values: list, validate_entries: bool = True) -> list:
+    """Merge single-node entries that differ only in concurrency into one entry per series.
+
+    The conc of a merged entry is the ascending list of its concurrencies, which the benchmark
+    template runs one after another against a single server launch. A series is split where its
+    benchmark script configures the server differently by conc (see server_settings.py), so
+    every concurrency runs on the server it would get in an unbatched job. Multi-node entries
+    already carry a list and are passed through. Merged entries take the position of their first
+    entry, and drop any est-minutes, which no longer apply. Merged entries are validated unless
+    validate_entries is False.
+    """
+    batched = []
+    series = {}
+    for entry in matrix_values:
+        if Fields.PREFILL.value in entry:
+            batched.append(entry)
+            continue
+        key = conc_batch_key(entry)
+        if key not in series:
+            series[key] = {field: [] if field == Fields.CONC.value else value
+                           for field, value in entry.items() if field != Fields.EST_MINUTES.value}
+            batched.append(series[key])
+        series[key][Fields.CONC.value].append(entry[Fields.CONC.value])
+
+    for entry in series.values():
+        entry[Fields.CONC.value].sort()
+        if validate_entries:
+            validate_matrix_entry(entry, is_multinode=False)
+    return batched
+
+
+def generate_full_sweep(args, all_config_data, runner_data, validate_entries=True):
     """Generate full sweep configurations with optional filtering.
 
     Supports filtering by model prefix, precision, framework, runner type, sequence lengths,
@@ -40,7 +163,8 @@ def generate_full_sweep(args, all_config_data, runner_data):
 
     All filters are optional - can generate sweeps for all configs or filter by specific criteria.
 
-    Assumes all_config_data has been validated by validate_master_config().
+    Assumes all_config_data has been validated by validate_master_config(). Entries are
+    validated as they are generated unless validate_entries is False.
     """
     # Validate runner types if specified
     if args.runner_type:
@@ -51,32 +175,39 @@ def generate_full_sweep(args, all_config_data, runner_data):
                 f"Invalid runner type(s): {invalid_runners}. "
                 f"Valid runner types are: {', '.join(sorted(valid_runner_types))}")
 
-    matrix_values = []
-
-    # Convert seq-lens to set of (isl, osl) tuples for filtering
-    seq_lens_filter = None
-    if args.seq_lens:
-        seq_lens_filter = {seq_len_stoi[sl] for sl in args.seq_lens}
-
-    # Iterate through all configurations and apply filters as specified (this is just "selecting" 
-    # configs from all of the master configs subject to some pattern matching)
-    for key, val in all_config_data.items():
-        # Filter by model prefix if specified
-        if args.model_prefix:
-            if not any(key.startswith(prefix) for prefix in args.model_prefix):
-                continue
+    # Adaptive concurrency search only applies to single-node configs, which run one job per conc
+    adaptive = args.adaptive_stride is not None or args.refine_from is not None
+    if adaptive and args.multi_node:
+        raise ValueError("--adaptive-stride and --refine-from only apply to --single-node sweeps.")
+    measurements = load_measurements(args.refine_from) if args.refine_from else None
+
+    # Points consistently dominated in the historical results are dropped (single-node only)
+    dominated = {}
+    if args.prune_history and not args.no_prune:
+        dominated = consistently_dominated(
+            load_history(args.prune_history), args.prune_min_sweeps, args.prune_margin)
+    pruned_results = []
+    kv_adjustments = []
+    unmeasured_series = []
 
-        # Filter by precision if specified
-        if args.precision and val[Fields.PRECISION.value] not in args.precision:
-            continue
+    matrix_values = []
 
-        # Filter by framework if specified
-        if args.framework and val[Fields.FRAMEWORK.value] not in args.framework:
-            continue
+    # Seq-len-configs are filtered by profile name, or by the name of their isl/osl pair
+    seq_lens_filter = set(args.seq_lens) if args.seq_lens else None
+
+    # Select configs from all of the master configs subject to the filters specified. The
+    # selection is an intersection over the config index, so only matching entries are visited.
+    # Model prefix filters match config keys by prefix.
+    selected_keys = get_config_index(all_config_data).select(
+        key_prefixes=args.model_prefix,
+        precisions=args.precision,
+        frameworks=args.framework,
+        runners=args.runner_type,
+        multinode=bool(args.multi_node),
+    )
 
-        # Filter by runner type if specified
-        if args.runner_type and val[Fields.RUNNER.value] not in args.runner_type:
-            continue
+    for key in selected_keys:
+        val = all_config_data[key]
 
         # Check if this is a multinode config
         is_multinode = val.get(Fields.MULTINODE.value, False)
@@ -94,9 +225,11 @@ def generate_full_sweep(args, all_config_data, runner_data):
         for seq_config in seq_len_configs:
             isl = seq_config[Fields.ISL.value]
             osl = seq_config[Fields.OSL.value]
+            seq_len_str = seq_len_config_name(seq_config)
+            random_range_ratio = seq_len_random_range_ratio(seq_config)
 
             # Filter by sequence lengths if specified
-            if seq_lens_filter and (isl, osl) not in seq_lens_filter:
+            if seq_lens_filter and seq_len_str not in seq_lens_filter:
                 continue
 
             bmk_space = seq_config[Fields.SEARCH_SPACE.value]
@@ -115,23 +248,7 @@ def generate_full_sweep(args, all_config_data, runner_data):
                     decode = bmk[Fields.DECODE.value]
 
                     # Get concurrency values (can be list or range)
-                    conc_list = bmk.get(Fields.CONC_LIST.value)
-                    # If it's a list
-                    if conc_list:
-                        conc_values = conc_list
-                    # If it's a range
-                    else:
-                        conc_start = bmk[Fields.CONC_START.value]
-                        conc_end = bmk[Fields.CONC_END.value]
-                        conc_values = []
-                        conc = conc_start
-                        while conc <= conc_end:
-                            conc_values.append(conc)
-                            if conc == conc_end:
-                                break
-                            conc *= args.step_size
-                            if conc > conc_end:
-                                conc = conc_end
+                    conc_values = expand_conc_values(bmk, args.step_size)
 
                     # Apply max-conc filter if specified
                     # If max_conc is less than all values, use max_conc directly (if valid)
@@ -147,7 +264,6 @@ def generate_full_sweep(args, all_config_data, runner_data):
                             conc_values = filtered_conc
 
                     # For multinode, create a single entry with conc as a list
-                    seq_len_str = seq_len_to_str(isl, osl)
                     entry = {
                         Fields.IMAGE.value: image,
                         Fields.MODEL.value: model,
@@ -157,6 +273,7 @@ def generate_full_sweep(args, all_config_data, runner_data):
                         Fields.RUNNER.value: runner,
                         Fields.ISL.value: isl,
                         Fields.OSL.value: osl,
+                        Fields.RANDOM_RANGE_RATIO.value: random_range_ratio,
                         Fields.SPEC_DECODING.value: spec_decoding,
                         Fields.PREFILL.value: prefill,
                         Fields.DECODE.value: decode,
@@ -166,7 +283,8 @@ def generate_full_sweep(args, all_config_data, runner_data):
                         Fields.DISAGG.value: disagg,
                     }
 
-                    validate_matrix_entry(entry, is_multinode)
+                    if validate_entries:
+                        validate_matrix_entry(entry, is_multinode)
                     matrix_values.append(entry)
                 elif args.single_node:
                     # Single-node configuration
@@ -193,6 +311,17 @@ def generate_full_sweep(args, all_config_data, runner_data):
                         if ep is not None and ep > args.max_ep:
                             ep = args.max_ep
 
+                    # Fit the concurrency range to the KV cache of the server, if requested, so
+                    # that no points are scheduled that can only queue requests
+                    if args.kv_conc:
+                        kv_max_conc = max_concurrency(val, isl, osl, tp, dp_attn or False)
+                        if kv_max_conc is not None:
+                            conc_start, kv_conc_end = fit_conc_range(
+                                conc_start, conc_end, kv_max_conc, args.kv_conc, args.step_size)
+                            if kv_conc_end != conc_end:
+                                kv_adjustments.append((key, isl, osl, tp, conc_end, kv_conc_end))
+                                conc_end = kv_conc_end
+
                     # Apply max-conc filter if specified
                     # If conc_start > max_conc, use max_conc as both start and end (if valid)
                     if args.max_conc is not None:
@@ -204,9 +333,29 @@ def generate_full_sweep(args, all_config_data, runner_data):
                         else:
                             conc_end = min(conc_end, args.max_conc)
 
-                    conc = conc_start
-                    while conc <= conc_end:
-                        seq_len_str = seq_len_to_str(isl, osl)
+                    conc_values = expand_conc_values(
+                        {Fields.CONC_START.value: conc_start, Fields.CONC_END.value: conc_end},
+                        args.step_size)
+                    point = sweep_point_key(model_code, precision, framework, runner, isl, osl,
+                                            tp, ep or 1, dp_attn or False, spec_decoding)
+                    measured = measurements.get(point, {}) if measurements is not None else {}
+                    if any(conc in measured for conc in conc_values):
+                        conc_values = refine_conc_values(
+                            conc_values, measured, args.plateau_threshold,
+                            args.min_intvty, args.max_ttft)
+                    else:
+                        # Refinement can't start from nothing: unmeasured series get their
+                        # coarse pass, or their full ladder without --adaptive-stride
+                        if measurements is not None:
+                            unmeasured_series.append((key, isl, osl, tp))
+                        if args.adaptive_stride is not None:
+                            conc_values = coarse_conc_values(conc_values, args.adaptive_stride)
+                    if dominated:
+                        pruned_results.extend(
+                            dominated[(point, c)] for c in conc_values if (point, c) in dominated)
+                        conc_values = [c for c in conc_values if (point, c) not in dominated]
+
+                    for conc in conc_values:
                         entry = {
                             Fields.IMAGE.value: image,
                             Fields.MODEL.value: model,
@@ -216,6 +365,7 @@ def generate_full_sweep(args, all_config_data, runner_data):
                             Fields.RUNNER.value: runner,
                             Fields.ISL.value: isl,
                             Fields.OSL.value: osl,
+                            Fields.RANDOM_RANGE_RATIO.value: random_range_ratio,
                             Fields.TP.value: tp,
                             Fields.CONC.value: conc,
                             Fields.MAX_MODEL_LEN.value: isl + osl + 200,
@@ -231,23 +381,65 @@ def generate_full_sweep(args, all_config_data, runner_data):
                         if dp_attn is not None:
                             entry[Fields.DP_ATTN.value] = dp_attn
 
-                        validate_matrix_entry(entry, is_multinode)
+                        if validate_entries:
+                            validate_matrix_entry(entry, is_multinode)
                         matrix_values.append(entry)
 
-                        if conc == conc_end:
-                            break
-                        conc *= args.step_size
-                        if conc > conc_end:
-                            conc = conc_end
+    if unmeasured_series:
+        print(format_unmeasured_report(unmeasured_series, args.adaptive_stride), file=sys.stderr)
+    if pruned_results:
+        print(format_pruning_report(pruned_results), file=sys.stderr)
+    if kv_adjustments:
+        print(format_kv_conc_report(kv_adjustments), file=sys.stderr)
+
+    # Annotate entries with estimated runtime and trim them to the GPU-hour budget, if requested.
+    # Trimming thins out concurrency ladders, so it happens before they are batched, but charges
+    # the entries of a batch a single startup.
+    runtime_model = None
+    dropped = []
+    dropped_gpu_hours = None
+    if args.runtime_history or args.budget is not None or args.schedule or args.shards:
+        runtime_model = (RuntimeModel.from_history(args.runtime_history, args.startup_minutes)
+                         if args.runtime_history else RuntimeModel([], args.startup_minutes))
+        for entry in matrix_values:
+            entry[Fields.EST_MINUTES.value] = round(runtime_model.estimate_minutes(entry), 1)
+        if args.budget is not None:
+            batch_key = conc_batch_key if args.batch_conc else None
+            untrimmed_gpu_hours = batched_gpu_hours(matrix_values, batch_key, runtime_model.startup_minutes)
+            matrix_values, dropped = trim_to_budget(matrix_values, args.budget, batch_key,
+                                                    runtime_model.startup_minutes)
+            dropped_gpu_hours = untrimmed_gpu_hours - batched_gpu_hours(
+                matrix_values, batch_key, runtime_model.startup_minutes)
+
+    # Run all concurrencies of a series against one server launch, if requested
+    if args.batch_conc:
+        matrix_values = batch_conc_entries(matrix_values, validate_entries)
+
+    # Report the estimates and pin entries to runner nodes, if requested. Batched entries pay
+    # the startup overhead once, so they are estimated again.
+    if runtime_model is not None:
+        for entry in matrix_values:
+            if Fields.EST_MINUTES.value not in entry:
+                entry[Fields.EST_MINUTES.value] = round(runtime_model.estimate_minutes(entry), 1)
+        print(format_runtime_report(matrix_values, dropped, args.budget, dropped_gpu_hours),
+              file=sys.stderr)
+
+        if args.schedule:
+            print(format_schedule_report(schedule_lpt(matrix_values, runner_data)), file=sys.stderr)
+
+    # Split the matrix into separately dispatched matrices of similar runtime, if requested
+    if args.shards:
+        return shard_lpt(matrix_values, args.shards)
 
     return matrix_values
 
 
-def generate_runner_model_sweep_config(args, all_config_data, runner_data):
+def generate_runner_model_sweep_config(args, all_config_data, runner_data, validate_entries=True):
     """Generate runner-model sweep configurations.
 
     Assumes all_config_data has been validated by validate_config_structure().
     Supports both single-node and multinode configurations.
+    Entries are validated as they are generated unless validate_entries is False.
     """
     runner_nodes = runner_data.get(args.runner_type)
 
@@ -263,20 +455,15 @@ def generate_runner_model_sweep_config(args, all_config_data, runner_data):
             raise ValueError(
                 f"No runner nodes found matching filter '{args.runner_node_filter}' for runner type '{args.runner_type}'.")
 
-    matrix_values = []
-    for key, val in all_config_data.items():
-        # Only consider configs with specified runner
-        if val[Fields.RUNNER.value] != args.runner_type:
-            continue
+    # Only consider configs with specified runner and requested node type
+    selected_keys = get_config_index(all_config_data).select(
+        runners=[args.runner_type], multinode=bool(args.multi_node))
 
+    matrix_values = []
+    for key in selected_keys:
+        val = all_config_data[key]
         is_multinode = val.get(Fields.MULTINODE.value, False)
 
-        # Skip configs that don't match the requested node type
-        if args.single_node and is_multinode:
-            continue
-        if args.multi_node and not is_multinode:
-            continue
-
         # Get model code for exp_name
         model_code = val[Fields.MODEL_PREFIX.value]
         # Get disagg value, defaulting to False if not specified
@@ -319,6 +506,7 @@ def generate_runner_model_sweep_config(args, all_config_data, runner_data):
                     Fields.RUNNER.value: node,
                     Fields.ISL.value: 1024,
                     Fields.OSL.value: 1024,
+                    Fields.RANDOM_RANGE_RATIO.value: seq_len_random_range_ratio(target_config),
                     Fields.SPEC_DECODING.value: spec_decoding,
                     Fields.PREFILL.value: {
                         Fields.NUM_WORKER.value: prefill_config[Fields.NUM_WORKER.value],
@@ -339,7 +527,7 @@ def generate_runner_model_sweep_config(args, all_config_data, runner_data):
                     Fields.EXP_NAME.value: f"{model_code}_test",
                     Fields.DISAGG.value: disagg,
                 }
-                matrix_values.append(validate_matrix_entry(entry, is_multinode=True))
+                matrix_values.append(validate_matrix_entry(entry, is_multinode=True) if validate_entries else entry)
         else:
             # Single-node: pick highest TP config with lowest concurrency
             highest_tp_bmk = max(
@@ -361,6 +549,7 @@ def generate_runner_model_sweep_config(args, all_config_data, runner_data):
                     Fields.RUNNER.value: node,
                     Fields.ISL.value: 1024,
                     Fields.OSL.value: 1024,
+                    Fields.RANDOM_RANGE_RATIO.value: seq_len_random_range_ratio(target_config),
                     Fields.TP.value: highest_tp,
                     Fields.EP.value: ep if ep is not None else 1,
                     Fields.DP_ATTN.value: dp_attn if dp_attn is not None else False,
@@ -370,19 +559,25 @@ def generate_runner_model_sweep_config(args, all_config_data, runner_data):
                     Fields.EXP_NAME.value: f"{model_code}_test",
                     Fields.DISAGG.value: disagg,
                 }
-                matrix_values.append(validate_matrix_entry(entry, is_multinode=False))
+                matrix_values.append(validate_matrix_entry(entry, is_multinode=False) if validate_entries else entry)
 
     return matrix_values
 
 
-def generate_test_config_sweep(args, all_config_data):
+def generate_test_config_sweep(args, all_config_data, validate_entries=True):
+    """Generate full sweep for the config keys given by the test-config subcommand."""
+    return generate_config_key_sweep(args.config_keys, all_config_data, validate_entries)
+
+
+def generate_config_key_sweep(config_keys, all_config_data, validate_entries=True):
     """Generate full sweep for specific config keys.
 
     Validates that all specified config keys exist before generating.
     Expands all configs fully without any filtering.
+    Entries are validated as they are generated unless validate_entries is False.
     """
     # Validate all config keys exist
-    missing_keys = [key for key in args.config_keys if key not in all_config_data]
+    missing_keys = [key for key in config_keys if key not in all_config_data]
     if missing_keys:
         available_keys = sorted(all_config_data.keys())
         raise ValueError(
@@ -392,7 +587,7 @@ def generate_test_config_sweep(args, all_config_data):
 
     matrix_values = []
 
-    for key in args.config_keys:
+    for key in config_keys:
         val = all_config_data[key]
         is_multinode = val.get(Fields.MULTINODE.value, False)
 
@@ -407,7 +602,8 @@ def generate_test_config_sweep(args, all_config_data):
         for seq_len_config in val[Fields.SEQ_LEN_CONFIGS.value]:
             isl = seq_len_config[Fields.ISL.value]
             osl = seq_len_config[Fields.OSL.value]
-            seq_len_str = seq_len_to_str(isl, osl)
+            seq_len_str = seq_len_config_name(seq_len_config)
+            random_range_ratio = seq_len_random_range_ratio(seq_len_config)
 
             for bmk in seq_len_config[Fields.SEARCH_SPACE.value]:
                 if is_multinode:
@@ -417,20 +613,7 @@ def generate_test_config_sweep(args, all_config_data):
                     decode = bmk[Fields.DECODE.value]
 
                     # Get concurrency values
-                    if Fields.CONC_LIST.value in bmk:
-                        conc_values = bmk[Fields.CONC_LIST.value]
-                    else:
-                        conc_start = bmk[Fields.CONC_START.value]
-                        conc_end = bmk[Fields.CONC_END.value]
-                        conc_values = []
-                        conc = conc_start
-                        while conc <= conc_end:
-                            conc_values.append(conc)
-                            if conc == conc_end:
-                                break
-                            conc *= 2
-                            if conc > conc_end:
-                                conc = conc_end
+                    conc_values = expand_conc_values(bmk)
 
                     entry = {
                         Fields.IMAGE.value: image,
@@ -441,6 +624,7 @@ def generate_test_config_sweep(args, all_config_data):
                         Fields.RUNNER.value: runner,
                         Fields.ISL.value: isl,
                         Fields.OSL.value: osl,
+                        Fields.RANDOM_RANGE_RATIO.value: random_range_ratio,
                         Fields.SPEC_DECODING.value: spec_decoding,
                         Fields.PREFILL.value: prefill,
                         Fields.DECODE.value: decode,
@@ -449,7 +633,7 @@ def generate_test_config_sweep(args, all_config_data):
                         Fields.EXP_NAME.value: f"{model_code}_{seq_len_str}",
                         Fields.DISAGG.value: disagg,
                     }
-                    matrix_values.append(validate_matrix_entry(entry, is_multinode=True))
+                    matrix_values.append(validate_matrix_entry(entry, is_multinode=True) if validate_entries else entry)
                 else:
                     # Single-node config
                     tp = bmk[Fields.TP.value]
@@ -458,20 +642,7 @@ def generate_test_config_sweep(args, all_config_data):
                     spec_decoding = bmk.get(Fields.SPEC_DECODING.value, "none")
 
                     # Get concurrency values
-                    if Fields.CONC_LIST.value in bmk:
-                        conc_values = bmk[Fields.CONC_LIST.value]
-                    else:
-                        conc_start = bmk[Fields.CONC_START.value]
-                        conc_end = bmk[Fields.CONC_END.value]
-                        conc_values = []
-                        conc = conc_start
-                        while conc <= conc_end:
-                            conc_values.append(conc)
-                            if conc == conc_end:
-                                break
-                            conc *= 2
-                            if conc > conc_end:
-                                conc = conc_end
+                    conc_values = expand_conc_values(bmk)
 
                     for conc in conc_values:
                         entry = {
@@ -483,6 +654,7 @@ def generate_test_config_sweep(args, all_config_data):
                             Fields.RUNNER.value: runner,
                             Fields.ISL.value: isl,
                             Fields.OSL.value: osl,
+                            Fields.RANDOM_RANGE_RATIO.value: random_range_ratio,
                             Fields.TP.value: tp,
                             Fields.CONC.value: conc,
                             Fields.MAX_MODEL_LEN.value: isl + osl + 200,
@@ -492,12 +664,17 @@ def generate_test_config_sweep(args, all_config_data):
                             Fields.EXP_NAME.value: f"{model_code}_{seq_len_str}",
                             Fields.DISAGG.value: disagg,
                         }
-                        matrix_values.append(validate_matrix_entry(entry, is_multinode=False))
+                        matrix_values.append(validate_matrix_entry(entry, is_multinode=False) if validate_entries else entry)
 
     return matrix_values
 
 
-def main():
+def build_parser():
+    """Build the command line parser of this script.
+
+    Other tools can generate matrices in-process with
+    generate_matrix(build_parser().parse_args([...]), all_config_data, runner_data).
+    """
     # Create parent parser with common arguments
     parent_parser = argparse.ArgumentParser(add_help=False)
     parent_parser.add_argument(
@@ -511,6 +688,25 @@ def main():
         required=True,
         help='Configuration file holding runner information (YAML format)'
     )
+    parent_parser.add_argument(
+        '--validation',
+        choices=['entry', 'bulk', 'none'],
+        default='entry',
+        help='How generated matrix entries are validated: one by one as they are generated (entry), '
+             'all at once after generation (bulk), or not at all (none), for matrices of an '
+             'already validated master config (default: entry)'
+    )
+    parent_parser.add_argument(
+        '--skip-capacity-check',
+        action='store_true',
+        help='Do not check the search spaces of the master configs against the hardware of their '
+             'runners (GPUs per node, HBM per GPU) before generating'
+    )
+    parent_parser.add_argument(
+        '--config-cache-dir',
+        help='Directory for pre-validated snapshots of the config files, reused while the files are '
+             'unchanged (default: $INFMAX_CONFIG_CACHE_DIR, no caching if unset)'
+    )
 
     # Create main parser
     parser = argparse.ArgumentParser(
@@ -558,9 +754,11 @@ def main():
     full_sweep_parser.add_argument(
         '--seq-lens',
         nargs='+',
-        choices=list(seq_len_stoi.keys()),
+        choices=list(seq_len_stoi().keys()),
         required=False,
-        help=f"Sequence length configurations to include: {', '.join(seq_len_stoi.keys())}. If not specified, all sequence lengths are included."
+        help=f"Sequence length profiles to include (from seq-len-profiles.yaml): {', '.join(seq_len_stoi().keys())}. "
+             "Seq-len-configs that give isl and osl directly match the profile with the same lengths. "
+             "If not specified, all sequence lengths are included."
     )
     full_sweep_parser.add_argument(
         '--step-size',
@@ -586,6 +784,111 @@ def main():
         required=False,
         help='Maximum expert parallelism value to include (single-node only)'
     )
+    full_sweep_parser.add_argument(
+        '--adaptive-stride',
+        type=int,
+        required=False,
+        help='Adaptive search, first pass: only run every Nth concurrency of each ladder plus the '
+             'last one. With --refine-from, the pass run by series without measurements '
+             '(single-node only)'
+    )
+    full_sweep_parser.add_argument(
+        '--refine-from',
+        required=False,
+        help='Adaptive search, refinement pass: results directory or aggregated results JSON of '
+             'the previous passes; only concurrencies between measured ones where throughput is '
+             'still growing and latency is within bounds are run. Series without measurements '
+             'run their --adaptive-stride pass, or their full ladder (single-node only)'
+    )
+    full_sweep_parser.add_argument(
+        '--plateau-threshold',
+        type=float,
+        default=DEFAULT_PLATEAU_THRESHOLD,
+        help='Minimum relative throughput gain across an interval for --refine-from to refine it '
+             f'(default: {DEFAULT_PLATEAU_THRESHOLD})'
+    )
+    full_sweep_parser.add_argument(
+        '--min-intvty',
+        type=float,
+        required=False,
+        help='Latency bound for --refine-from: minimum median interactivity (tok/s/user)'
+    )
+    full_sweep_parser.add_argument(
+        '--max-ttft',
+        type=float,
+        required=False,
+        help='Latency bound for --refine-from: maximum median TTFT (ms)'
+    )
+    full_sweep_parser.add_argument(
+        '--prune-history',
+        required=False,
+        help='Historical results store: a directory with one results directory or aggregated '
+             'results JSON per sweep, ordered by name. Points dominated in each of the last '
+             '--prune-min-sweeps sweeps are pruned, and reported on stderr (single-node only)'
+    )
+    full_sweep_parser.add_argument(
+        '--prune-min-sweeps',
+        type=int,
+        default=DEFAULT_PRUNE_MIN_SWEEPS,
+        help=f'Number of most recent sweeps a point must be dominated in to be pruned (default: {DEFAULT_PRUNE_MIN_SWEEPS})'
+    )
+    full_sweep_parser.add_argument(
+        '--prune-margin',
+        type=float,
+        default=DEFAULT_PRUNE_MARGIN,
+        help='Relative margin by which another point must beat both the throughput per GPU and '
+             f'the interactivity of a point to dominate it (default: {DEFAULT_PRUNE_MARGIN})'
+    )
+    full_sweep_parser.add_argument(
+        '--no-prune',
+        action='store_true',
+        help='Force the full sweep, ignoring --prune-history'
+    )
+    full_sweep_parser.add_argument(
+        '--runtime-history',
+        required=False,
+        help='Results directory (e.g. the --prune-history store) to fit runtime estimates from. '
+             'Entries are annotated with est-minutes and the total GPU-hours are reported on stderr'
+    )
+    full_sweep_parser.add_argument(
+        '--startup-minutes',
+        type=float,
+        default=DEFAULT_STARTUP_MINUTES,
+        help=f'Estimated per-job startup overhead in minutes (default: {DEFAULT_STARTUP_MINUTES})'
+    )
+    full_sweep_parser.add_argument(
+        '--budget',
+        type=float,
+        required=False,
+        help='GPU-hour budget; interior concurrency points of single-node ladders are dropped, '
+             'lowest value first, until the estimated GPU-hours fit'
+    )
+    full_sweep_parser.add_argument(
+        '--schedule',
+        action='store_true',
+        help='Pin each entry to a node of its runner type (runner-node) by longest-job-first bin '
+             'packing on estimated runtimes, and report the makespan on stderr'
+    )
+    full_sweep_parser.add_argument(
+        '--shards',
+        type=int,
+        required=False,
+        help='Split the output into a list of this many matrices, balanced by estimated runtime, '
+             f'to stay within the limit of {MAX_MATRIX_JOBS} jobs per matrix'
+    )
+    full_sweep_parser.add_argument(
+        '--kv-conc',
+        choices=['clip', 'extend'],
+        help='Fit single-node concurrency ranges to the number of sequences whose KV cache fits on '
+             'the server: clip lowers conc-end where it is higher, extend also raises it where it '
+             'is lower. Applied before --max-conc.'
+    )
+    full_sweep_parser.add_argument(
+        '--batch-conc',
+        action='store_true',
+        help='Emit one entry per single-node series with conc as the list of its concurrencies, '
+             'all benchmarked against a single server launch sized for the largest one'
+    )
     node_type_group = full_sweep_parser.add_mutually_exclusive_group(required=True)
     node_type_group.add_argument(
         '--single-node',
@@ -657,22 +960,72 @@ def main():
         help='Show this help message and exit'
     )
 
-    args = parser.parse_args()
+    # Subcommand: diff
+    diff_parser = subparsers.add_parser(
+        'diff',
+        help='Compare two generated matrices by job-id and output only the jobs of the new one that '
+             'were added or changed. Counts of added, changed, unchanged and removed jobs go to stderr.'
+    )
+    diff_parser.add_argument(
+        'old_matrix',
+        help='Previously generated matrix JSON (a matrix or a list of shards)'
+    )
+    diff_parser.add_argument(
+        'new_matrix',
+        help='Newly generated matrix JSON (a matrix or a list of shards)'
+    )
+
+    return parser
 
-    # Load and validate configuration files (validation happens by default in load functions)
-    all_config_data = load_config_files(args.config_files)
-    runner_data = load_runner_file(args.runner_config)
 
-    # Route to appropriate function based on subcommand
+def generate_matrix(args, all_config_data, runner_data):
+    """Generate the matrix for parsed command line args from already loaded config data.
+
+    Every entry is given a job-id.
+    """
+    validate_entries = args.validation == 'entry'
     if args.command == 'full-sweep':
-        matrix_values = generate_full_sweep(args, all_config_data, runner_data)
+        matrix = generate_full_sweep(args, all_config_data, runner_data, validate_entries)
     elif args.command == 'runner-model-sweep':
-        matrix_values = generate_runner_model_sweep_config(
-            args, all_config_data, runner_data)
+        matrix = generate_runner_model_sweep_config(args, all_config_data, runner_data, validate_entries)
     elif args.command == 'test-config':
-        matrix_values = generate_test_config_sweep(args, all_config_data)
+        matrix = generate_test_config_sweep(args, all_config_data, validate_entries)
     else:
-        parser.error(f"Unknown command: {args.command}")
+        raise ValueError(f"Unknown command: {args.command}")
+
+    if args.validation == 'bulk':
+        validate_matrix_entries(list(iter_matrix_entries(matrix)))
+    return assign_job_ids(matrix)
+
+
+def diff_matrix_files(args):
+    """Return the added and changed jobs of the new matrix file, and report the diff on stderr."""
+    with open(args.old_matrix) as f:
+        old_matrix = json.load(f)
+    with open(args.new_matrix) as f:
+        new_matrix = json.load(f)
+
+    diff = diff_matrices(old_matrix, new_matrix)
+    print(format_diff_report(diff), file=sys.stderr)
+    rerun = {id(entry) for entry in diff['added'] + diff['changed']}
+    return assign_job_ids([entry for entry in iter_matrix_entries(new_matrix) if id(entry) in rerun])
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if args.command == 'diff':
+        matrix_values = diff_matrix_files(args)
+        print(json.dumps(matrix_values))
+        return matrix_values
+
+    # Load and validate configuration files (validation happens by default in load functions)
+    all_config_data = load_config_files(args.config_files, cache_dir=args.config_cache_dir)
+    runner_data = load_runner_file(args.runner_config, cache_dir=args.config_cache_dir)
+    if not args.skip_capacity_check:
+        enforce_capacity(all_config_data)
+
+    matrix_values = generate_matrix(args, all_config_data, runner_data)
 
     print(json.dumps(matrix_values))
     return matrix_values
@@ -0,0 +1,98 @@
+"""Stable identities for matrix entries, and diffs between matrices.
+
+The job-id of an entry is a hash of its canonical JSON: everything that determines what the job
+runs (image, model, parallelism, sequence lengths, concurrency, additional settings, ...), but
+not the annotations that only depend on how the matrix was generated (estimated runtime,
+assigned runner node). Entries that hash the same run the same benchmark, so a job whose id was
+already in an earlier matrix doesn't need to run again if its results were kept.
+
+To tell changed jobs from added ones, diff_matrices also matches entries by slot: the point a
+job measures, i.e. its job-id fields except the image, model, max model length and additional
+settings.
+"""
+import hashlib
+import json
+
+from validation import Fields
+
+JOB_ID_LENGTH = 16
+
+# Annotations that don't change what a job runs
+_ANNOTATION_FIELDS = {Fields.JOB_ID.value, Fields.INPUT_HASH.value, Fields.EST_MINUTES.value,
+                      Fields.RUNNER_NODE.value}
+
+# Fields that don't change which point a job measures, only how it is run
+_SETTINGS_FIELDS = {Fields.IMAGE.value, Fields.MODEL.value, Fields.MAX_MODEL_LEN.value}
+
+
+def _hash(data) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:JOB_ID_LENGTH]
+
+
+def job_id(entry: dict) -> str:
+    """Content hash of the effective configuration of a matrix entry."""
+    return _hash({field: value for field, value in entry.items() if field not in _ANNOTATION_FIELDS})
+
+
+def job_slot(entry: dict) -> str:
+    """Hash of the point a matrix entry measures, independent of the image and engine settings."""
+    slot = {}
+    for field, value in entry.items():
+        if field in _ANNOTATION_FIELDS or field in _SETTINGS_FIELDS:
+            continue
+        if field in (Fields.PREFILL.value, Fields.DECODE.value):
+            value = {k: v for k, v in value.items() if k != Fields.ADDITIONAL_SETTINGS.value}
+        slot[field] = value
+    return _hash(slot)
+
+
+def iter_matrix_entries(matrix: list):
+    """Yield the entries of a matrix, or of every matrix in a list of shards."""
+    for item in matrix:
+        if isinstance(item, list):
+            yield from item
+        else:
+            yield item
+
+
+def assign_job_ids(matrix: list) -> list:
+    """Set job-id on every entry of a matrix (or list of shards), in place."""
+    for entry in iter_matrix_entries(matrix):
+        entry[Fields.JOB_ID.value] = job_id(entry)
+    return matrix
+
+
+def diff_matrices(old_matrix: list, new_matrix: list) -> dict:
+    """Compare two matrices by job-id.
+
+    Returns:
+        Dict with the entries of new_matrix that are 'added' (no job in old_matrix measures the
+        same point) or 'changed' (the point was measured, but with a different configuration),
+        the entries of new_matrix that are 'unchanged', and the entries of old_matrix that were
+        'removed'. Entries keep matrix order.
+    """
+    old_entries = list(iter_matrix_entries(old_matrix))
+    new_entries = list(iter_matrix_entries(new_matrix))
+    old_ids = {job_id(entry) for entry in old_entries}
+    old_slots = {job_slot(entry) for entry in old_entries}
+    new_ids = {job_id(entry) for entry in new_entries}
+    new_slots = {job_slot(entry) for entry in new_entries}
+
+    diff = {'added': [], 'changed': [], 'unchanged': [], 'removed': []}
+    for entry in new_entries:
+        if job_id(entry) in old_ids:
+            diff['unchanged'].append(entry)
+        elif job_slot(entry) in old_slots:
+            diff['changed'].append(entry)
+        else:
+            diff['added'].append(entry)
+    diff['removed'] = [entry for entry in old_entries
+                       if job_id(entry) not in new_ids and job_slot(entry) not in new_slots]
+    return diff
+
+
+def format_diff_report(diff: dict) -> str:
+    """Summarize a matrix diff."""
+    return (f"{len(diff['added'])} added, {len(diff['changed'])} changed, "
+            f"{len(diff['unchanged'])} unchanged, {len(diff['removed'])} removed job(s)")
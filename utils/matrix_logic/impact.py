@@ -0,0 +1,65 @@
+"""Config keys affected by changes to the repository files they execute.
+
+A changelog entry names the config keys its change should re-run, but the change itself is a
+diff. impacted_config_keys maps the paths a diff touches to the config keys that actually run
+them: a config key executes the launch scripts of its runner's nodes, the benchmark script those
+launch scripts pick for it, and benchmark_lib.sh (see job_inputs.py). A changed master config
+affects the keys whose definition was added or changed. Paths no config key executes are ignored.
+"""
+from collections import defaultdict
+
+from job_inputs import JobInputs
+
+
+def changed_config_keys(old_master_config: dict, new_master_config: dict) -> list:
+    """Sorted config keys that were added or whose definition changed between two master configs."""
+    return sorted(key for key, config in new_master_config.items()
+                  if old_master_config.get(key) != config)
+
+
+def config_keys_executing(master_config: dict, job_inputs: JobInputs) -> dict:
+    """Map each repository file to the sorted config keys that may execute it."""
+    keys_by_path = defaultdict(list)
+    for key, config in master_config.items():
+        # The files a job executes only depend on fields every config shares with its entries
+        for path in job_inputs.entry_files(config):
+            keys_by_path[path].append(key)
+    return {path: sorted(keys) for path, keys in keys_by_path.items()}
+
+
+def impacted_config_keys(changed_paths: list, master_config: dict, job_inputs: JobInputs,
+                         old_master_config: dict = None) -> dict:
+    """Map each config key affected by a change to the sorted changed paths that affect it.
+
+    Args:
+        changed_paths: Repository paths touched by the change.
+        master_config: Master config after the change.
+        job_inputs: Resolver for the files config keys execute, after the change.
+        old_master_config: Master config before the change. Master config changes are only
+            considered if given.
+    """
+    keys_by_path = config_keys_executing(master_config, job_inputs)
+    impact = defaultdict(set)
+    for path in changed_paths:
+        for key in keys_by_path.get(path, []):
+            impact[key].add(path)
+
+    if old_master_config is not None:
+        for key in changed_config_keys(old_master_config, master_config):
+            impact[key].add('master config')
+    return {key: sorted(paths) for key, paths in sorted(impact.items())}
+
+
+def format_impact_report(impact: dict, requested_keys: list) -> str:
+    """Summarize how the config keys a change affects compare to the keys requested for it."""
+    requested = set(requested_keys)
+    missed = [key for key in impact if key not in requested]
+    unaffected = sorted(requested - set(impact))
+    lines = [f"{len(impact)} config key(s) affected by the change, {len(requested)} requested"]
+    if missed:
+        lines.append("  Affected but not requested:")
+        lines.extend(f"    {key} ({', '.join(impact[key])})" for key in missed)
+    if unaffected:
+        lines.append("  Requested but not affected by any changed file:")
+        lines.extend(f"    {key}" for key in unaffected)
+    return "\n".join(lines)
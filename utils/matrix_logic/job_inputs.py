@@ -0,0 +1,112 @@
+"""Repository files a matrix entry executes, and a content hash over everything a job depends on.
+
+A job runs on a node of its runner type, which executes runners/launch_<node prefix>.sh. The
+launch script in turn runs the benchmarks/ script named on its `benchmarks/...` line, with the
+model prefix, precision and framework of the entry substituted, and benchmark scripts source
+benchmarks/benchmark_lib.sh. Which files an entry executes is read off the scripts themselves,
+so new launch scripts are picked up without changes here.
+
+The input hash of an entry combines its job-id (image, model, flags, sequence lengths,
+concurrency, ...) with the contents of all of those files. Images are hashed by reference: a
+mutable tag (e.g. `latest` or a nightly) can be re-pushed without changing the hash, so only
+images pinned by digest (see image_pinned) have an exact input hash.
+"""
+import hashlib
+import re
+from pathlib import Path
+
+from identity import JOB_ID_LENGTH, job_id
+from validation import Fields
+
+BENCHMARK_LIB = 'benchmarks/benchmark_lib.sh'
+
+# `benchmarks/<name>.sh` in a launch script, optionally quoted after the directory
+_BENCHMARK_SCRIPT_PATTERN = re.compile(r'benchmarks/"?([^"\s]+\.sh)"?')
+
+
+def image_pinned(image: str) -> bool:
+    """Whether an image reference is pinned by digest, i.e. always resolves to the same image."""
+    return '@sha256:' in image
+
+
+def launch_script(node: str) -> str:
+    """Launch script of a runner node, as chosen by the benchmark templates (${RUNNER_NAME%%_*})."""
+    return f"runners/launch_{node.split('_')[0]}.sh"
+
+
+def _script_variables(entry: dict) -> dict:
+    model_prefix = entry[Fields.MODEL_PREFIX.value]
+    framework = entry[Fields.FRAMEWORK.value]
+    return {
+        '${EXP_NAME%%_*}': model_prefix,
+        '${MODEL_CODE}': model_prefix,
+        '${PRECISION}': entry[Fields.PRECISION.value],
+        '${FRAMEWORK_SUFFIX}': '_trt' if framework == 'trt' else '',
+        '${FRAMEWORK}': framework,
+    }
+
+
+class JobInputs:
+    """Resolves the files matrix entries execute, reading each file at most once."""
+
+    def __init__(self, runner_data: dict, repo_root: str = '.'):
+        self.runner_data = runner_data
+        self.repo_root = Path(repo_root)
+        self._contents = {}
+
+    def read(self, path: str):
+        """Contents of a repository file, or None if it doesn't exist."""
+        if path not in self._contents:
+            try:
+                self._contents[path] = (self.repo_root / path).read_bytes()
+            except FileNotFoundError:
+                self._contents[path] = None
+        return self._contents[path]
+
+    def benchmark_scripts(self, launch_script_path: str, entry: dict) -> list:
+        """Benchmark scripts a launch script runs for an entry."""
+        contents = self.read(launch_script_path)
+        if contents is None:
+            return []
+        variables = _script_variables(entry)
+        scripts = []
+        for name in _BENCHMARK_SCRIPT_PATTERN.findall(contents.decode(errors='replace')):
+            for variable, value in variables.items():
+                name = name.replace(variable, value)
+            scripts.append(f"benchmarks/{name}")
+        return scripts
+
+    def entry_files(self, entry: dict) -> list:
+        """Sorted paths of the existing repository files an entry may execute.
+
+        Entries that were pinned to a runner-node only run that node's launch script; others may
+        run on any node of their runner type.
+        """
+        node = entry.get(Fields.RUNNER_NODE.value)
+        nodes = [node] if node else self.runner_data.get(entry[Fields.RUNNER.value], [])
+
+        files = set()
+        for launch_script_path in {launch_script(n) for n in nodes}:
+            files.add(launch_script_path)
+            for script in self.benchmark_scripts(launch_script_path, entry):
+                contents = self.read(script)
+                if contents is None:
+                    continue
+                files.add(script)
+                if b'benchmark_lib.sh' in contents:
+                    files.add(BENCHMARK_LIB)
+        return sorted(path for path in files if self.read(path) is not None)
+
+    def input_hash(self, entry: dict) -> str:
+        """Hash of the entry's job-id and the contents of every file it may execute."""
+        digest = hashlib.sha256(job_id(entry).encode())
+        for path in self.entry_files(entry):
+            digest.update(b'\0' + path.encode() + b'\0')
+            digest.update(hashlib.sha256(self.read(path)).digest())
+        return digest.hexdigest()[:JOB_ID_LENGTH]
+
+    def assign_input_hashes(self, matrix_values: list) -> list:
+        """Set input-hash on every entry, in place."""
+        for entry in matrix_values:
+            entry[Fields.INPUT_HASH.value] = self.input_hash(entry)
+        return matrix_values
@@ -0,0 +1,87 @@
+"""Resolution of changelog config-keys patterns against the master config keys.
+
+A changelog entry names config keys exactly or with '*' wildcards (e.g. dsr1-fp8-*-sglang).
+ConfigKeyResolver compiles all patterns of a changelog diff together and resolves them in a
+single pass over the master config keys. Exact patterns are looked up directly. Wildcard
+patterns are combined into one compiled alternation, so a key that matches none of them is
+rejected with a single regex match, and are indexed in a trie by their literal prefix (the part
+before the first '*'), so a key that does match is only checked against the patterns whose prefix
+it starts with.
+"""
+import re
+
+# Trie node key holding the indices of the patterns whose literal prefix ends at that node
+_PATTERNS = ''
+
+
+def _pattern_regex(pattern: str) -> str:
+    return re.escape(pattern).replace(r"\*", ".*")
+
+
+class ConfigKeyResolver:
+    """Compiled set of config-keys patterns."""
+
+    def __init__(self, patterns: list):
+        # Repeated patterns only need to be resolved once
+        self.patterns = list(dict.fromkeys(patterns))
+        self._exact = {pattern for pattern in self.patterns if "*" not in pattern}
+        self._wildcards = [pattern for pattern in self.patterns if "*" in pattern]
+        self._regexes = [re.compile(_pattern_regex(pattern)) for pattern in self._wildcards]
+        self._any_wildcard = (
+            re.compile("|".join(f"(?:{_pattern_regex(p)})" for p in self._wildcards))
+            if self._wildcards else None
+        )
+        self._trie = {}
+        for idx, pattern in enumerate(self._wildcards):
+            node = self._trie
+            for char in pattern[:pattern.index("*")]:
+                node = node.setdefault(char, {})
+            node.setdefault(_PATTERNS, []).append(idx)
+
+    def _candidates(self, key: str):
+        """Indices of the wildcard patterns whose literal prefix the key starts with."""
+        node = self._trie
+        yield from node.get(_PATTERNS, [])
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return
+            yield from node.get(_PATTERNS, [])
+
+    def resolve(self, master_keys) -> dict:
+        """Match every pattern against the master config keys.
+
+        Returns:
+            Dict mapping each pattern, in first-seen order, to the sorted keys it matched.
+
+        Raises:
+            ValueError: If a pattern matches no key.
+        """
+        matches = {pattern: [] for pattern in self.patterns}
+        for key in sorted(master_keys):
+            if key in self._exact:
+                matches[key].append(key)
+            if self._any_wildcard is None or not self._any_wildcard.fullmatch(key):
+                continue
+            for idx in self._candidates(key):
+                if self._regexes[idx].fullmatch(key):
+                    matches[self._wildcards[idx]].append(key)
+
+        for pattern, keys in matches.items():
+            if keys:
+                continue
+            if "*" in pattern:
+                raise ValueError(
+                    f"No config keys matched the wildcard pattern '{pattern}' in master configs.")
+            raise ValueError(f"Config key '{pattern}' not found in master configs.")
+        return matches
+
+
+def format_resolution_report(matches: dict) -> str:
+    """Summarize which keys each wildcard pattern matched."""
+    lines = [f"Resolved {len(matches)} config-keys pattern(s) to "
+             f"{len({key for keys in matches.values() for key in keys})} config key(s)"]
+    for pattern, keys in matches.items():
+        if "*" in pattern:
+            lines.append(f"  {pattern}: {', '.join(keys)}")
+    return "\n".join(lines)
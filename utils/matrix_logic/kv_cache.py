@@ -0,0 +1,131 @@
+"""KV cache sizing: the highest concurrency a single-node server can keep resident.
+
+Beyond the number of sequences whose KV cache fits in HBM, extra concurrency only queues
+requests in the server, so those sweep points measure the same throughput at worse latency.
+max_concurrency estimates that number for a search-space entry from the cache geometry of the
+model and the hardware profile of its runner (see capacity.py):
+
+- The HBM left for the KV cache is the usable HBM of a GPU minus the weights it holds.
+- MLA models (DeepSeek) cache one latent vector per token and layer, which every TP rank holds
+  in full. GQA models cache K and V per KV head, and KV heads are split across TP ranks (and
+  replicated once TP exceeds their number).
+- With DP attention every rank serves its own sequences with unsplit attention, so the
+  capacity of one rank is multiplied by the TP degree.
+- Sliding window layers cache at most the window.
+
+A sequence is sized at its full isl + osl. The KV cache is assumed to be stored in FP8 for FP4
+checkpoints and in BF16 otherwise. Expert parallelism only changes where expert weights live,
+which is already accounted for by sharding the weights over all TP ranks. Extending a range stops
+at MAX_EXTENDED_CONC, the largest batch the benchmark scripts size their servers for
+(--max-running-requests, max_batch_size, ...).
+"""
+import math
+from typing import NamedTuple, Optional
+
+from capacity import HARDWARE_PROFILES, USABLE_HBM_FRACTION, weights_gb_per_gpu
+from validation import Fields
+
+
+# Largest batch the benchmark scripts configure servers for; ranges are not extended past it
+MAX_EXTENDED_CONC = 512
+
+
+class KVCacheGeometry(NamedTuple):
+    layers: int
+    # Cached vectors per token and layer: KV heads for GQA, 1 for MLA
+    kv_heads: int
+    # Elements per cached vector: head dim for GQA, latent plus rope dim for MLA
+    head_dim: int
+    mla: bool = False
+    sliding_window: Optional[int] = None
+    sliding_window_layers: int = 0
+
+
+MODEL_GEOMETRIES = {
+    # DeepSeek-R1: kv_lora_rank 512 + qk_rope_head_dim 64
+    'dsr1': KVCacheGeometry(layers=61, kv_heads=1, head_dim=576, mla=True),
+    # gpt-oss-120b: every other layer uses a 128 token sliding window
+    'gptoss': KVCacheGeometry(layers=36, kv_heads=8, head_dim=64, sliding_window=128, sliding_window_layers=18),
+}
+
+
+def kv_cache_bytes(precision: str) -> int:
+    """Bytes per cached element."""
+    return 1 if precision == 'fp4' else 2
+
+
+def sequence_bytes_per_gpu(geometry: KVCacheGeometry, tokens: int, tp: int, dp_attn: bool,
+                           element_bytes: int) -> int:
+    """KV cache bytes one sequence of the given length takes on each GPU that holds it."""
+    if geometry.mla:
+        # One latent (no separate V) per token and layer, held in full by every rank
+        bytes_per_layer_token = geometry.head_dim * element_bytes
+    else:
+        kv_heads = geometry.kv_heads if dp_attn else math.ceil(geometry.kv_heads / tp)
+        bytes_per_layer_token = 2 * kv_heads * geometry.head_dim * element_bytes
+
+    full_layers = geometry.layers - geometry.sliding_window_layers
+    window_tokens = min(geometry.sliding_window, tokens) if geometry.sliding_window else 0
+    return bytes_per_layer_token * (full_layers * tokens + geometry.sliding_window_layers * window_tokens)
+
+
+def max_concurrency(config: dict, isl: int, osl: int, tp: int, dp_attn: bool = False) -> Optional[int]:
+    """Highest concurrency whose KV cache fits on a single-node server of a master config entry.
+
+    Returns:
+        The number of isl + osl sequences the server can hold, or None if the model geometry,
+        weight size or runner hardware is unknown.
+    """
+    geometry = MODEL_GEOMETRIES.get(config[Fields.MODEL_PREFIX.value])
+    profile = HARDWARE_PROFILES.get(config[Fields.RUNNER.value])
+    weights_gb = weights_gb_per_gpu(config, tp)
+    if geometry is None or profile is None or weights_gb is None:
+        return None
+
+    free_bytes = (profile.hbm_gb * USABLE_HBM_FRACTION - weights_gb) * 1e9
+    if free_bytes <= 0:
+        return 0
+    per_sequence = sequence_bytes_per_gpu(
+        geometry, isl + osl, tp, dp_attn, kv_cache_bytes(config[Fields.PRECISION.value]))
+    return int(free_bytes // per_sequence) * (tp if dp_attn else 1)
+
+
+def fit_conc_range(conc_start: int, conc_end: int, max_conc: int, mode: str,
+                   step_size: int = 2, max_extended_conc: int = MAX_EXTENDED_CONC) -> tuple:
+    """Fit a conc-start..conc-end range to the maximum concurrency of its server.
+
+    The new end is the highest value of the conc-start * step_size^k ladder that fits, or
+    conc-start if none does, so the lowest concurrency is always kept.
+
+    Args:
+        mode: 'clip' only lowers ends above max_conc; 'extend' also raises ends below it, up to
+            max_extended_conc.
+
+    Returns:
+        Tuple of (conc_start, conc_end).
+    """
+    ladder_end = conc_start
+    while ladder_end * step_size <= max_conc:
+        ladder_end *= step_size
+
+    if conc_end > max_conc:
+        return conc_start, ladder_end
+    if mode == 'extend':
+        while ladder_end > max(max_extended_conc, conc_start):
+            ladder_end //= step_size
+        return conc_start, max(conc_end, ladder_end)
+    return conc_start, conc_end
+
+
+def format_kv_conc_report(adjustments: list) -> str:
+    """Summarize the concurrency ranges changed to fit the KV cache.
+
+    Args:
+        adjustments: (config key, isl, osl, tp, old conc-end, new conc-end) tuples.
+    """
+    clipped = sum(1 for *_, old, new in adjustments if new < old)
+    lines = [f"Fit {len(adjustments)} concurrency range(s) to the KV cache: "
+             f"{clipped} clipped, {len(adjustments) - clipped} extended"]
+    for key, isl, osl, tp, old, new in adjustments:
+        lines.append(f"  {key} isl={isl} osl={osl} tp={tp}: conc-end {old} -> {new}")
+    return "\n".join(lines)
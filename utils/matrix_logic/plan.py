@@ -0,0 +1,94 @@
+"""Dry-run plans of changelog sweeps: what each perf-changelog.yaml entry would run and cost.
+
+A config-keys pattern like gptoss* can expand to hundreds of jobs. format_plan_report lists, for
+each changelog entry, the config keys its patterns expand to, the jobs it would run per runner
+type and sequence length, their estimated GPU-hours (see cost_model.py) and the queue time:
+the makespan of the jobs on the nodes of each runner type from runners.yaml (see scheduling.py),
+assuming the sweep has those nodes to itself. The totals schedule the jobs of all entries
+together, as run-sweep.yml runs them.
+"""
+from collections import defaultdict
+from typing import NamedTuple
+
+from cost_model import DEFAULT_BENCHMARK_MINUTES, DEFAULT_STARTUP_MINUTES, entry_gpu_hours
+from generate_sweep_configs import entry_seq_len_name
+from scheduling import schedule_lpt
+from validation import Fields
+
+
+class EntryPlan(NamedTuple):
+    pr_link: str
+    # config-keys pattern -> config keys it expands to
+    matches: dict
+    # Config keys run as part of this entry; keys already run by an earlier entry are omitted
+    config_keys: list
+    # Matrix entries that would run, with est-minutes
+    jobs: list
+
+
+def job_breakdown(jobs: list) -> dict:
+    """Number of jobs and GPU-hours per (runner type, seq-len profile name), sorted."""
+    breakdown = defaultdict(lambda: [0, 0.0])
+    for job in jobs:
+        group = breakdown[(job[Fields.RUNNER.value], entry_seq_len_name(job))]
+        group[0] += 1
+        group[1] += entry_gpu_hours(job)
+    return {group: tuple(totals) for group, totals in sorted(breakdown.items())}
+
+
+def queue_minutes(jobs: list, runner_data: dict) -> dict:
+    """Makespan in minutes of the jobs of each runner type on its nodes, sorted by runner type."""
+    # Schedule copies so that the jobs are not pinned to nodes
+    schedule = schedule_lpt([dict(job) for job in jobs], runner_data)
+    return {runner: max(load for _, load, _ in nodes) for runner, nodes in sorted(schedule.items())}
+
+
+def _format_queue(queue: dict, runner_data: dict) -> str:
+    return ", ".join(f"{runner} {minutes / 60:.1f} h on {len(runner_data[runner])} node(s)"
+                     for runner, minutes in queue.items())
+
+
+def format_plan_report(plans: list, runner_data: dict, cached_jobs: int = 0, has_history: bool = True) -> str:
+    """Describe what each changelog entry of a sweep would run and what it would cost.
+
+    Args:
+        plans: EntryPlan of every added changelog entry, in changelog order.
+        runner_data: Runner type to node names, as loaded from runners.yaml.
+        cached_jobs: Number of jobs whose results would be reused instead of run.
+        has_history: Whether the est-minutes of the jobs were fit from historical results. If not,
+            the report warns that GPU-hours and queue times only reflect job counts.
+    """
+    all_jobs = [job for plan in plans for job in plan.jobs]
+    total_queue = queue_minutes(all_jobs, runner_data)
+    lines = [
+        f"Sweep plan for {len(plans)} changelog entry(ies): {len(all_jobs)} job(s), "
+        f"{sum(entry_gpu_hours(job) for job in all_jobs):.1f} GPU-hours, "
+        f"queue time {max(total_queue.values(), default=0) / 60:.1f} h"
+    ]
+    if not has_history:
+        lines.append(f"  Warning: no runtime history, jobs are estimated at the defaults of "
+                     f"{DEFAULT_STARTUP_MINUTES:.0f} minutes startup plus {DEFAULT_BENCHMARK_MINUTES:.0f} "
+                     f"minutes per concurrency; GPU-hours and queue times only reflect job counts")
+    if cached_jobs:
+        lines.append(f"  {cached_jobs} job(s) reuse cached results and are not counted")
+    if total_queue:
+        lines.append(f"  Queue: {_format_queue(total_queue, runner_data)}")
+
+    for idx, plan in enumerate(plans, 1):
+        lines.append("")
+        lines.append(f"Entry {idx} ({plan.pr_link}): {len(plan.config_keys)} config key(s), "
+                     f"{len(plan.jobs)} job(s), {sum(entry_gpu_hours(job) for job in plan.jobs):.1f} GPU-hours")
+        for pattern, keys in plan.matches.items():
+            if keys != [pattern]:
+                lines.append(f"  {pattern} -> {len(keys)} config key(s)")
+        if plan.config_keys:
+            lines.append(f"  Config keys: {', '.join(plan.config_keys)}")
+        # Keys run by an earlier entry, or not affected by the change with --narrow-to-impact
+        skipped = sorted({key for keys in plan.matches.values() for key in keys} - set(plan.config_keys))
+        if skipped:
+            lines.append(f"  Not run by this entry: {', '.join(skipped)}")
+        for (runner, seq_len), (count, gpu_hours) in job_breakdown(plan.jobs).items():
+            lines.append(f"  {runner} {seq_len}: {count} job(s), {gpu_hours:.1f} GPU-hours")
+        if plan.jobs:
+            lines.append(f"  Queue: {_format_queue(queue_minutes(plan.jobs, runner_data), runner_data)}")
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+"""Pruning of consistently dominated single-node sweep points using historical results.
+
+A sweep point (one single-node job: its series plus conc, see adaptive.sweep_point_key) is
+dominated in a sweep if another point of the same model, precision, framework, runner and sequence
+lengths achieved at least (1 + margin) times its throughput per GPU *and* its interactivity. Points
+dominated in each of the most recent sweeps of a history store are pruned from the matrix.
+
+Since a pruned point is not measured in the next sweep, it stops qualifying and is run again the
+sweep after, so dominated points are re-checked every min_sweeps + 1 sweeps rather than dropped for
+good.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from pathlib import Path
+
+from adaptive import iter_single_node_results, result_point_key
+from cost_model import result_num_prompts
+
+DEFAULT_PRUNE_MARGIN = 0.05
+DEFAULT_PRUNE_MIN_SWEEPS = 3
+
+
+def load_history(history_dir: str) -> list:
+    """Load a historical results store, one sweep per entry of history_dir.
+
+    Each entry is a results directory or an aggregated results JSON. Sweeps are ordered by entry
+    name, so names should sort chronologically (e.g. dates or workflow run IDs).
+
+    Returns:
+        List of sweeps, oldest first, each a dict of (sweep_point_key, conc) -> result.
+    """
+    history_path = Path(history_dir)
+    if not history_path.is_dir():
+        raise ValueError(f"History directory '{history_dir}' does not exist.")
+
+    history = []
+    for sweep_path in sorted(history_path.iterdir()):
+        sweep = {
+            (result_point_key(r), int(r['conc'])): r
+            for r in iter_single_node_results(sweep_path)
+            if r['tput_per_gpu'] > 0
+        }
+        if sweep:
+            history.append(sweep)
+    return history
+
+
+def dominated_points(sweep: dict, margin: float = DEFAULT_PRUNE_MARGIN) -> set:
+    """Return the keys of the points of one sweep that are dominated by a margin.
+
+    Points are compared within groups of the same model, precision, framework, runner and sequence
+    lengths. Within a group, points are sorted by throughput so the best interactivity among
+    all points with enough throughput to dominate a point is a prefix maximum.
+    """
+    if margin <= 0:
+        raise ValueError(f"Prune margin must be positive, got {margin}.")
+
+    groups = defaultdict(list)
+    for key, result in sweep.items():
+        point, _ = key
+        groups[point[:6]].append((result['tput_per_gpu'], result['median_intvty'], key))
+
+    dominated = set()
+    for points in groups.values():
+        points.sort(key=lambda p: -p[0])
+        neg_tputs = [-tput for tput, _, _ in points]
+        best_intvty = []
+        for _, intvty, _ in points:
+            best_intvty.append(max(intvty, best_intvty[-1]) if best_intvty else intvty)
+
+        for tput, intvty, key in points:
+            # Number of points with tput_per_gpu >= (1 + margin) * tput
+            n = bisect_right(neg_tputs, -(1 + margin) * tput)
+            if n and best_intvty[n - 1] >= (1 + margin) * intvty:
+                dominated.add(key)
+    return dominated
+
+
+def consistently_dominated(history: list, min_sweeps: int = DEFAULT_PRUNE_MIN_SWEEPS,
+                           margin: float = DEFAULT_PRUNE_MARGIN) -> dict:
+    """Points dominated in each of the last min_sweeps sweeps of history.
+
+    Returns:
+        Dict mapping (sweep_point_key, conc) to the point's result in the latest sweep.
+        Empty if history holds fewer than min_sweeps sweeps.
+    """
+    if min_sweeps < 1:
+        raise ValueError(f"Prune min sweeps must be at least 1, got {min_sweeps}.")
+    if len(history) < min_sweeps:
+        return {}
+
+    recent = history[-min_sweeps:]
+    pruned = dominated_points(recent[0], margin)
+    for sweep in recent[1:]:
+        pruned &= dominated_points(sweep, margin)
+    return {key: recent[-1][key] for key in pruned}
+
+
+def estimate_gpu_hours(result: dict) -> float:
+    """GPU-hours of a job's benchmark phase, estimated from its measured throughput per GPU.
+
+    The job processes result_num_prompts(result) requests of ISL + OSL tokens, so GPU-seconds are
+    total tokens over throughput per GPU. Server startup is not included.
+    """
+    tokens = result_num_prompts(result) * (int(result['isl']) + int(result['osl']))
+    return tokens / result['tput_per_gpu'] / 3600
+
+
+def format_pruning_report(pruned_results: list) -> str:
+    """Summarize pruned points and the GPU-hours their jobs took in the latest sweep."""
+    gpu_hours = sum(estimate_gpu_hours(r) for r in pruned_results)
+    lines = [f"Pruned {len(pruned_results)} dominated sweep point(s), "
+             f"saving an estimated {gpu_hours:.2f} GPU-hours:"]
+    for r in sorted(pruned_results, key=lambda r: (r['infmax_model_prefix'], r['precision'], r['hw'],
+                                                   r['framework'], r['isl'], r['osl'], r['tp'], r['ep'],
+                                                   r['conc'])):
+        lines.append(
+            f"  {r['infmax_model_prefix']}-{r['precision']}-{r['hw']}-{r['framework']} "
+            f"isl={r['isl']} osl={r['osl']} tp={r['tp']} ep={r['ep']} "
+            f"dp-attn={str(r['dp_attention']).lower()} conc={r['conc']} "
+            f"({estimate_gpu_hours(r):.2f} GPU-hours)")
+    return "\n".join(lines)
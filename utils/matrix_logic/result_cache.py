@@ -0,0 +1,54 @@
+"""Reuse of earlier results for matrix entries whose inputs haven't changed.
+
+process_result.py records the input-hash of the job that produced a result (see job_inputs.py).
+Given a store of earlier results, a matrix entry is a cache hit if results with its input hash
+cover all of its concurrencies, in which case those results can be reused instead of running
+the job again. The input hash covers images by reference only, so entries whose image isn't
+pinned by digest are never cache hits: their tag may have been re-pushed since the results ran.
+"""
+from collections import defaultdict
+
+from adaptive import iter_results
+from job_inputs import image_pinned
+from validation import Fields
+
+
+def load_result_cache(path: str) -> dict:
+    """Index the results under a results directory or aggregated results JSON by input hash.
+
+    Results recorded without an input hash are skipped.
+
+    Returns:
+        Dict mapping input hash to a dict of conc -> result; later files win.
+    """
+    cache = defaultdict(dict)
+    for result in iter_results(path):
+        if result.get('input_hash'):
+            cache[result['input_hash']][int(result['conc'])] = result
+    return dict(cache)
+
+
+def split_cached(matrix_values: list, cache: dict) -> tuple:
+    """Split entries into those that must run and those whose results are cached.
+
+    Entries must carry input-hash. Entries with cached results whose image isn't pinned by
+    digest run again.
+
+    Returns:
+        Tuple of (entries to run, cache hit entries, cached results of the hits, entries to run
+        only because their image isn't pinned), each in matrix order.
+    """
+    to_run, hits, cached_results, unpinned = [], [], [], []
+    for entry in matrix_values:
+        concs = entry[Fields.CONC.value]
+        concs = concs if isinstance(concs, list) else [concs]
+        results = cache.get(entry[Fields.INPUT_HASH.value], {})
+        if not all(conc in results for conc in concs):
+            to_run.append(entry)
+        elif not image_pinned(entry[Fields.IMAGE.value]):
+            to_run.append(entry)
+            unpinned.append(entry)
+        else:
+            hits.append(entry)
+            cached_results.extend(results[conc] for conc in concs)
+    return to_run, hits, cached_results, unpinned
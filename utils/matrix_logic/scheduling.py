@@ -0,0 +1,109 @@
+"""Pre-assignment of matrix entries to runner nodes and to matrix shards.
+
+GitHub Actions hands jobs to any idle node with the requested runner label, in no particular
+order, so a long job picked up last can keep a sweep running long after the other nodes are idle.
+schedule_lpt instead pins every entry to a node of its runner type from runners.yaml using
+longest-processing-time-first list scheduling: jobs are placed longest first, each on the node
+with the least work so far. The resulting makespan is within 4/3 of optimal.
+
+GitHub Actions also limits a matrix to MAX_MATRIX_JOBS jobs. shard_lpt splits a large matrix
+into several matrices with the same placement, so that each shard takes about as long to run.
+"""
+import heapq
+from collections import defaultdict
+
+from validation import Fields
+
+# Maximum number of jobs GitHub Actions accepts in a single matrix
+MAX_MATRIX_JOBS = 256
+
+
+def _place_lpt(durations: list, num_bins: int, capacity: int = None) -> tuple:
+    """Place jobs longest first, each in the least loaded bin that still has capacity.
+
+    Ties are broken by job order and then by bin order, so the placement is deterministic.
+
+    Returns:
+        Tuple of (bin index per job, load per bin, number of jobs per bin).
+    """
+    loads = [0.0] * num_bins
+    counts = [0] * num_bins
+    placement = [None] * len(durations)
+    heap = [(0.0, bin_idx) for bin_idx in range(num_bins)]
+    for job in sorted(range(len(durations)), key=lambda j: -durations[j]):
+        load, bin_idx = heapq.heappop(heap)
+        placement[job] = bin_idx
+        loads[bin_idx] = load + durations[job]
+        counts[bin_idx] += 1
+        if capacity is None or counts[bin_idx] < capacity:
+            heapq.heappush(heap, (loads[bin_idx], bin_idx))
+    return placement, loads, counts
+
+
+def schedule_lpt(matrix_values: list, runner_data: dict) -> dict:
+    """Assign each entry a runner-node, balancing estimated minutes across the nodes of its runner.
+
+    Entries must carry est-minutes. The assignment is deterministic: ties are broken by matrix
+    order for jobs and by runners.yaml order for nodes.
+
+    Returns:
+        Dict mapping runner type to a list of (node, assigned minutes, number of jobs) in
+        runners.yaml order.
+
+    Raises:
+        ValueError: If a runner type has no nodes in runner_data.
+    """
+    jobs_by_runner = defaultdict(list)
+    for entry in matrix_values:
+        jobs_by_runner[entry[Fields.RUNNER.value]].append(entry)
+
+    schedule = {}
+    for runner, entries in jobs_by_runner.items():
+        nodes = runner_data.get(runner)
+        if not nodes:
+            raise ValueError(f"Runner '{runner}' has no nodes in the runner config to schedule on.")
+
+        placement, loads, counts = _place_lpt(
+            [entry[Fields.EST_MINUTES.value] for entry in entries], len(nodes))
+        for entry, node_idx in zip(entries, placement):
+            entry[Fields.RUNNER_NODE.value] = nodes[node_idx]
+        schedule[runner] = list(zip(nodes, loads, counts))
+    return schedule
+
+
+def shard_lpt(matrix_values: list, num_shards: int, max_jobs: int = MAX_MATRIX_JOBS) -> list:
+    """Split entries into up to num_shards matrices with balanced estimated minutes.
+
+    Entries must carry est-minutes. The split only depends on the entries and their order, so
+    regenerating the same matrix yields the same shards. Each shard keeps matrix order, and
+    empty shards are omitted.
+
+    Raises:
+        ValueError: If num_shards is not positive or the entries don't fit in num_shards
+            matrices of max_jobs jobs.
+    """
+    if num_shards <= 0:
+        raise ValueError(f"Number of shards must be positive, got {num_shards}.")
+    if len(matrix_values) > num_shards * max_jobs:
+        raise ValueError(
+            f"{len(matrix_values)} jobs don't fit in {num_shards} shard(s) of at most {max_jobs} "
+            f"jobs; use at least {-(-len(matrix_values) // max_jobs)} shards.")
+
+    placement, _, _ = _place_lpt(
+        [entry[Fields.EST_MINUTES.value] for entry in matrix_values], num_shards, max_jobs)
+    shards = [[] for _ in range(num_shards)]
+    for entry, shard_idx in zip(matrix_values, placement):
+        shards[shard_idx].append(entry)
+    return [shard for shard in shards if shard]
+
+
+def format_schedule_report(schedule: dict) -> str:
+    """Summarize the makespan of a schedule, overall and per runner type."""
+    makespan = max((load for nodes in schedule.values() for _, load, _ in nodes), default=0)
+    lines = [f"Scheduled makespan {makespan:.1f} minutes"]
+    for runner, nodes in sorted(schedule.items()):
+        loads = [load for _, load, _ in nodes]
+        jobs = sum(count for _, _, count in nodes)
+        lines.append(f"  {runner}: {jobs} job(s) on {len(nodes)} node(s), makespan {max(loads):.1f} minutes, "
+                     f"mean node load {sum(loads) / len(loads):.1f} minutes")
+    return "\n".join(lines)
@@ -0,0 +1,56 @@
+"""Server settings that single-node benchmark scripts derive from the job's concurrency.
+
+A batched job (see batch_conc_entries in generate_sweep_configs.py) launches one server with CONC
+set to the largest of its concurrencies and benchmarks each concurrency against it. Scripts that
+size or tune the server by CONC would run the smaller concurrencies on a server configured for
+the largest one, and their results would not match unbatched runs. CONC_SERVER_SETTINGS mirrors
+the CONC-dependent logic of each such script, and only concurrencies with equal settings are
+batched. It must be kept in sync with benchmarks/<script>_{docker,slurm}.sh.
+"""
+from typing import Hashable
+
+from validation import Fields
+
+
+def _trt_max_num_tokens(conc: int, isl: int) -> int:
+    return (conc + isl + 64 + 63) // 64 * 64
+
+
+def _exact_conc(conc: int, isl: int) -> int:
+    return conc
+
+
+# Settings each benchmark script derives from CONC, by script name without the _docker/_slurm
+# suffix, as a function of (conc, isl). Scripts not listed don't depend on CONC.
+CONC_SERVER_SETTINGS = {
+    # SCHEDULER_RECV_INTERVAL
+    'dsr1_fp4_b200': lambda conc, isl: conc >= 16,
+    'dsr1_fp8_b200': lambda conc, isl: conc >= 16,
+    # MOE_BACKEND and MAX_NUM_TOKENS
+    'dsr1_fp4_b200_trt': lambda conc, isl: (conc >= 256, conc > 32, _trt_max_num_tokens(conc, isl)),
+    # MAX_NUM_TOKENS
+    'dsr1_fp8_b200_trt': _trt_max_num_tokens,
+    'dsr1_fp8_h200_trt': _trt_max_num_tokens,
+    # PREFILL_SIZE
+    'dsr1_fp4_mi355x': lambda conc, isl: conc > 32,
+    # max_batch_size
+    'gptoss_fp4_b200_trt': _exact_conc,
+    'gptoss_fp4_h200_trt': _exact_conc,
+    # --max-num-seqs
+    'gptoss_fp4_h100': _exact_conc,
+    'gptoss_fp4_h200': _exact_conc,
+}
+
+
+def benchmark_script_name(entry: dict) -> str:
+    """Benchmark script of a single-node entry without the _docker/_slurm suffix, as the
+    runners/launch_*.sh scripts pick it."""
+    hardware = entry[Fields.RUNNER.value].split('-')[0]
+    suffix = '_trt' if entry[Fields.FRAMEWORK.value] == 'trt' else ''
+    return f"{entry[Fields.MODEL_PREFIX.value]}_{entry[Fields.PRECISION.value]}_{hardware}{suffix}"
+
+
+def conc_server_settings(entry: dict) -> Hashable:
+    """Server settings the benchmark script of a single-node entry derives from its conc."""
+    settings = CONC_SERVER_SETTINGS.get(benchmark_script_name(entry))
+    return settings(entry[Fields.CONC.value], entry[Fields.ISL.value]) if settings else None
@@ -0,0 +1,146 @@
+"""Tests for adaptive.py"""
+import json
+
+import pytest
+from adaptive import (
+    coarse_conc_values,
+    sweep_point_key,
+    result_point_key,
+    load_measurements,
+    meets_slo,
+    refine_conc_values,
+)
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+def make_result(conc, tput_per_gpu, median_intvty=100.0, median_ttft=0.5, **overrides):
+    """Single-node result JSON as written by process_result.py."""
+    result = {
+        'hw': 'mi300x',
+        'conc': conc,
+        'infmax_model_prefix': 'dsr1',
+        'framework': 'sglang',
+        'precision': 'fp8',
+        'spec_decoding': 'none',
+        'isl': 1024,
+        'osl': 1024,
+        'is_multinode': False,
+        'tp': 8,
+        'ep': 1,
+        'dp_attention': 'false',
+        'tput_per_gpu': tput_per_gpu,
+        'median_intvty': median_intvty,
+        'median_ttft': median_ttft,
+    }
+    result.update(overrides)
+    return result
+
+
+LADDER = [4, 8, 16, 32, 64, 128, 256]
+
+
+# =============================================================================
+# Test coarse_conc_values
+# =============================================================================
+
+class TestCoarseConcValues:
+    """Tests for coarse_conc_values."""
+
+    def test_stride_keeps_ends(self):
+        assert coarse_conc_values(LADDER, 2) == [4, 16, 64, 256]
+        assert coarse_conc_values(LADDER, 4) == [4, 64, 256]
+
+    def test_stride_one_keeps_all(self):
+        assert coarse_conc_values(LADDER, 1) == LADDER
+
+    def test_stride_larger_than_ladder(self):
+        assert coarse_conc_values(LADDER, 100) == [4, 256]
+
+    def test_empty_ladder(self):
+        assert coarse_conc_values([], 2) == []
+
+    def test_invalid_stride(self):
+        with pytest.raises(ValueError, match="at least 1"):
+            coarse_conc_values(LADDER, 0)
+
+
+# =============================================================================
+# Test measurements
+# =============================================================================
+
+class TestMeasurements:
+    """Tests for result_point_key and load_measurements."""
+
+    def test_result_key_matches_sweep_key(self):
+        assert result_point_key(make_result(4, 100.0)) == sweep_point_key(
+            'dsr1', 'fp8', 'sglang', 'mi300x', 1024, 1024, 8, 1, False, 'none')
+
+    def test_load_directory(self, tmp_path):
+        for conc, tput in [(4, 100.0), (64, 400.0)]:
+            (tmp_path / f"r{conc}.json").write_text(json.dumps(make_result(conc, tput)))
+        (tmp_path / "multi.json").write_text(json.dumps({'is_multinode': True, 'conc': 8}))
+
+        measurements = load_measurements(str(tmp_path))
+        assert list(measurements) == [result_point_key(make_result(4, 100.0))]
+        assert sorted(next(iter(measurements.values()))) == [4, 64]
+
+    def test_load_aggregated_file(self, tmp_path):
+        agg = tmp_path / "agg.json"
+        agg.write_text(json.dumps([make_result(4, 100.0), make_result(4, 90.0, tp=4)]))
+        assert len(load_measurements(str(agg))) == 2
+
+    def test_load_empty_directory(self, tmp_path):
+        with pytest.raises(ValueError, match="No results found"):
+            load_measurements(str(tmp_path))
+
+
+# =============================================================================
+# Test refine_conc_values
+# =============================================================================
+
+class TestRefineConcValues:
+    """Tests for refine_conc_values."""
+
+    def test_refines_growing_intervals(self):
+        measured = {4: make_result(4, 100.0), 16: make_result(16, 300.0), 64: make_result(64, 700.0)}
+        assert refine_conc_values(LADDER[:5], measured) == [8, 32]
+
+    def test_skips_plateau(self):
+        measured = {4: make_result(4, 100.0), 16: make_result(16, 300.0), 64: make_result(64, 305.0)}
+        assert refine_conc_values(LADDER[:5], measured) == [8]
+
+    def test_plateau_threshold(self):
+        measured = {4: make_result(4, 100.0), 16: make_result(16, 110.0)}
+        assert refine_conc_values(LADDER, measured, plateau_threshold=0.05) == [8]
+        assert refine_conc_values(LADDER, measured, plateau_threshold=0.2) == []
+
+    def test_skips_intervals_past_slo(self):
+        measured = {
+            4: make_result(4, 100.0, median_ttft=0.1),
+            16: make_result(16, 300.0, median_ttft=2.0),
+            64: make_result(64, 700.0, median_ttft=5.0),
+        }
+        # The interval ending at the first violation is still refined to find the boundary
+        assert refine_conc_values(LADDER[:5], measured, max_ttft=1000) == [8]
+        assert refine_conc_values(LADDER[:5], measured, min_intvty=200) == []
+
+    def test_bisects_wide_intervals(self):
+        measured = {4: make_result(4, 100.0), 256: make_result(256, 900.0)}
+        assert refine_conc_values(LADDER, measured) == [32]
+
+    def test_converged(self):
+        measured = {conc: make_result(conc, conc * 10.0) for conc in LADDER}
+        assert refine_conc_values(LADDER, measured) == []
+
+    def test_unmeasured_series(self):
+        assert refine_conc_values(LADDER, {}) == []
+
+    def test_meets_slo_units(self):
+        result = make_result(4, 100.0, median_intvty=50.0, median_ttft=0.5)
+        assert meets_slo(result)
+        assert meets_slo(result, min_intvty=50.0, max_ttft=500)
+        assert not meets_slo(result, max_ttft=499)
+        assert not meets_slo(result, min_intvty=51.0)
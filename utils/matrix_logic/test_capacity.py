@@ -0,0 +1,82 @@
+"""Tests for capacity.py"""
+import pytest
+from capacity import check_capacity, enforce_capacity
+
+
+def make_single_node_config(runner='h200', model_prefix='dsr1', precision='fp8', tps=(8,)):
+    return {
+        'image': 'lmsysorg/sglang:v0.5.5', 'model': 'deepseek-ai/DeepSeek-R1-0528',
+        'model-prefix': model_prefix, 'runner': runner, 'precision': precision, 'framework': 'sglang',
+        'multinode': False,
+        'seq-len-configs': [
+            {'isl': 1024, 'osl': 1024, 'search-space': [{'tp': tp, 'conc-start': 4, 'conc-end': 64} for tp in tps]},
+            {'isl': 8192, 'osl': 1024, 'search-space': [{'tp': tp, 'conc-start': 4, 'conc-end': 64} for tp in tps]},
+        ],
+    }
+
+
+def make_multinode_config(prefill, decode, precision='fp4'):
+    return {
+        'image': 'nvcr.io/dynamo:0.5.0', 'model': 'deepseek-ai/DeepSeek-R1-0528', 'model-prefix': 'dsr1',
+        'runner': 'gb200', 'precision': precision, 'framework': 'dynamo-sglang', 'multinode': True,
+        'seq-len-configs': [
+            {'isl': 1024, 'osl': 1024, 'search-space': [{'conc-list': [4], 'prefill': prefill, 'decode': decode}]},
+        ],
+    }
+
+
+def make_worker(tp=4, ep=4, num_worker=1, additional_settings=()):
+    return {'num-worker': num_worker, 'tp': tp, 'ep': ep, 'dp-attn': True,
+            'additional-settings': list(additional_settings)}
+
+
+class TestCheckCapacity:
+    """Tests for check_capacity."""
+
+    def test_fitting_configs_pass(self):
+        master_config = {
+            'dsr1-fp8-h200-sglang': make_single_node_config(),
+            'gptoss-fp4-h100-vllm': make_single_node_config('h100', 'gptoss', 'fp4', tps=(2, 4, 8)),
+            'dsr1-fp4-gb200-dynamo-trt': make_multinode_config(make_worker(tp=4), make_worker(tp=16, ep=16)),
+        }
+        assert check_capacity(master_config) == ([], [])
+
+    def test_unschedulable_layouts(self):
+        errors, _ = check_capacity({
+            'dsr1-fp4-b200-sglang': make_single_node_config('b200', precision='fp4', tps=(8, 16)),
+            'dsr1-fp4-gb200-dynamo-trt': make_multinode_config(make_worker(tp=6, ep=6), make_worker()),
+        })
+        # Each layout is reported once, not once per sequence length
+        assert errors == [
+            "dsr1-fp4-b200-sglang: tp=16 needs more GPUs than the 8 of a b200 node",
+            "dsr1-fp4-gb200-dynamo-trt: prefill worker of 6 GPUs spans nodes of 4 GPUs without using whole nodes",
+        ]
+
+    def test_weights_that_do_not_fit(self):
+        errors, warnings = check_capacity({
+            'dsr1-fp8-h200-sglang': make_single_node_config(tps=(4, 8)),
+            'dsr1-fp8-mi300x-sglang': make_single_node_config('mi300x', tps=(4,)),
+        })
+        assert errors == ["dsr1-fp8-h200-sglang: tp=4 puts 172 GB of weights on each GPU, more than its 141 GB of HBM"]
+        assert warnings == ["dsr1-fp8-mi300x-sglang: tp=4 puts 172 GB of weights on each GPU, "
+                            "leaving little of its 192 GB of HBM for the KV cache"]
+
+    def test_workers_sized_by_nodes(self):
+        # tp and ep are ignored when the recipe sizes workers by PREFILL_NODES / DECODE_NODES
+        prefill = make_worker(tp=1, ep=1, num_worker=2, additional_settings=['PREFILL_NODES=4'])
+        decode = make_worker(tp=1, ep=1, additional_settings=['DECODE_NODES=8'])
+        assert check_capacity({'dsr1-fp8-gb200-dynamo-sglang': make_multinode_config(prefill, decode, 'fp8')}) == ([], [])
+
+    def test_unknown_runner_and_model(self):
+        errors, warnings = check_capacity({
+            'dsr1-fp8-h300-sglang': make_single_node_config('h300'),
+            'llama-fp8-h200-vllm': make_single_node_config(model_prefix='llama', tps=(1,)),
+        })
+        assert errors == []
+        assert warnings == ["dsr1-fp8-h300-sglang: no hardware profile for runner 'h300', capacity not checked"]
+
+    def test_enforce_capacity(self, capsys):
+        enforce_capacity({'dsr1-fp8-mi300x-sglang': make_single_node_config('mi300x', tps=(4,))})
+        assert capsys.readouterr().err.startswith("Warning: dsr1-fp8-mi300x-sglang: tp=4")
+        with pytest.raises(ValueError, match="exceed runner capacity"):
+            enforce_capacity({'dsr1-fp8-h200-sglang': make_single_node_config(tps=(4,))})
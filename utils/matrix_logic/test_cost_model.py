@@ -0,0 +1,177 @@
+"""Tests for cost_model.py"""
+import json
+import math
+
+import pytest
+from cost_model import (
+    DEFAULT_BENCHMARK_MINUTES,
+    RuntimeModel,
+    batched_gpu_hours,
+    result_duration,
+    fit_power_law,
+    entry_gpus,
+    trim_to_budget,
+    format_runtime_report,
+)
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+def make_result(conc, duration, hw='h200', framework='sglang', isl=1024, osl=1024, **overrides):
+    result = {
+        'hw': hw, 'framework': framework, 'isl': isl, 'osl': osl, 'conc': conc,
+        'is_multinode': False, 'tp': 8, 'tput_per_gpu': 1000.0,
+        'duration': duration, 'num_prompts': conc * 10,
+    }
+    result.update(overrides)
+    return result
+
+
+def make_entry(conc, tp=8, est_minutes=60.0, **overrides):
+    entry = {
+        'image': 'lmsysorg/sglang:v0.5.5', 'model': 'deepseek-ai/DeepSeek-R1-0528',
+        'model-prefix': 'dsr1', 'precision': 'fp8', 'framework': 'sglang', 'runner': 'h200',
+        'isl': 1024, 'osl': 1024, 'random-range-ratio': 0.8, 'exp-name': 'dsr1_1k1k',
+        'tp': tp, 'ep': 1, 'dp-attn': False, 'spec-decoding': 'none',
+        'conc': conc, 'est-minutes': est_minutes,
+    }
+    entry.update(overrides)
+    return entry
+
+
+def make_multinode_entry(concs, est_minutes=60.0):
+    return {
+        'model-prefix': 'dsr1', 'framework': 'dynamo-trt', 'runner': 'gb200', 'isl': 1024, 'osl': 1024,
+        'prefill': {'num-worker': 5, 'tp': 4}, 'decode': {'num-worker': 1, 'tp': 8},
+        'conc': concs, 'est-minutes': est_minutes,
+    }
+
+
+# =============================================================================
+# Test RuntimeModel
+# =============================================================================
+
+class TestRuntimeModel:
+    """Tests for fitting and applying RuntimeModel."""
+
+    def test_fit_power_law(self):
+        a, b = fit_power_law([(0.0, 1.0), (1.0, 3.0), (2.0, 5.0)])
+        assert a == pytest.approx(1.0)
+        assert b == pytest.approx(2.0)
+
+    def test_fit_single_x_uses_default_exponent(self):
+        a, b = fit_power_law([(1.0, 2.0), (1.0, 4.0)])
+        assert b == -1.0
+        assert a + b * 1.0 == pytest.approx(3.0)
+
+    def test_reproduces_history(self):
+        # Duration grows as sqrt(conc) at fixed prompts per conc
+        results = [make_result(conc, 100.0 * math.sqrt(conc)) for conc in (4, 16, 64)]
+        model = RuntimeModel(results)
+        assert model.benchmark_seconds('h200', 'sglang', 1024, 1024, 32) == pytest.approx(100.0 * math.sqrt(32))
+
+    def test_falls_back_to_less_specific_levels(self):
+        results = [make_result(conc, 100.0, isl=1024, osl=1024) for conc in (4, 64)]
+        model = RuntimeModel(results)
+        # Other sequence lengths scale with prompt tokens
+        assert model.benchmark_seconds('h200', 'sglang', 8192, 1024, 4) == pytest.approx(100.0 * 9216 / 2048)
+        # Other hardware falls back to the global fit
+        assert model.benchmark_seconds('b200', 'trt', 1024, 1024, 4) == pytest.approx(100.0)
+
+    def test_no_history(self):
+        model = RuntimeModel([], startup_minutes=5.0)
+        assert model.estimate_minutes(make_entry(4)) == 5.0 + DEFAULT_BENCHMARK_MINUTES
+        assert not model.has_history
+        assert RuntimeModel([make_result(4, 100.0)]).has_history
+
+    def test_multinode_entry_sums_concs(self):
+        model = RuntimeModel([make_result(c, 120.0, hw='gb200', framework='dynamo-trt') for c in (4, 8)],
+                             startup_minutes=10.0)
+        assert model.estimate_minutes(make_multinode_entry([4, 8])) == pytest.approx(10.0 + 4.0)
+
+    def test_duration_estimated_from_throughput(self):
+        result = make_result(4, 0.0, tput_per_gpu=512.0)
+        del result['duration']
+        # 40 prompts of 2048 tokens at 8 * 512 tok/s
+        assert result_duration(result) == pytest.approx(40 * 2048 / 4096)
+
+    def test_from_history(self, tmp_path):
+        (tmp_path / "run1.json").write_text(json.dumps([make_result(4, 100.0), make_result(16, 200.0)]))
+        model = RuntimeModel.from_history(str(tmp_path), startup_minutes=0.0)
+        assert model.benchmark_seconds('h200', 'sglang', 1024, 1024, 16) == pytest.approx(200.0)
+
+
+# =============================================================================
+# Test trim_to_budget
+# =============================================================================
+
+class TestTrimToBudget:
+    """Tests for trim_to_budget and the runtime report."""
+
+    def test_entry_gpus(self):
+        assert entry_gpus(make_entry(4, tp=4)) == 4
+        assert entry_gpus(make_multinode_entry([4])) == 28
+
+    def test_within_budget(self):
+        entries = [make_entry(c) for c in (4, 8, 16)]
+        assert trim_to_budget(entries, 24.0) == (entries, [])
+
+    def test_thins_ladders_evenly(self):
+        entries = [make_entry(c) for c in (4, 8, 16, 32, 64)]
+        # Each job is 8 GPU-hours; a budget of 24 keeps the ends plus one point in the middle
+        kept, dropped = trim_to_budget(entries, 24.0)
+        assert [e['conc'] for e in kept] == [4, 16, 64]
+        assert [e['conc'] for e in dropped] == [8, 32]
+
+    def test_profiles_are_separate_series(self):
+        # Two profiles with the same isl and osl: each ladder keeps its own ends
+        entries = [make_entry(c) for c in (4, 8, 16)] + [
+            make_entry(c, **{'exp-name': 'dsr1_1k1k-narrow', 'random-range-ratio': 1.0}) for c in (4, 8, 16)]
+        kept, dropped = trim_to_budget(entries, 1.0)
+        assert [(e['exp-name'], e['conc']) for e in dropped] == [('dsr1_1k1k', 8), ('dsr1_1k1k-narrow', 8)]
+
+    def test_prefers_dropping_expensive_ties(self):
+        entries = [make_entry(4), make_entry(8, est_minutes=30.0), make_entry(16),
+                   make_entry(4, tp=4), make_entry(8, tp=4, est_minutes=120.0), make_entry(16, tp=4)]
+        # Both middle points leave the same gap; dropping the 8 GPU-hour one fits 36 into 30
+        kept, dropped = trim_to_budget(entries, 30.0)
+        assert dropped == [entries[4]]
+
+    def test_keeps_ends_and_multinode(self):
+        entries = [make_entry(4), make_entry(8), make_multinode_entry([4, 8])]
+        kept, dropped = trim_to_budget(entries, 1.0)
+        assert kept == entries
+        assert dropped == []
+        assert "cannot be met" in format_runtime_report(kept, dropped, 1.0)
+
+    def test_batched_gpu_hours(self):
+        entries = [make_entry(c) for c in (4, 8, 16)] + [make_multinode_entry([4])]
+        unbatched = batched_gpu_hours(entries)
+        # The three single-node jobs share one 15 minute startup on 8 GPUs
+        assert batched_gpu_hours(entries, lambda e: e['tp'], 15.0) == pytest.approx(unbatched - 4.0)
+
+    def test_batched_trim(self):
+        entries = [make_entry(c) for c in (4, 8, 16, 32, 64)]
+        # One 15 minute startup plus 45 minutes per concurrency on 8 GPUs: 2 + 6 GPU-hours per point
+        kept, dropped = trim_to_budget(entries, 26.0, lambda e: e['tp'], 15.0)
+        assert [e['conc'] for e in kept] == [4, 16, 32, 64]
+        assert batched_gpu_hours(kept, lambda e: e['tp'], 15.0) == pytest.approx(26.0)
+        # Unbatched, each point costs the full 8 GPU-hours
+        assert [e['conc'] for e in trim_to_budget(entries, 26.0)[0]] == [4, 16, 64]
+
+    def test_batched_trim_saves_startup_of_emptied_batch(self):
+        entries = [make_entry(c) for c in (4, 8, 16)]
+        # conc 8 runs in a batch of its own, so dropping it saves a whole 8 GPU-hour job
+        kept, dropped = trim_to_budget(entries, 16.0, lambda e: e['conc'] == 8, 15.0)
+        assert [e['conc'] for e in dropped] == [8]
+
+    def test_report(self):
+        entries = [make_entry(c) for c in (4, 8, 16)]
+        kept, dropped = trim_to_budget(entries, 16.0)
+        report = format_runtime_report(kept, dropped, 16.0)
+        assert report.splitlines()[0] == "Estimated 2 job(s), 16.00 GPU-hours (longest job 60.0 minutes)"
+        assert "dropped 1 point(s) worth 8.00 GPU-hours" in report
+        assert "dsr1-fp8-h200-sglang isl=1024 osl=1024 tp=8 ep=1 conc=8" in report
+        assert "worth 6.00 GPU-hours" in format_runtime_report(kept, dropped, 16.0, 6.0)
@@ -1,12 +1,21 @@
 """Comprehensive tests for generate_sweep_configs.py"""
+import json
 import pytest
 import argparse
+import generate_sweep_configs
 from generate_sweep_configs import (
     seq_len_stoi,
     seq_len_itos,
     seq_len_to_str,
+    expand_conc_values,
     generate_full_sweep,
+    batch_conc_entries,
     generate_runner_model_sweep_config,
+    generate_test_config_sweep,
+    generate_config_key_sweep,
+    build_parser,
+    generate_matrix,
+    diff_matrix_files,
 )
 
 
@@ -119,6 +128,22 @@ def full_sweep_args_single_node():
     args.max_conc = None
     args.max_tp = None
     args.max_ep = None
+    args.adaptive_stride = None
+    args.refine_from = None
+    args.plateau_threshold = 0.05
+    args.min_intvty = None
+    args.max_ttft = None
+    args.prune_history = None
+    args.prune_min_sweeps = 3
+    args.prune_margin = 0.05
+    args.no_prune = False
+    args.runtime_history = None
+    args.startup_minutes = 15.0
+    args.budget = None
+    args.schedule = False
+    args.batch_conc = False
+    args.shards = None
+    args.kv_conc = None
     args.single_node = True
     args.multi_node = False
     return args
@@ -137,6 +162,22 @@ def full_sweep_args_multi_node():
     args.max_conc = None
     args.max_tp = None
     args.max_ep = None
+    args.adaptive_stride = None
+    args.refine_from = None
+    args.plateau_threshold = 0.05
+    args.min_intvty = None
+    args.max_ttft = None
+    args.prune_history = None
+    args.prune_min_sweeps = 3
+    args.prune_margin = 0.05
+    args.no_prune = False
+    args.runtime_history = None
+    args.startup_minutes = 15.0
+    args.budget = None
+    args.schedule = False
+    args.batch_conc = False
+    args.shards = None
+    args.kv_conc = None
     args.single_node = False
     args.multi_node = True
     return args
@@ -151,15 +192,35 @@ class TestSeqLenMappings:
 
     def test_seq_len_stoi_values(self):
         """Verify seq_len_stoi has expected mappings."""
-        assert seq_len_stoi["1k1k"] == (1024, 1024)
-        assert seq_len_stoi["1k8k"] == (1024, 8192)
-        assert seq_len_stoi["8k1k"] == (8192, 1024)
+        assert seq_len_stoi()["1k1k"] == (1024, 1024)
+        assert seq_len_stoi()["1k8k"] == (1024, 8192)
+        assert seq_len_stoi()["8k1k"] == (8192, 1024)
 
     def test_seq_len_itos_reverse_mapping(self):
         """Verify seq_len_itos is reverse of stoi."""
-        assert seq_len_itos[(1024, 1024)] == "1k1k"
-        assert seq_len_itos[(1024, 8192)] == "1k8k"
-        assert seq_len_itos[(8192, 1024)] == "8k1k"
+        assert seq_len_itos()[(1024, 1024)] == "1k1k"
+        assert seq_len_itos()[(1024, 8192)] == "1k8k"
+        assert seq_len_itos()[(8192, 1024)] == "8k1k"
+
+
+    def test_profiles_loaded_on_first_use(self, monkeypatch):
+        """The profiles file is read when a mapping is first needed, not on import."""
+        loads = []
+
+        def load_profiles():
+            loads.append(True)
+            return {"1k1k": {"isl": 1024, "osl": 1024}, "1k1k-narrow": {"isl": 1024, "osl": 1024}}
+
+        monkeypatch.setattr(generate_sweep_configs, "load_seq_len_profiles", load_profiles)
+        seq_len_stoi.cache_clear()
+        seq_len_itos.cache_clear()
+        try:
+            assert seq_len_to_str(1024, 1024) == "1k1k"
+            assert list(seq_len_stoi()) == ["1k1k", "1k1k-narrow"]
+            assert len(loads) == 1
+        finally:
+            seq_len_stoi.cache_clear()
+            seq_len_itos.cache_clear()
 
 
 class TestSeqLenToStr:
@@ -177,6 +238,23 @@ class TestSeqLenToStr:
         assert seq_len_to_str(4096, 1024) == "4096_1024"
 
 
+class TestExpandConcValues:
+    """Tests for expand_conc_values function."""
+
+    def test_range_doubling(self):
+        assert expand_conc_values({"conc-start": 4, "conc-end": 64}) == [4, 8, 16, 32, 64]
+
+    def test_range_capped_at_end(self):
+        """conc-end is always included even if not reached by doubling."""
+        assert expand_conc_values({"conc-start": 4, "conc-end": 48}) == [4, 8, 16, 32, 48]
+
+    def test_step_size(self):
+        assert expand_conc_values({"conc-start": 1, "conc-end": 64}, step_size=4) == [1, 4, 16, 64]
+
+    def test_conc_list(self):
+        assert expand_conc_values({"conc-list": [2150, 64]}) == [2150, 64]
+
+
 # =============================================================================
 # Test generate_full_sweep for single-node
 # =============================================================================
@@ -410,6 +488,33 @@ class TestGenerateFullSweepSingleNode:
         )
         assert all(entry["exp-name"] == "dsr1_1k1k" for entry in result)
 
+    def test_seq_len_profiles(self, sample_single_node_config, sample_runner_config, full_sweep_args_single_node):
+        """Seq-len configs naming a profile are filtered and named by the profile."""
+        # As resolved by load_config_files
+        sample_single_node_config["dsr1-fp8-mi300x-sglang"]["seq-len-configs"].append({
+            "profile": "rag", "isl": 32768, "osl": 1024, "random-range-ratio": 0.5,
+            "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 8}],
+        })
+        full_sweep_args_single_node.seq_lens = ["rag"]
+        result = generate_full_sweep(
+            full_sweep_args_single_node,
+            sample_single_node_config,
+            sample_runner_config
+        )
+        assert [entry["conc"] for entry in result] == [4, 8]
+        assert all(entry["exp-name"] == "dsr1_rag" and entry["random-range-ratio"] == 0.5
+                   and (entry["isl"], entry["osl"]) == (32768, 1024) for entry in result)
+
+        # Seq-len configs that give isl and osl directly use the default random range ratio
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        result = generate_full_sweep(
+            full_sweep_args_single_node,
+            sample_single_node_config,
+            sample_runner_config
+        )
+        assert all(entry["random-range-ratio"] == 0.8 for entry in result)
+        assert generate_config_key_sweep(["dsr1-fp8-mi300x-sglang"], sample_single_node_config)[-1]["exp-name"] == "dsr1_rag"
+
     def test_max_model_len_calculation(self, sample_single_node_config, sample_runner_config, full_sweep_args_single_node):
         """max-model-len should be isl + osl + 200."""
         result = generate_full_sweep(
@@ -581,6 +686,286 @@ class TestGenerateRunnerModelSweepConfig:
         assert all(entry["conc"] == 4 for entry in result)
 
 
+# =============================================================================
+# Test adaptive concurrency search, pruning and budgets in generate_full_sweep
+# =============================================================================
+
+class TestGenerateFullSweepAdaptive:
+    """Tests for --adaptive-stride, --refine-from, --prune-history, --budget, --schedule and
+    --batch-conc."""
+
+    def test_adaptive_stride(self, sample_single_node_config, sample_runner_config,
+                             full_sweep_args_single_node):
+        full_sweep_args_single_node.adaptive_stride = 2
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # conc 4..64 -> 4, 16, 64 for both seq-len configs
+        assert [entry["conc"] for entry in result] == [4, 16, 64] * 2
+
+    def test_refine_from(self, tmp_path, sample_single_node_config, sample_runner_config,
+                         full_sweep_args_single_node):
+        results = []
+        for conc, tput in [(4, 100.0), (16, 300.0), (64, 310.0)]:
+            results.append({
+                "hw": "mi300x", "conc": conc, "infmax_model_prefix": "dsr1", "framework": "sglang",
+                "precision": "fp8", "spec_decoding": "none", "isl": 1024, "osl": 1024,
+                "is_multinode": False, "tp": 8, "ep": 1, "dp_attention": "false",
+                "tput_per_gpu": tput, "median_intvty": 50.0, "median_ttft": 0.2,
+            })
+        results_file = tmp_path / "agg.json"
+        results_file.write_text(json.dumps(results))
+
+        full_sweep_args_single_node.refine_from = str(results_file)
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # 16 -> 64 has plateaued
+        assert [(entry["isl"], entry["conc"]) for entry in result] == [(1024, 8)]
+
+    @pytest.mark.parametrize("stride, expected", [(None, [4, 8, 16, 32, 64]), (4, [4, 64])])
+    def test_refine_from_unmeasured_series(self, tmp_path, capsys, sample_single_node_config,
+                                           sample_runner_config, full_sweep_args_single_node,
+                                           stride, expected):
+        results = [{
+            "hw": "mi300x", "conc": conc, "infmax_model_prefix": "dsr1", "framework": "sglang",
+            "precision": "fp8", "spec_decoding": "none", "isl": 1024, "osl": 1024,
+            "is_multinode": False, "tp": 8, "ep": 1, "dp_attention": "false",
+            "tput_per_gpu": 100.0, "median_intvty": 50.0, "median_ttft": 0.2,
+        } for conc in (4, 64)]
+        results_file = tmp_path / "agg.json"
+        results_file.write_text(json.dumps(results))
+
+        full_sweep_args_single_node.refine_from = str(results_file)
+        full_sweep_args_single_node.adaptive_stride = stride
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # 1k1k has plateaued; 8k1k was never measured, so it starts over
+        assert [(entry["isl"], entry["conc"]) for entry in result] == [(8192, c) for c in expected]
+        err = capsys.readouterr().err
+        assert "No measurements for 1 series" in err
+        assert "dsr1-fp8-mi300x-sglang isl=8192 osl=1024 tp=8" in err
+
+    def test_prune_history(self, tmp_path, capsys, sample_single_node_config, sample_runner_config,
+                           full_sweep_args_single_node):
+        def result(conc, tput, intvty):
+            return {
+                "hw": "mi300x", "conc": conc, "infmax_model_prefix": "dsr1", "framework": "sglang",
+                "precision": "fp8", "spec_decoding": "none", "isl": 1024, "osl": 1024,
+                "is_multinode": False, "tp": 8, "ep": 1, "dp_attention": "false",
+                "tput_per_gpu": tput, "median_intvty": intvty, "median_ttft": 0.2,
+            }
+
+        # conc 8 is beaten on both axes by conc 16 in every sweep
+        for sweep in ["run1", "run2", "run3"]:
+            (tmp_path / f"{sweep}.json").write_text(json.dumps(
+                [result(4, 100.0, 90.0), result(8, 150.0, 50.0), result(16, 300.0, 60.0)]))
+
+        full_sweep_args_single_node.prune_history = str(tmp_path)
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        assert [entry["conc"] for entry in result] == [4, 16, 32, 64]
+        assert "Pruned 1 dominated sweep point(s)" in capsys.readouterr().err
+
+        full_sweep_args_single_node.no_prune = True
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        assert [entry["conc"] for entry in result] == [4, 8, 16, 32, 64]
+
+    def test_budget(self, capsys, sample_single_node_config, sample_runner_config,
+                    full_sweep_args_single_node):
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        full_sweep_args_single_node.startup_minutes = 5.0
+        full_sweep_args_single_node.budget = 4.0
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # Without history every job is estimated at 5 + 10 minutes on 8 GPUs, i.e. 2 GPU-hours
+        assert [entry["conc"] for entry in result] == [4, 64]
+        assert all(entry["est-minutes"] == 15.0 for entry in result)
+        assert "dropped 3 point(s)" in capsys.readouterr().err
+
+    def test_schedule(self, capsys, sample_single_node_config, sample_runner_config,
+                      full_sweep_args_single_node):
+        full_sweep_args_single_node.schedule = True
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # 10 equally long jobs over the 3 mi300x nodes
+        nodes = [entry["runner-node"] for entry in result]
+        assert sorted(nodes.count(node) for node in sample_runner_config["mi300x"]) == [3, 3, 4]
+        assert all(entry["runner"] == "mi300x" for entry in result)
+        assert "Scheduled makespan 100.0 minutes" in capsys.readouterr().err
+
+    def test_batch_conc(self, sample_single_node_config, sample_runner_config,
+                        full_sweep_args_single_node):
+        unbatched = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                        sample_runner_config)
+        full_sweep_args_single_node.batch_conc = True
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        assert [(entry["isl"], entry["conc"]) for entry in result] == [
+            (1024, [4, 8, 16, 32, 64]), (8192, [4, 8, 16, 32, 64])]
+        assert result[0] == {**unbatched[0], "conc": [4, 8, 16, 32, 64]}
+        assert list(result[0]) == list(unbatched[0])
+
+    def test_shards(self, sample_single_node_config, sample_runner_config,
+                    full_sweep_args_single_node):
+        unsharded = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                        sample_runner_config)
+        full_sweep_args_single_node.shards = 3
+        shards = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # 10 equally long jobs
+        assert [len(shard) for shard in shards] == [4, 3, 3]
+        assert sorted((e["isl"], e["conc"]) for shard in shards for e in shard) == \
+            sorted((e["isl"], e["conc"]) for e in unsharded)
+
+    def test_kv_conc(self, capsys, sample_single_node_config, sample_runner_config,
+                     full_sweep_args_single_node):
+        def conc_ends(kv_conc, max_conc=None):
+            full_sweep_args_single_node.kv_conc = kv_conc
+            full_sweep_args_single_node.max_conc = max_conc
+            result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                         sample_runner_config)
+            return {isl: max(e["conc"] for e in result if e["isl"] == isl) for isl in (1024, 8192)}
+
+        # A DSR1 FP8 MI300X server holds about 600 1k1k and 130 8k1k sequences
+        assert conc_ends("clip") == {1024: 64, 8192: 64}
+        assert conc_ends("extend") == {1024: 512, 8192: 128}
+        assert "2 extended" in capsys.readouterr().err
+        # --max-conc still applies on top
+        assert conc_ends("extend", max_conc=256) == {1024: 256, 8192: 128}
+
+    def test_batch_conc_passes_multinode_through(self, sample_multinode_config, sample_runner_config,
+                                                 full_sweep_args_multi_node):
+        unbatched = generate_full_sweep(full_sweep_args_multi_node, sample_multinode_config,
+                                        sample_runner_config)
+        assert batch_conc_entries(unbatched) == unbatched
+
+    def test_batch_conc_follows_validation_mode(self, monkeypatch, sample_single_node_config,
+                                                sample_runner_config, full_sweep_args_single_node):
+        full_sweep_args_single_node.batch_conc = True
+        validated = []
+        monkeypatch.setattr(generate_sweep_configs, "validate_matrix_entry",
+                            lambda entry, is_multinode: validated.append(entry) or entry)
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config, validate_entries=False)
+        assert len(result) == 2
+        assert validated == []
+
+    def test_batch_conc_after_budget(self, capsys, sample_single_node_config, sample_runner_config,
+                                     full_sweep_args_single_node):
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        full_sweep_args_single_node.startup_minutes = 5.0
+        full_sweep_args_single_node.budget = 5.0
+        full_sweep_args_single_node.batch_conc = True
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        # The batch pays one 5 minute startup plus 10 minutes per concurrency on 8 GPUs, so three
+        # concurrencies fit in 5 GPU-hours where three separate jobs would take 6
+        assert [entry["conc"] for entry in result] == [[4, 16, 64]]
+        assert result[0]["est-minutes"] == 35.0
+        err = capsys.readouterr().err
+        assert "Estimated 1 job(s), 4.67 GPU-hours" in err
+        assert "dropped 2 point(s) worth 2.67 GPU-hours" in err
+        assert "cannot be met" not in err
+
+    def test_batch_conc_splits_at_server_settings(self, sample_single_node_config, sample_runner_config,
+                                                  full_sweep_args_single_node):
+        # dsr1_fp8_b200_docker.sh relaxes SCHEDULER_RECV_INTERVAL from conc 16 on
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        unbatched = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                        sample_runner_config)
+        for entry in unbatched:
+            entry["runner"] = "b200"
+        assert [entry["conc"] for entry in batch_conc_entries(unbatched)] == [[4, 8], [16, 32, 64]]
+
+    def test_batch_conc_budget_charges_split_startups(self, capsys, sample_single_node_config,
+                                                      sample_runner_config, full_sweep_args_single_node):
+        # Each concurrency of gptoss_fp4_h100 gets its own server (--max-num-seqs), so batching
+        # saves nothing and the ladder is trimmed as if unbatched
+        config = sample_single_node_config["dsr1-fp8-mi300x-sglang"]
+        config.update({"model-prefix": "gptoss", "precision": "fp4", "framework": "vllm", "runner": "h100"})
+        sample_runner_config["h100"] = ["h100-cr_0"]
+        full_sweep_args_single_node.seq_lens = ["1k1k"]
+        full_sweep_args_single_node.startup_minutes = 5.0
+        full_sweep_args_single_node.budget = 5.0
+        full_sweep_args_single_node.batch_conc = True
+        result = generate_full_sweep(full_sweep_args_single_node, sample_single_node_config,
+                                     sample_runner_config)
+        assert [entry["conc"] for entry in result] == [[4], [64]]
+        assert "Estimated 2 job(s), 4.00 GPU-hours" in capsys.readouterr().err
+
+    def test_adaptive_rejects_multinode(self, sample_multinode_config, sample_runner_config,
+                                        full_sweep_args_multi_node):
+        full_sweep_args_multi_node.adaptive_stride = 2
+        with pytest.raises(ValueError, match="only apply to --single-node"):
+            generate_full_sweep(full_sweep_args_multi_node, sample_multinode_config,
+                                sample_runner_config)
+
+
+# =============================================================================
+# Test generate_config_key_sweep and the in-process API
+# =============================================================================
+
+class TestGenerateConfigKeySweep:
+    """Tests for generate_config_key_sweep and generate_matrix."""
+
+    def test_expands_all_seq_lens_and_concs(self, sample_single_node_config):
+        result = generate_config_key_sweep(["dsr1-fp8-mi300x-sglang"], sample_single_node_config)
+        # 2 seq-len configs x conc 4..64
+        assert len(result) == 2 * 5
+        assert {entry["exp-name"] for entry in result} == {"dsr1_1k1k", "dsr1_8k1k"}
+
+    def test_multinode_keeps_conc_list(self, sample_multinode_config):
+        result = generate_config_key_sweep(["dsr1-fp4-gb200-dynamo-trt"], sample_multinode_config)
+        assert len(result) == 1
+        assert result[0]["conc"] == [2150]
+
+    def test_missing_key_raises(self, sample_single_node_config):
+        with pytest.raises(ValueError, match="Config key\\(s\\) not found: missing-key"):
+            generate_config_key_sweep(["missing-key"], sample_single_node_config)
+
+    def test_test_config_subcommand_matches(self, sample_single_node_config):
+        args = argparse.Namespace(config_keys=["dsr1-fp8-mi300x-sglang"])
+        assert generate_test_config_sweep(args, sample_single_node_config) == \
+            generate_config_key_sweep(["dsr1-fp8-mi300x-sglang"], sample_single_node_config)
+
+    def test_generate_matrix_from_parsed_args(self, sample_single_node_config, sample_runner_config):
+        args = build_parser().parse_args([
+            "full-sweep", "--single-node", "--seq-lens", "1k1k",
+            "--config-files", "unused.yaml", "--runner-config", "unused.yaml",
+        ])
+        result = generate_matrix(args, sample_single_node_config, sample_runner_config)
+        assert len(result) == 5
+        assert all(entry["isl"] == 1024 for entry in result)
+        assert len({entry["job-id"] for entry in result}) == 5
+
+    def test_validation_modes_generate_same_matrix(self, sample_single_node_config, sample_runner_config):
+        def matrix(validation):
+            args = build_parser().parse_args([
+                "full-sweep", "--single-node", "--validation", validation,
+                "--config-files", "unused.yaml", "--runner-config", "unused.yaml",
+            ])
+            return generate_matrix(args, sample_single_node_config, sample_runner_config)
+
+        assert matrix("entry") == matrix("bulk") == matrix("none")
+
+    def test_diff_subcommand(self, tmp_path, capsys, sample_single_node_config, sample_runner_config):
+        def matrix(*extra):
+            args = build_parser().parse_args([
+                "full-sweep", "--single-node", "--seq-lens", "1k1k", *extra,
+                "--config-files", "unused.yaml", "--runner-config", "unused.yaml",
+            ])
+            return generate_matrix(args, sample_single_node_config, sample_runner_config)
+
+        (tmp_path / "old.json").write_text(json.dumps(matrix("--max-conc", "16")))
+        (tmp_path / "new.json").write_text(json.dumps(matrix()))
+        args = build_parser().parse_args(["diff", str(tmp_path / "old.json"), str(tmp_path / "new.json")])
+        result = diff_matrix_files(args)
+        assert [entry["conc"] for entry in result] == [32, 64]
+        assert "2 added, 0 changed, 3 unchanged, 0 removed job(s)" in capsys.readouterr().err
+
+
 # =============================================================================
 # Test edge cases and special configurations
 # =============================================================================
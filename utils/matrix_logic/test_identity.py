@@ -0,0 +1,70 @@
+"""Tests for identity.py"""
+from identity import job_id, job_slot, assign_job_ids, diff_matrices, format_diff_report
+
+
+def make_entry(conc=4, image='lmsysorg/sglang:v0.5.5', **overrides):
+    entry = {
+        'image': image, 'model': 'deepseek-ai/DeepSeek-R1-0528', 'model-prefix': 'dsr1',
+        'precision': 'fp8', 'framework': 'sglang', 'runner': 'h200', 'isl': 1024, 'osl': 1024,
+        'tp': 8, 'ep': 1, 'dp-attn': False, 'spec-decoding': 'none', 'conc': conc,
+        'max-model-len': 2248, 'exp-name': 'dsr1_1k1k', 'disagg': False,
+    }
+    entry.update(overrides)
+    return entry
+
+
+def make_multinode_entry(additional_settings=()):
+    worker = {'num-worker': 1, 'tp': 8, 'ep': 8, 'dp-attn': True,
+              'additional-settings': list(additional_settings)}
+    return {
+        'image': 'nvcr.io/dynamo:0.5.0', 'model': 'deepseek-ai/DeepSeek-R1-0528', 'model-prefix': 'dsr1',
+        'precision': 'fp4', 'framework': 'dynamo-trt', 'runner': 'gb200', 'isl': 1024, 'osl': 1024,
+        'spec-decoding': 'none', 'prefill': dict(worker), 'decode': dict(worker), 'conc': [4, 8],
+        'max-model-len': 2248, 'exp-name': 'dsr1_1k1k', 'disagg': True,
+    }
+
+
+class TestJobId:
+    """Tests for job_id and job_slot."""
+
+    def test_independent_of_field_order_and_annotations(self):
+        entry = make_entry()
+        reordered = dict(reversed(list(entry.items())))
+        annotated = {**entry, 'est-minutes': 30.0, 'runner-node': 'h200-cw_0', 'job-id': 'stale'}
+        assert job_id(entry) == job_id(reordered) == job_id(annotated)
+        assert len(job_id(entry)) == 16
+
+    def test_covers_effective_configuration(self):
+        entry = make_entry()
+        assert job_id(entry) != job_id(make_entry(conc=8))
+        assert job_id(entry) != job_id(make_entry(image='lmsysorg/sglang:v0.5.6'))
+        assert job_id(make_multinode_entry()) != job_id(make_multinode_entry(['KEY=1']))
+
+    def test_slot_ignores_settings(self):
+        assert job_slot(make_entry()) == job_slot(make_entry(image='lmsysorg/sglang:v0.5.6'))
+        assert job_slot(make_multinode_entry()) == job_slot(make_multinode_entry(['KEY=1']))
+        assert job_slot(make_entry()) != job_slot(make_entry(conc=8))
+
+    def test_assign_job_ids_to_shards(self):
+        shards = assign_job_ids([[make_entry(4)], [make_entry(8)]])
+        assert shards[1][0]['job-id'] == job_id(make_entry(8))
+
+
+class TestDiffMatrices:
+    """Tests for diff_matrices."""
+
+    def test_diff(self):
+        old = [make_entry(4), make_entry(8), make_entry(16), make_multinode_entry()]
+        new = [make_entry(4), make_entry(8, image='lmsysorg/sglang:v0.5.6'), make_entry(32),
+               make_multinode_entry(['KEY=1'])]
+        diff = diff_matrices(old, new)
+        assert diff['unchanged'] == [new[0]]
+        assert diff['changed'] == [new[1], new[3]]
+        assert diff['added'] == [new[2]]
+        assert diff['removed'] == [old[2]]
+        assert format_diff_report(diff) == "1 added, 2 changed, 1 unchanged, 1 removed job(s)"
+
+    def test_shards_compare_as_one_matrix(self):
+        old = [[make_entry(4)], [make_entry(8)]]
+        new = [make_entry(8), make_entry(4)]
+        assert len(diff_matrices(old, new)['unchanged']) == 2
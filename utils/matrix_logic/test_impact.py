@@ -0,0 +1,78 @@
+"""Tests for impact.py"""
+import pytest
+from impact import changed_config_keys, config_keys_executing, impacted_config_keys, format_impact_report
+from job_inputs import JobInputs
+
+
+RUNNER_DATA = {
+    'h200': ['h200-nb_0', 'h200-nb_1'],
+    'b200': ['b200-nv_0'],
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Minimal repository with launch and benchmark scripts."""
+    (tmp_path / "runners").mkdir()
+    (tmp_path / "benchmarks").mkdir()
+    (tmp_path / "runners" / "launch_h200-nb.sh").write_text(
+        "bash benchmarks/${EXP_NAME%%_*}_${PRECISION}_h200${FRAMEWORK_SUFFIX}_slurm.sh\n")
+    (tmp_path / "runners" / "launch_b200-nv.sh").write_text(
+        "bash benchmarks/${EXP_NAME%%_*}_${PRECISION}_b200${FRAMEWORK_SUFFIX}_slurm.sh\n")
+    (tmp_path / "benchmarks" / "benchmark_lib.sh").write_text("run_benchmark_serving() { :; }\n")
+    for script in ("dsr1_fp8_h200_slurm.sh", "dsr1_fp8_h200_trt_slurm.sh", "dsr1_fp8_b200_slurm.sh"):
+        (tmp_path / "benchmarks" / script).write_text('source "$(dirname "$0")/benchmark_lib.sh"\n')
+    return tmp_path
+
+
+def make_config(framework='sglang', runner='h200', image='lmsysorg/sglang:v0.5.5'):
+    return {
+        'image': image, 'model': 'deepseek-ai/DeepSeek-R1-0528', 'model-prefix': 'dsr1',
+        'runner': runner, 'precision': 'fp8', 'framework': framework, 'multinode': False,
+        'seq-len-configs': [{'isl': 1024, 'osl': 1024, 'search-space': [{'tp': 8, 'conc-start': 4, 'conc-end': 8}]}],
+    }
+
+
+MASTER_CONFIG = {
+    'dsr1-fp8-h200-sglang': make_config(),
+    'dsr1-fp8-h200-trt': make_config('trt'),
+    'dsr1-fp8-b200-sglang': make_config(runner='b200'),
+}
+
+
+class TestImpact:
+    """Tests for mapping changed files to config keys."""
+
+    def test_config_keys_executing(self, repo):
+        keys_by_path = config_keys_executing(MASTER_CONFIG, JobInputs(RUNNER_DATA, str(repo)))
+        assert keys_by_path['benchmarks/dsr1_fp8_h200_trt_slurm.sh'] == ['dsr1-fp8-h200-trt']
+        assert keys_by_path['runners/launch_h200-nb.sh'] == ['dsr1-fp8-h200-sglang', 'dsr1-fp8-h200-trt']
+        assert len(keys_by_path['benchmarks/benchmark_lib.sh']) == 3
+
+    def test_changed_config_keys(self):
+        new = {**MASTER_CONFIG, 'dsr1-fp8-h200-sglang': make_config(image='lmsysorg/sglang:v0.5.6'),
+               'dsr1-fp8-h100-sglang': make_config(runner='h100')}
+        assert changed_config_keys(MASTER_CONFIG, new) == ['dsr1-fp8-h100-sglang', 'dsr1-fp8-h200-sglang']
+
+    def test_impacted_config_keys(self, repo):
+        inputs = JobInputs(RUNNER_DATA, str(repo))
+        new = {**MASTER_CONFIG, 'dsr1-fp8-b200-sglang': make_config(runner='b200', image='lmsysorg/sglang:v0.5.6')}
+        impact = impacted_config_keys(
+            ['benchmarks/dsr1_fp8_h200_slurm.sh', 'README.md'], new, inputs, MASTER_CONFIG)
+        assert impact == {
+            'dsr1-fp8-b200-sglang': ['master config'],
+            'dsr1-fp8-h200-sglang': ['benchmarks/dsr1_fp8_h200_slurm.sh'],
+        }
+        # Master config changes are only considered when the old master config is given
+        assert list(impacted_config_keys(['README.md'], new, inputs)) == []
+
+    def test_format_impact_report(self):
+        impact = {'dsr1-fp8-h200-sglang': ['benchmarks/dsr1_fp8_h200_slurm.sh']}
+        report = format_impact_report(impact, ['dsr1-fp8-h200-trt'])
+        assert report.splitlines() == [
+            "1 config key(s) affected by the change, 1 requested",
+            "  Affected but not requested:",
+            "    dsr1-fp8-h200-sglang (benchmarks/dsr1_fp8_h200_slurm.sh)",
+            "  Requested but not affected by any changed file:",
+            "    dsr1-fp8-h200-trt",
+        ]
@@ -0,0 +1,93 @@
+"""Tests for job_inputs.py"""
+import pytest
+from job_inputs import JobInputs, image_pinned, launch_script
+
+
+RUNNER_DATA = {
+    'h200': ['h200-cw_0', 'h200-nb_0', 'h200-nb_1'],
+    'gb200': ['gb200-nv_0'],
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Minimal repository with launch and benchmark scripts."""
+    (tmp_path / "runners").mkdir()
+    (tmp_path / "benchmarks").mkdir()
+    (tmp_path / "runners" / "launch_h200-cw.sh").write_text(
+        'MODEL_CODE="${EXP_NAME%%_*}"\n'
+        "bash benchmarks/${MODEL_CODE}_${PRECISION}_h200${FRAMEWORK_SUFFIX}_slurm.sh\n")
+    (tmp_path / "runners" / "launch_h200-nb.sh").write_text(
+        "bash benchmarks/${EXP_NAME%%_*}_${PRECISION}_h200${FRAMEWORK_SUFFIX}_slurm.sh\n")
+    (tmp_path / "runners" / "launch_gb200-nv.sh").write_text(
+        'bash benchmarks/"${EXP_NAME%%_*}_${PRECISION}_gb200_${FRAMEWORK}_slurm.sh"\n')
+    (tmp_path / "benchmarks" / "benchmark_lib.sh").write_text("run_benchmark_serving() { :; }\n")
+    (tmp_path / "benchmarks" / "dsr1_fp8_h200_trt_slurm.sh").write_text(
+        'source "$(dirname "$0")/benchmark_lib.sh"\n')
+    (tmp_path / "benchmarks" / "dsr1_fp8_h200_slurm.sh").write_text(
+        'source "$(dirname "$0")/benchmark_lib.sh"\n')
+    (tmp_path / "benchmarks" / "dsr1_fp4_gb200_dynamo-trt_slurm.sh").write_text("srun ...\n")
+    return tmp_path
+
+
+def make_entry(framework='trt', conc=4, **overrides):
+    entry = {
+        'image': 'nvcr.io/trtllm:1.1', 'model': 'deepseek-ai/DeepSeek-R1-0528', 'model-prefix': 'dsr1',
+        'precision': 'fp8', 'framework': framework, 'runner': 'h200', 'isl': 1024, 'osl': 1024,
+        'tp': 8, 'ep': 1, 'dp-attn': False, 'spec-decoding': 'none', 'conc': conc,
+        'max-model-len': 2248, 'exp-name': 'dsr1_1k1k', 'disagg': False,
+    }
+    entry.update(overrides)
+    return entry
+
+
+# =============================================================================
+# Test JobInputs
+# =============================================================================
+
+class TestJobInputs:
+    """Tests for resolving the files an entry executes."""
+
+    def test_launch_script(self):
+        assert launch_script('h200-nb_1') == 'runners/launch_h200-nb.sh'
+
+    def test_image_pinned(self):
+        assert image_pinned('lmsysorg/sglang@sha256:' + '0' * 64)
+        assert image_pinned('lmsysorg/sglang:v0.5.5@sha256:' + '0' * 64)
+        assert not image_pinned('lmsysorg/sglang:v0.5.5')
+        assert not image_pinned('nvcr.io#nvidia/tensorrt-llm/release:gpt-oss-dev')
+
+    def test_entry_files(self, repo):
+        inputs = JobInputs(RUNNER_DATA, str(repo))
+        assert inputs.entry_files(make_entry()) == [
+            'benchmarks/benchmark_lib.sh', 'benchmarks/dsr1_fp8_h200_trt_slurm.sh',
+            'runners/launch_h200-cw.sh', 'runners/launch_h200-nb.sh']
+        assert 'benchmarks/dsr1_fp8_h200_slurm.sh' in inputs.entry_files(make_entry('sglang'))
+
+    def test_entry_files_of_pinned_and_multinode_entries(self, repo):
+        inputs = JobInputs(RUNNER_DATA, str(repo))
+        pinned = make_entry(**{'runner-node': 'h200-nb_1'})
+        assert 'runners/launch_h200-cw.sh' not in inputs.entry_files(pinned)
+
+        multinode = make_entry('dynamo-trt', runner='gb200', precision='fp4')
+        # The multi-node script doesn't source benchmark_lib.sh
+        assert inputs.entry_files(multinode) == [
+            'benchmarks/dsr1_fp4_gb200_dynamo-trt_slurm.sh', 'runners/launch_gb200-nv.sh']
+
+    def test_input_hash_tracks_script_contents(self, repo):
+        entry = make_entry()
+        before = JobInputs(RUNNER_DATA, str(repo)).input_hash(entry)
+        assert JobInputs(RUNNER_DATA, str(repo)).input_hash(make_entry(conc=8)) != before
+
+        # Editing a script the entry doesn't run leaves its hash alone
+        (repo / "benchmarks" / "dsr1_fp8_h200_slurm.sh").write_text("changed\n")
+        assert JobInputs(RUNNER_DATA, str(repo)).input_hash(entry) == before
+
+        (repo / "benchmarks" / "benchmark_lib.sh").write_text("changed\n")
+        assert JobInputs(RUNNER_DATA, str(repo)).input_hash(entry) != before
+
+    def test_annotations_do_not_change_input_hash(self, repo):
+        inputs = JobInputs(RUNNER_DATA, str(repo))
+        entry = inputs.assign_input_hashes([make_entry()])[0]
+        assert inputs.input_hash({**entry, 'est-minutes': 30.0, 'job-id': 'x'}) == entry['input-hash']
+
@@ -0,0 +1,42 @@
+"""Tests for key_patterns.py"""
+import pytest
+from key_patterns import ConfigKeyResolver, format_resolution_report
+
+
+MASTER_KEYS = [
+    'dsr1-fp8-h200-sglang', 'dsr1-fp8-h200-trt', 'dsr1-fp4-b200-sglang',
+    'gptoss-fp4-h100-vllm', 'gptoss-fp4-h200-vllm',
+]
+
+
+class TestConfigKeyResolver:
+    """Tests for ConfigKeyResolver."""
+
+    def test_resolve(self):
+        matches = ConfigKeyResolver(
+            ['dsr1-fp8-h200-trt', 'dsr1-*-sglang', '*-vllm', 'gptoss-fp4-h*-vllm', 'dsr1-fp8-h200-trt']
+        ).resolve(MASTER_KEYS)
+        assert matches == {
+            'dsr1-fp8-h200-trt': ['dsr1-fp8-h200-trt'],
+            'dsr1-*-sglang': ['dsr1-fp4-b200-sglang', 'dsr1-fp8-h200-sglang'],
+            '*-vllm': ['gptoss-fp4-h100-vllm', 'gptoss-fp4-h200-vllm'],
+            'gptoss-fp4-h*-vllm': ['gptoss-fp4-h100-vllm', 'gptoss-fp4-h200-vllm'],
+        }
+
+    def test_wildcard_must_match_whole_key(self):
+        matches = ConfigKeyResolver(['dsr1-fp8-h200-*', 'dsr1-fp8*trt']).resolve(MASTER_KEYS)
+        assert matches['dsr1-fp8-h200-*'] == ['dsr1-fp8-h200-sglang', 'dsr1-fp8-h200-trt']
+        assert matches['dsr1-fp8*trt'] == ['dsr1-fp8-h200-trt']
+
+    def test_unmatched_patterns(self):
+        with pytest.raises(ValueError, match="No config keys matched the wildcard pattern 'llama-\\*'"):
+            ConfigKeyResolver(['llama-*']).resolve(MASTER_KEYS)
+        with pytest.raises(ValueError, match="Config key 'dsr1-fp8-h100-sglang' not found"):
+            ConfigKeyResolver(['dsr1-*', 'dsr1-fp8-h100-sglang']).resolve(MASTER_KEYS)
+
+    def test_format_resolution_report(self):
+        matches = ConfigKeyResolver(['dsr1-fp8-h200-trt', 'gptoss-*']).resolve(MASTER_KEYS)
+        assert format_resolution_report(matches).splitlines() == [
+            "Resolved 2 config-keys pattern(s) to 3 config key(s)",
+            "  gptoss-*: gptoss-fp4-h100-vllm, gptoss-fp4-h200-vllm",
+        ]
@@ -0,0 +1,65 @@
+"""Tests for kv_cache.py"""
+from kv_cache import (
+    MODEL_GEOMETRIES,
+    fit_conc_range,
+    format_kv_conc_report,
+    max_concurrency,
+    sequence_bytes_per_gpu,
+)
+
+
+def make_config(model_prefix='dsr1', precision='fp8', runner='h200'):
+    return {'model-prefix': model_prefix, 'precision': precision, 'runner': runner}
+
+
+class TestMaxConcurrency:
+    """Tests for KV cache sizing."""
+
+    def test_sequence_bytes(self):
+        dsr1, gptoss = MODEL_GEOMETRIES['dsr1'], MODEL_GEOMETRIES['gptoss']
+        # The MLA latent is held in full by every TP rank
+        assert sequence_bytes_per_gpu(dsr1, 2048, 8, False, 2) == 61 * 576 * 2 * 2048
+        assert sequence_bytes_per_gpu(dsr1, 2048, 4, False, 2) == sequence_bytes_per_gpu(dsr1, 2048, 8, False, 2)
+        # GQA heads are split across TP ranks, but not under DP attention
+        assert sequence_bytes_per_gpu(gptoss, 2048, 2, False, 2) == 2 * 4 * 64 * 2 * (18 * 2048 + 18 * 128)
+        assert sequence_bytes_per_gpu(gptoss, 2048, 2, True, 2) == 2 * sequence_bytes_per_gpu(gptoss, 2048, 2, False, 2)
+        # Heads are replicated once TP exceeds their number
+        assert sequence_bytes_per_gpu(gptoss, 2048, 16, False, 2) == sequence_bytes_per_gpu(gptoss, 2048, 8, False, 2)
+
+    def test_max_concurrency(self):
+        # (141 GB * 0.9 - 690 GB / 8) of HBM left for 2048 token sequences of 61 * 576 * 2 bytes per token
+        assert max_concurrency(make_config(), 1024, 1024, 8) == 282
+        assert max_concurrency(make_config(), 1024, 8192, 8) == 62
+        assert max_concurrency(make_config(), 1024, 1024, 8, dp_attn=True) == 282 * 8
+        # Weights alone exceed the usable HBM
+        assert max_concurrency(make_config(), 1024, 1024, 4) == 0
+
+    def test_unknown_model_or_runner(self):
+        assert max_concurrency(make_config(model_prefix='llama'), 1024, 1024, 8) is None
+        assert max_concurrency(make_config(runner='h300'), 1024, 1024, 8) is None
+
+
+class TestFitConcRange:
+    """Tests for fit_conc_range."""
+
+    def test_clip(self):
+        assert fit_conc_range(4, 64, 62, 'clip') == (4, 32)
+        assert fit_conc_range(4, 16, 62, 'clip') == (4, 16)
+        # The lowest concurrency is always kept
+        assert fit_conc_range(4, 64, 2, 'clip') == (4, 4)
+
+    def test_extend(self):
+        assert fit_conc_range(4, 16, 282, 'extend') == (4, 256)
+        assert fit_conc_range(4, 64, 62, 'extend') == (4, 32)
+        assert fit_conc_range(1, 64, 300, 'extend', step_size=4) == (1, 256)
+        # Not past the largest batch the servers are sized for
+        assert fit_conc_range(4, 16, 5000, 'extend') == (4, 512)
+
+    def test_format_kv_conc_report(self):
+        report = format_kv_conc_report([('dsr1-fp8-h200-sglang', 1024, 8192, 8, 64, 32),
+                                        ('dsr1-fp8-h200-sglang', 1024, 1024, 8, 64, 256)])
+        assert report.splitlines() == [
+            "Fit 2 concurrency range(s) to the KV cache: 1 clipped, 1 extended",
+            "  dsr1-fp8-h200-sglang isl=1024 osl=8192 tp=8: conc-end 64 -> 32",
+            "  dsr1-fp8-h200-sglang isl=1024 osl=1024 tp=8: conc-end 64 -> 256",
+        ]
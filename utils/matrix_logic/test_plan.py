@@ -0,0 +1,66 @@
+"""Tests for plan.py"""
+from plan import EntryPlan, format_plan_report, job_breakdown, queue_minutes
+
+
+RUNNER_DATA = {
+    'h200': ['h200-cw_0', 'h200-cw_1'],
+    'b200': ['b200-nb_0'],
+}
+
+
+def make_job(runner, est_minutes, tp=8, seq_len='1k1k'):
+    return {'runner': runner, 'est-minutes': est_minutes, 'tp': tp, 'model-prefix': 'gptoss',
+            'exp-name': f'gptoss_{seq_len}', 'conc': 4}
+
+
+class TestPlan:
+    """Tests for job_breakdown, queue_minutes and format_plan_report."""
+
+    def test_job_breakdown(self):
+        jobs = [make_job('h200', 60), make_job('b200', 30, tp=4), make_job('h200', 30, seq_len='8k1k'),
+                make_job('h200', 60)]
+        assert job_breakdown(jobs) == {
+            ('b200', '1k1k'): (1, 2.0),
+            ('h200', '1k1k'): (2, 16.0),
+            ('h200', '8k1k'): (1, 4.0),
+        }
+
+    def test_queue_minutes(self):
+        jobs = [make_job('h200', minutes) for minutes in (50, 40, 30)] + [make_job('b200', 20)]
+        assert queue_minutes(jobs, RUNNER_DATA) == {'b200': 20.0, 'h200': 70.0}
+        # Jobs are not pinned to nodes
+        assert all('runner-node' not in job for job in jobs)
+
+    def test_format_plan_report(self):
+        plans = [
+            EntryPlan('https://github.com/InferenceMAX/InferenceMAX/pull/1',
+                      {'gptoss-*': ['gptoss-fp4-b200-vllm', 'gptoss-fp4-h200-vllm']},
+                      ['gptoss-fp4-b200-vllm', 'gptoss-fp4-h200-vllm'],
+                      [make_job('h200', 90), make_job('h200', 90), make_job('b200', 60)]),
+            EntryPlan('https://github.com/InferenceMAX/InferenceMAX/pull/2',
+                      {'gptoss-fp4-h200-vllm': ['gptoss-fp4-h200-vllm']}, [], []),
+        ]
+        assert format_plan_report(plans, RUNNER_DATA, cached_jobs=3).splitlines() == [
+            "Sweep plan for 2 changelog entry(ies): 3 job(s), 32.0 GPU-hours, queue time 1.5 h",
+            "  3 job(s) reuse cached results and are not counted",
+            "  Queue: b200 1.0 h on 1 node(s), h200 1.5 h on 2 node(s)",
+            "",
+            "Entry 1 (https://github.com/InferenceMAX/InferenceMAX/pull/1): 2 config key(s), 3 job(s), 32.0 GPU-hours",
+            "  gptoss-* -> 2 config key(s)",
+            "  Config keys: gptoss-fp4-b200-vllm, gptoss-fp4-h200-vllm",
+            "  b200 1k1k: 1 job(s), 8.0 GPU-hours",
+            "  h200 1k1k: 2 job(s), 24.0 GPU-hours",
+            "  Queue: b200 1.0 h on 1 node(s), h200 1.5 h on 2 node(s)",
+            "",
+            "Entry 2 (https://github.com/InferenceMAX/InferenceMAX/pull/2): 0 config key(s), 0 job(s), 0.0 GPU-hours",
+            "  Not run by this entry: gptoss-fp4-h200-vllm",
+        ]
+
+    def test_format_plan_report_without_history(self):
+        plans = [EntryPlan('https://github.com/InferenceMAX/InferenceMAX/pull/1',
+                           {'gptoss-fp4-h200-vllm': ['gptoss-fp4-h200-vllm']},
+                           ['gptoss-fp4-h200-vllm'], [make_job('h200', 25)])]
+        lines = format_plan_report(plans, RUNNER_DATA, has_history=False).splitlines()
+        assert lines[1] == ("  Warning: no runtime history, jobs are estimated at the defaults of 15 minutes "
+                            "startup plus 10 minutes per concurrency; GPU-hours and queue times only "
+                            "reflect job counts")
@@ -0,0 +1,147 @@
+"""Tests for pruning.py"""
+import json
+
+import pytest
+from adaptive import result_point_key
+from pruning import (
+    load_history,
+    dominated_points,
+    consistently_dominated,
+    estimate_gpu_hours,
+    format_pruning_report,
+)
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+def make_result(tp, conc, tput_per_gpu, median_intvty, **overrides):
+    """Single-node result JSON as written by process_result.py."""
+    result = {
+        'hw': 'h200',
+        'conc': conc,
+        'infmax_model_prefix': 'dsr1',
+        'framework': 'sglang',
+        'precision': 'fp8',
+        'spec_decoding': 'none',
+        'isl': 1024,
+        'osl': 1024,
+        'is_multinode': False,
+        'tp': tp,
+        'ep': 1,
+        'dp_attention': 'false',
+        'tput_per_gpu': tput_per_gpu,
+        'median_intvty': median_intvty,
+        'median_ttft': 0.5,
+    }
+    result.update(overrides)
+    return result
+
+
+def make_sweep(*results):
+    return {(result_point_key(r), r['conc']): r for r in results}
+
+
+def key_of(result):
+    return (result_point_key(result), result['conc'])
+
+
+# tp4 at conc 4 is beaten on both axes by tp8 at conc 8
+TP8_CONC8 = make_result(8, 8, 500.0, 120.0)
+TP4_CONC4 = make_result(4, 4, 400.0, 100.0)
+TP4_CONC64 = make_result(4, 64, 1500.0, 30.0)
+
+
+# =============================================================================
+# Test dominated_points
+# =============================================================================
+
+class TestDominatedPoints:
+    """Tests for dominated_points."""
+
+    def test_dominated_on_both_axes(self):
+        sweep = make_sweep(TP8_CONC8, TP4_CONC4, TP4_CONC64)
+        assert dominated_points(sweep) == {key_of(TP4_CONC4)}
+
+    def test_within_margin_is_kept(self):
+        close = make_result(4, 4, 490.0, 118.0)
+        sweep = make_sweep(TP8_CONC8, close)
+        assert dominated_points(sweep, margin=0.05) == set()
+        assert dominated_points(sweep, margin=0.01) == {key_of(close)}
+
+    def test_needs_both_axes(self):
+        # Higher throughput but lower interactivity is a trade-off, not dominance
+        sweep = make_sweep(TP8_CONC8, make_result(4, 4, 400.0, 130.0))
+        assert dominated_points(sweep) == set()
+
+    def test_groups_are_separate(self):
+        other_framework = make_result(4, 4, 400.0, 100.0, framework='trt')
+        assert dominated_points(make_sweep(TP8_CONC8, other_framework)) == set()
+
+    def test_invalid_margin(self):
+        with pytest.raises(ValueError, match="must be positive"):
+            dominated_points(make_sweep(TP8_CONC8), margin=0)
+
+
+# =============================================================================
+# Test consistently_dominated and load_history
+# =============================================================================
+
+class TestConsistentlyDominated:
+    """Tests for consistently_dominated and load_history."""
+
+    def test_dominated_in_all_recent_sweeps(self):
+        sweep = make_sweep(TP8_CONC8, TP4_CONC4, TP4_CONC64)
+        pruned = consistently_dominated([sweep] * 3, min_sweeps=3)
+        assert pruned == {key_of(TP4_CONC4): TP4_CONC4}
+
+    def test_not_dominated_in_one_sweep(self):
+        dominated = make_sweep(TP8_CONC8, TP4_CONC4)
+        not_dominated = make_sweep(TP8_CONC8, make_result(4, 4, 600.0, 100.0))
+        assert consistently_dominated([dominated, not_dominated, dominated], min_sweeps=3) == {}
+
+    def test_only_recent_sweeps_count(self):
+        dominated = make_sweep(TP8_CONC8, TP4_CONC4)
+        not_dominated = make_sweep(TP8_CONC8, make_result(4, 4, 600.0, 100.0))
+        assert consistently_dominated([not_dominated, dominated, dominated], min_sweeps=2)
+
+    def test_missing_in_latest_sweep_is_not_pruned(self):
+        dominated = make_sweep(TP8_CONC8, TP4_CONC4)
+        assert consistently_dominated([dominated, dominated, make_sweep(TP8_CONC8)], min_sweeps=3) == {}
+
+    def test_too_little_history(self):
+        assert consistently_dominated([make_sweep(TP8_CONC8, TP4_CONC4)], min_sweeps=2) == {}
+
+    def test_load_history(self, tmp_path):
+        (tmp_path / "2025-01-01.json").write_text(json.dumps([TP8_CONC8, TP4_CONC4]))
+        run_dir = tmp_path / "2025-01-02"
+        run_dir.mkdir()
+        (run_dir / "a.json").write_text(json.dumps(TP8_CONC8))
+        (run_dir / "b.json").write_text(json.dumps(make_result(4, 4, 0.0, 0.0)))
+
+        history = load_history(str(tmp_path))
+        assert [len(sweep) for sweep in history] == [2, 1]
+
+    def test_load_missing_history(self, tmp_path):
+        with pytest.raises(ValueError, match="does not exist"):
+            load_history(str(tmp_path / "missing"))
+
+
+# =============================================================================
+# Test reporting
+# =============================================================================
+
+class TestReport:
+    """Tests for estimate_gpu_hours and format_pruning_report."""
+
+    def test_estimate_gpu_hours(self):
+        # 4 * 10 prompts of 2048 tokens at 400 tok/s/GPU
+        assert estimate_gpu_hours(TP4_CONC4) == pytest.approx(4 * 10 * 2048 / 400 / 3600)
+        # Launch scripts with other prompt multipliers record the number of prompts they ran
+        assert estimate_gpu_hours({**TP4_CONC4, 'num_prompts': 20}) == pytest.approx(20 * 2048 / 400 / 3600)
+
+    def test_report(self):
+        report = format_pruning_report([TP4_CONC4])
+        assert report.splitlines()[0] == "Pruned 1 dominated sweep point(s), saving an estimated 0.06 GPU-hours:"
+        assert "dsr1-fp8-h200-sglang isl=1024 osl=1024 tp=4 ep=1 dp-attn=false conc=4" in report
@@ -0,0 +1,44 @@
+"""Tests for result_cache.py"""
+import json
+
+from result_cache import load_result_cache, split_cached
+
+
+PINNED_IMAGE = 'vllm/vllm-openai@sha256:' + 'ab' * 32
+
+
+def make_entry(conc, input_hash, image=PINNED_IMAGE):
+    return {'runner': 'h200', 'image': image, 'conc': conc, 'input-hash': input_hash}
+
+
+class TestResultCache:
+    """Tests for load_result_cache and split_cached."""
+
+    def test_split_cached(self, tmp_path):
+        results = [{'input_hash': 'aaa', 'conc': 4}, {'input_hash': 'bbb', 'conc': 4},
+                   {'input_hash': 'bbb', 'conc': 8}, {'conc': 16}]
+        (tmp_path / "run1.json").write_text(json.dumps(results))
+        cache = load_result_cache(str(tmp_path))
+        assert sorted(cache) == ['aaa', 'bbb']
+
+        entries = [make_entry(4, 'aaa'), make_entry([4, 8], 'bbb'), make_entry([4, 8, 16], 'bbb'),
+                   make_entry(16, 'ccc')]
+        to_run, hits, cached_results, unpinned = split_cached(entries, cache)
+        assert hits == entries[:2]
+        # Partially cached entries run again in full
+        assert to_run == entries[2:]
+        assert cached_results == results[:3]
+        assert unpinned == []
+
+    def test_unpinned_images_are_not_reused(self, tmp_path):
+        """A tag may have been re-pushed since its results ran, so only digests are reused."""
+        (tmp_path / "run1.json").write_text(json.dumps([{'input_hash': 'aaa', 'conc': 4},
+                                                        {'input_hash': 'bbb', 'conc': 4}]))
+        cache = load_result_cache(str(tmp_path))
+        entries = [make_entry(4, 'aaa', image='vllm/vllm-openai:latest'), make_entry(4, 'bbb'),
+                   make_entry(4, 'ccc', image='vllm/vllm-openai:nightly')]
+        to_run, hits, cached_results, unpinned = split_cached(entries, cache)
+        assert hits == [entries[1]]
+        assert to_run == [entries[0], entries[2]]
+        assert unpinned == [entries[0]]
+        assert cached_results == [{'input_hash': 'bbb', 'conc': 4}]
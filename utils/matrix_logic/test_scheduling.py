@@ -0,0 +1,76 @@
+"""Tests for scheduling.py"""
+import pytest
+from scheduling import schedule_lpt, shard_lpt, format_schedule_report
+
+
+def make_entry(runner, est_minutes, conc=4):
+    return {'runner': runner, 'est-minutes': est_minutes, 'conc': conc}
+
+
+RUNNER_DATA = {
+    'h200': ['h200-cw_0', 'h200-cw_1'],
+    'mi300x': ['mi300x-amd_0', 'mi300x-amd_1', 'mi300x-amd_2'],
+}
+
+
+class TestScheduleLpt:
+    """Tests for schedule_lpt."""
+
+    def test_longest_first_on_least_loaded_node(self):
+        entries = [make_entry('h200', minutes) for minutes in (30, 20, 50, 10, 40)]
+        schedule = schedule_lpt(entries, RUNNER_DATA)
+        # 50 -> cw_0, 40 -> cw_1, 30 -> cw_1, 20 -> cw_0, 10 -> cw_0
+        assert [e['runner-node'] for e in entries] == ['h200-cw_1', 'h200-cw_0', 'h200-cw_0',
+                                                      'h200-cw_0', 'h200-cw_1']
+        assert schedule['h200'] == [('h200-cw_0', 80.0, 3), ('h200-cw_1', 70.0, 2)]
+
+    def test_runners_are_scheduled_separately(self):
+        entries = [make_entry('h200', 60), make_entry('mi300x', 60), make_entry('mi300x', 60)]
+        schedule = schedule_lpt(entries, RUNNER_DATA)
+        assert entries[0]['runner-node'] == 'h200-cw_0'
+        assert [e['runner-node'] for e in entries[1:]] == ['mi300x-amd_0', 'mi300x-amd_1']
+        assert [count for _, _, count in schedule['mi300x']] == [1, 1, 0]
+
+    def test_deterministic(self):
+        entries = [make_entry('h200', 10, conc) for conc in range(6)]
+        schedule_lpt(entries, RUNNER_DATA)
+        assert [e['runner-node'] for e in entries] == ['h200-cw_0', 'h200-cw_1'] * 3
+
+    def test_unknown_runner(self):
+        with pytest.raises(ValueError, match="Runner 'b200' has no nodes"):
+            schedule_lpt([make_entry('b200', 10)], RUNNER_DATA)
+
+    def test_report(self):
+        entries = [make_entry('h200', minutes) for minutes in (30, 20, 50, 10, 40)]
+        report = format_schedule_report(schedule_lpt(entries, RUNNER_DATA))
+        assert report.splitlines() == [
+            "Scheduled makespan 80.0 minutes",
+            "  h200: 5 job(s) on 2 node(s), makespan 80.0 minutes, mean node load 75.0 minutes",
+        ]
+
+
+class TestShardLpt:
+    """Tests for shard_lpt."""
+
+    def test_balances_minutes_and_keeps_order(self):
+        entries = [make_entry('h200', minutes, conc) for conc, minutes in enumerate((30, 20, 50, 10, 40))]
+        shards = shard_lpt(entries, 2)
+        assert [[e['conc'] for e in shard] for shard in shards] == [[1, 2, 3], [0, 4]]
+        assert [sum(e['est-minutes'] for e in shard) for shard in shards] == [80, 70]
+
+    def test_respects_max_jobs(self):
+        # One long job and many short ones: the short ones may not all pile onto one shard
+        entries = [make_entry('h200', 100)] + [make_entry('h200', 1, conc) for conc in range(5)]
+        shards = shard_lpt(entries, 2, max_jobs=3)
+        assert [len(shard) for shard in shards] == [3, 3]
+
+    def test_omits_empty_shards(self):
+        assert shard_lpt([make_entry('h200', 10)], 3) == [[make_entry('h200', 10)]]
+        assert shard_lpt([], 2) == []
+
+    def test_too_many_jobs(self):
+        entries = [make_entry('h200', 10, conc) for conc in range(5)]
+        with pytest.raises(ValueError, match="use at least 3 shards"):
+            shard_lpt(entries, 2, max_jobs=2)
+        with pytest.raises(ValueError, match="must be positive"):
+            shard_lpt(entries, 0)
@@ -0,0 +1,47 @@
+"""Tests for server_settings.py"""
+import re
+from pathlib import Path
+
+from server_settings import CONC_SERVER_SETTINGS, benchmark_script_name, conc_server_settings
+
+BENCHMARKS_DIR = Path(__file__).resolve().parents[2] / "benchmarks"
+
+# Uses of CONC that only configure the benchmark client, not the server
+CLIENT_CONC_USES = re.compile(r'--max-concurrency "\$CONC"|--num-prompts \$\(\( \$CONC \* 10 \)\)|^\s*echo ')
+
+
+def make_entry(conc, model_prefix='dsr1', precision='fp8', runner='b200', framework='sglang', isl=1024):
+    return {'model-prefix': model_prefix, 'precision': precision, 'runner': runner,
+            'framework': framework, 'isl': isl, 'conc': conc}
+
+
+class TestServerSettings:
+    """Tests for the CONC-dependent settings of benchmark scripts."""
+
+    def test_benchmark_script_name(self):
+        assert benchmark_script_name(make_entry(4)) == 'dsr1_fp8_b200'
+        assert benchmark_script_name(make_entry(4, runner='b200-trt', framework='trt')) == 'dsr1_fp8_b200_trt'
+        assert benchmark_script_name(make_entry(4, runner='h200', framework='trt')) == 'dsr1_fp8_h200_trt'
+
+    def test_conc_server_settings(self):
+        # SCHEDULER_RECV_INTERVAL changes at conc 16
+        assert conc_server_settings(make_entry(8)) != conc_server_settings(make_entry(16))
+        assert conc_server_settings(make_entry(16)) == conc_server_settings(make_entry(64))
+        # MAX_NUM_TOKENS is rounded up to multiples of 64
+        trt = dict(runner='b200-trt', framework='trt')
+        assert conc_server_settings(make_entry(4, **trt)) == conc_server_settings(make_entry(64, **trt))
+        assert conc_server_settings(make_entry(64, **trt)) != conc_server_settings(make_entry(128, **trt))
+        # Scripts that don't depend on CONC
+        assert conc_server_settings(make_entry(4, runner='mi300x')) is None
+        assert conc_server_settings(make_entry(512, runner='mi300x')) is None
+
+    def test_covers_benchmark_scripts(self):
+        """Every single-node script that configures its server by CONC is listed, and only those."""
+        scripts = set()
+        for script in BENCHMARKS_DIR.glob("*_*.sh"):
+            name = re.sub(r'_(docker|slurm)$', '', script.stem)
+            for line in script.read_text().splitlines():
+                if re.search(r'\$CONC\b', line) and not line.lstrip().startswith('#') \
+                        and not CLIENT_CONC_USES.search(line):
+                    scripts.add(name)
+        assert scripts == set(CONC_SERVER_SETTINGS)
@@ -1,5 +1,9 @@
 """Comprehensive tests for validation.py"""
+import importlib.util
+import pickle
+
 import pytest
+import validation
 from validation import (
     Fields,
     SingleNodeMatrixEntry,
@@ -12,10 +16,18 @@ from validation import (
     SingleNodeMasterConfigEntry,
     MultiNodeMasterConfigEntry,
     validate_matrix_entry,
+    validate_matrix_entries,
     validate_master_config,
     validate_runner_config,
     load_config_files,
     load_runner_file,
+    load_seq_len_profiles,
+    resolve_seq_len_profiles,
+    validate_seq_len_profiles,
+    ConfigIndex,
+    MasterConfig,
+    get_config_index,
+    CONFIG_CACHE_DIR_ENV,
 )
 
 
@@ -36,6 +48,7 @@ def valid_single_node_matrix_entry():
         "runner": "mi355x",
         "isl": 1024,
         "osl": 1024,
+        "random-range-ratio": 0.8,
         "tp": 8,
         "ep": 1,
         "dp-attn": False,
@@ -59,6 +72,7 @@ def valid_multinode_matrix_entry():
         "runner": "gb200",
         "isl": 1024,
         "osl": 1024,
+        "random-range-ratio": 0.8,
         "prefill": {
             "num-worker": 5,
             "tp": 4,
@@ -271,6 +285,14 @@ class TestSingleNodeMatrixEntry:
         entry = SingleNodeMatrixEntry(**valid_single_node_matrix_entry)
         assert entry.conc == [4, 8, 16, 32, 64]
 
+    def test_est_minutes_is_optional_and_not_dumped(self, valid_single_node_matrix_entry):
+        """est-minutes annotates entries for scheduling but is not a benchmark input."""
+        assert SingleNodeMatrixEntry(**valid_single_node_matrix_entry).est_minutes is None
+        valid_single_node_matrix_entry["est-minutes"] = 42.5
+        entry = SingleNodeMatrixEntry(**valid_single_node_matrix_entry)
+        assert entry.est_minutes == 42.5
+        assert "est-minutes" not in entry.model_dump(by_alias=True)
+
     def test_spec_decoding_values(self, valid_single_node_matrix_entry):
         """Spec decoding should accept valid literal values."""
         for value in ["mtp", "draft_model", "none"]:
@@ -370,6 +392,23 @@ class TestValidateMatrixEntry:
         assert "failed validation" in str(exc_info.value)
 
 
+class TestValidateMatrixEntries:
+    """Tests for validate_matrix_entries function."""
+
+    def test_valid_mixed_matrix(self, valid_single_node_matrix_entry, valid_multinode_matrix_entry):
+        """A valid matrix of both entry types should be returned as is."""
+        matrix = [valid_single_node_matrix_entry, valid_multinode_matrix_entry]
+        assert validate_matrix_entries(matrix) is matrix
+
+    def test_invalid_entry_raises_valueerror(self, valid_single_node_matrix_entry):
+        """The failing entry should be named in the error."""
+        invalid = {**valid_single_node_matrix_entry, "tp": "eight"}
+        with pytest.raises(ValueError) as exc_info:
+            validate_matrix_entries([valid_single_node_matrix_entry, invalid])
+        assert "failed validation" in str(exc_info.value)
+        assert "'tp': 'eight'" in str(exc_info.value)
+
+
 # =============================================================================
 # Test SingleNodeSearchSpaceEntry
 # =============================================================================
@@ -614,6 +653,45 @@ class TestSeqLenConfigs:
         assert config.isl == 1024
         assert config.osl == 1024
 
+    def test_seq_len_config_with_profile(self):
+        """A seq-len config can name a profile instead of giving isl and osl."""
+        config = SingleNodeSeqLenConfig(**{
+            "profile": "1k8k",
+            "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 64}]
+        })
+        assert config.profile == "1k8k"
+        assert config.isl is None
+
+    def test_profile_cannot_be_combined_with_lengths(self):
+        """isl, osl and random-range-ratio come from the profile."""
+        for extra in ({"isl": 1024}, {"random-range-ratio": 0.5}):
+            with pytest.raises(ValueError, match="The profile defines them"):
+                SingleNodeSeqLenConfig(**{
+                    "profile": "1k1k", **extra,
+                    "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 64}]
+                })
+
+    def test_must_have_profile_or_lengths(self):
+        """Either a profile or both isl and osl are required."""
+        with pytest.raises(ValueError, match="Must specify either 'profile' or both 'isl' and 'osl'"):
+            SingleNodeSeqLenConfig(**{
+                "isl": 1024,
+                "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 64}]
+            })
+
+    def test_random_range_ratio_with_lengths(self):
+        """A seq-len config with isl and osl may set its own random-range-ratio in [0, 1]."""
+        config = SingleNodeSeqLenConfig(**{
+            "isl": 1024, "osl": 1024, "random-range-ratio": 0.5,
+            "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 64}]
+        })
+        assert config.random_range_ratio == 0.5
+        with pytest.raises(ValueError):
+            SingleNodeSeqLenConfig(**{
+                "isl": 1024, "osl": 1024, "random-range-ratio": 1.5,
+                "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 64}]
+            })
+
 
 # =============================================================================
 # Test MasterConfigEntry models
@@ -742,6 +820,77 @@ class TestValidateRunnerConfig:
         assert "gb200" in result
 
 
+# =============================================================================
+# Test ConfigIndex
+# =============================================================================
+
+@pytest.fixture
+def indexed_master_config():
+    """Minimal master config entries covering the indexed fields."""
+    def entry(prefix, precision, framework, runner, multinode=False):
+        return {"model-prefix": prefix, "precision": precision, "framework": framework,
+                "runner": runner, "multinode": multinode}
+
+    return {
+        "gptoss-fp4-h200-vllm": entry("gptoss", "fp4", "vllm", "h200"),
+        "dsr1-fp8-h200-trt": entry("dsr1", "fp8", "trt", "h200"),
+        "dsr1-fp4-b200-sglang": entry("dsr1", "fp4", "sglang", "b200"),
+        "dsr1-fp4-gb200-dynamo-trt": entry("dsr1", "fp4", "dynamo-trt", "gb200", multinode=True),
+        "dsr1-fp8-mi300x-sglang": entry("dsr1", "fp8", "sglang", "mi300x"),
+    }
+
+
+class TestConfigIndex:
+    """Tests for ConfigIndex selection."""
+
+    def test_no_filters_returns_all_in_order(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        assert index.select() == list(indexed_master_config)
+
+    def test_key_prefix(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        assert index.select(key_prefixes=["dsr1-fp4"]) == [
+            "dsr1-fp4-b200-sglang", "dsr1-fp4-gb200-dynamo-trt"]
+
+    def test_multiple_key_prefixes(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        assert index.select(key_prefixes=["gptoss", "dsr1-fp8-m"]) == [
+            "gptoss-fp4-h200-vllm", "dsr1-fp8-mi300x-sglang"]
+
+    def test_intersection_preserves_master_order(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        selected = index.select(precisions=["fp4", "fp8"], frameworks=["sglang", "trt"], multinode=False)
+        assert selected == ["dsr1-fp8-h200-trt", "dsr1-fp4-b200-sglang", "dsr1-fp8-mi300x-sglang"]
+
+    def test_runner_and_model_prefix(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        assert index.select(runners=["h200"], model_prefixes=["dsr1"]) == ["dsr1-fp8-h200-trt"]
+
+    def test_multinode(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        assert index.select(multinode=True) == ["dsr1-fp4-gb200-dynamo-trt"]
+
+    def test_no_match(self, indexed_master_config):
+        index = ConfigIndex(indexed_master_config)
+        assert index.select(runners=["h100"]) == []
+        assert index.select(key_prefixes=["zzz"]) == []
+
+    def test_get_config_index(self, indexed_master_config):
+        master = MasterConfig(indexed_master_config)
+        assert get_config_index(master) is master.index
+        assert get_config_index(indexed_master_config).select(runners=["b200"]) == ["dsr1-fp4-b200-sglang"]
+
+    def test_get_config_index_reuses_other_module_copy(self, indexed_master_config):
+        """A MasterConfig from matrix_logic.validation is a different class than ours."""
+        spec = importlib.util.spec_from_file_location("matrix_logic.validation", validation.__file__)
+        other = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(other)
+
+        master = other.MasterConfig(indexed_master_config)
+        assert not isinstance(master, MasterConfig)
+        assert get_config_index(master) is master.index
+
+
 # =============================================================================
 # Test load_config_files
 # =============================================================================
@@ -757,6 +906,8 @@ class TestLoadConfigFiles:
         result = load_config_files([str(config_file)])
         assert "test-config" in result
         assert result["test-config"]["image"] == valid_single_node_master_config["image"]
+        assert isinstance(result, MasterConfig)
+        assert result.index.select(runners=[valid_single_node_master_config["runner"]]) == ["test-config"]
 
     def test_load_single_file_without_validation(self, tmp_path):
         """Should load a single config file without validation when validate=False."""
@@ -821,6 +972,59 @@ invalid-config:
         assert "failed validation" in str(exc_info.value)
 
 
+# =============================================================================
+# Test seq-len profiles
+# =============================================================================
+
+class TestSeqLenProfiles:
+    """Tests for seq-len profile loading and resolution."""
+
+    def test_default_profiles(self):
+        """The shipped profiles include the standard sequence lengths."""
+        profiles = load_seq_len_profiles()
+        assert profiles["1k1k"] == {"isl": 1024, "osl": 1024, "random-range-ratio": 0.8}
+        assert (profiles["8k1k"]["isl"], profiles["8k1k"]["osl"]) == (8192, 1024)
+
+    def test_invalid_profiles(self):
+        """Profiles must have positive isl and osl and no extra fields."""
+        with pytest.raises(ValueError, match="Seq-len profile 'rag' failed validation"):
+            validate_seq_len_profiles({"rag": {"isl": 0, "osl": 1024}})
+        with pytest.raises(ValueError, match="Seq-len profile 'rag' failed validation"):
+            validate_seq_len_profiles({"rag": {"isl": 32768, "osl": 1024, "dataset": "rag"}})
+        with pytest.raises(ValueError, match="must be a dictionary"):
+            validate_seq_len_profiles({"rag": [32768, 1024]})
+
+    def test_resolve(self, valid_single_node_master_config):
+        """Seq-len configs naming a profile get its lengths; others are left untouched."""
+        explicit = dict(valid_single_node_master_config["seq-len-configs"][0])
+        valid_single_node_master_config["seq-len-configs"].append(
+            {"profile": "rag", "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 8}]})
+        resolve_seq_len_profiles({"test-config": valid_single_node_master_config},
+                                 {"rag": {"isl": 32768, "osl": 1024}})
+        seq_len_configs = valid_single_node_master_config["seq-len-configs"]
+        assert seq_len_configs[0] == explicit
+        assert (seq_len_configs[1]["isl"], seq_len_configs[1]["osl"]) == (32768, 1024)
+        assert seq_len_configs[1]["random-range-ratio"] == 0.8
+        assert seq_len_configs[1]["profile"] == "rag"
+
+    def test_load_config_files_resolves_profiles(self, tmp_path, valid_single_node_master_config):
+        """load_config_files resolves profiles from the given profiles file."""
+        import yaml
+        profiles_file = tmp_path / "seq-len-profiles.yaml"
+        profiles_file.write_text(yaml.dump({"chat": {"isl": 512, "osl": 256, "random-range-ratio": 0.5}}))
+        valid_single_node_master_config["seq-len-configs"][0] = {
+            "profile": "chat", "search-space": [{"tp": 8, "conc-start": 4, "conc-end": 8}]}
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump({"test-config": valid_single_node_master_config}))
+
+        result = load_config_files([str(config_file)], seq_len_profiles_file=str(profiles_file))
+        seq_len_config = result["test-config"]["seq-len-configs"][0]
+        assert (seq_len_config["isl"], seq_len_config["osl"], seq_len_config["random-range-ratio"]) == (512, 256, 0.5)
+
+        with pytest.raises(ValueError, match="unknown seq-len profile 'chat'. Known profiles: 1k1k, 1k8k, 8k1k"):
+            load_config_files([str(config_file)])
+
+
 # =============================================================================
 # Test load_runner_file
 # =============================================================================
@@ -867,3 +1071,96 @@ h100: not-a-list
         with pytest.raises(ValueError) as exc_info:
             load_runner_file(str(runner_file))
         assert "must be a list" in str(exc_info.value)
+
+
+# =============================================================================
+# Test config snapshot cache
+# =============================================================================
+
+class TestConfigSnapshotCache:
+    """Tests for the snapshot cache used by load_config_files and load_runner_file."""
+
+    @pytest.fixture
+    def config_file(self, tmp_path, valid_single_node_master_config):
+        import yaml
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump({"test-config": valid_single_node_master_config}))
+        return config_file
+
+    @pytest.fixture
+    def no_yaml(self, monkeypatch):
+        """Fail any attempt to parse YAML, to prove a snapshot was used."""
+        def fail(*args, **kwargs):
+            raise AssertionError("YAML should not be parsed on a cache hit")
+        monkeypatch.setattr("validation.yaml.safe_load", fail)
+
+    def test_fresh_snapshot_skips_parsing(self, tmp_path, config_file, request):
+        cache_dir = tmp_path / "cache"
+        first = load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+        request.getfixturevalue("no_yaml")
+        second = load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        assert second == first
+        assert isinstance(second, MasterConfig)
+        assert second.index.select() == ["test-config"]
+
+    def test_snapshot_is_plain_dict(self, tmp_path, config_file):
+        """Snapshots must not depend on which import path loaded this module."""
+        cache_dir = tmp_path / "cache"
+        load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        snapshot, = cache_dir.glob("*.pickle")
+        assert type(pickle.loads(snapshot.read_bytes())) is dict
+
+    def test_changed_file_invalidates_snapshot(self, tmp_path, config_file):
+        cache_dir = tmp_path / "cache"
+        load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        config_file.write_text(config_file.read_text().replace("test-config", "renamed-config"))
+
+        result = load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        assert list(result) == ["renamed-config"]
+        assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+    def test_validate_flag_is_part_of_key(self, tmp_path, config_file):
+        cache_dir = tmp_path / "cache"
+        load_config_files([str(config_file)], validate=False, cache_dir=str(cache_dir))
+        load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+    def test_failed_validation_is_not_cached(self, tmp_path):
+        cache_dir = tmp_path / "cache"
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("invalid-config:\n  image: test-image\n")
+        for _ in range(2):
+            with pytest.raises(ValueError, match="failed validation"):
+                load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        assert not list(cache_dir.glob("*.pickle"))
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path, config_file):
+        cache_dir = tmp_path / "cache"
+        load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        snapshot, = cache_dir.glob("*.pickle")
+        snapshot.write_bytes(b"not a pickle")
+
+        result = load_config_files([str(config_file)], cache_dir=str(cache_dir))
+        assert list(result) == ["test-config"]
+
+    def test_cache_dir_from_environment(self, tmp_path, config_file, monkeypatch):
+        cache_dir = tmp_path / "env-cache"
+        monkeypatch.setenv(CONFIG_CACHE_DIR_ENV, str(cache_dir))
+        load_config_files([str(config_file)])
+        assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    def test_no_cache_by_default(self, tmp_path, config_file, monkeypatch):
+        monkeypatch.delenv(CONFIG_CACHE_DIR_ENV, raising=False)
+        load_config_files([str(config_file)])
+        assert not list(tmp_path.rglob("*.pickle"))
+
+    def test_runner_file_snapshot(self, tmp_path, request):
+        cache_dir = tmp_path / "cache"
+        runner_file = tmp_path / "runners.yaml"
+        runner_file.write_text("h100:\n- h100-node-0\n")
+        first = load_runner_file(str(runner_file), cache_dir=str(cache_dir))
+
+        request.getfixturevalue("no_yaml")
+        assert load_runner_file(str(runner_file), cache_dir=str(cache_dir)) == first
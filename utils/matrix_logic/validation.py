@@ -1,7 +1,13 @@
-from pydantic import BaseModel, Field, ValidationError, ConfigDict, model_validator
-from typing import List, Optional, Union, Literal
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, ConfigDict, model_validator
+from typing import Iterable, List, Optional, Union, Literal
 from enum import Enum
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
 
+import hashlib
+import os
+import pickle
 import pprint
 import yaml
 
@@ -26,6 +32,8 @@ class Fields(Enum):
     # Seq-len-config fields
     ISL = 'isl'
     OSL = 'osl'
+    PROFILE = 'profile'
+    RANDOM_RANGE_RATIO = 'random-range-ratio'
     SEARCH_SPACE = 'search-space'
 
     # Search-space/benchmark fields
@@ -50,6 +58,14 @@ class Fields(Enum):
     MAX_MODEL_LEN = 'max-model-len'
     EXP_NAME = 'exp-name'
     DISAGG = 'disagg'
+    EST_MINUTES = 'est-minutes'
+    RUNNER_NODE = 'runner-node'
+    JOB_ID = 'job-id'
+    INPUT_HASH = 'input-hash'
+
+
+# Benchmark scripts run CONC * 10 prompts per job; results that record num_prompts take precedence
+PROMPTS_PER_CONC = 10
 
 
 """
@@ -78,6 +94,7 @@ class SingleNodeMatrixEntry(BaseModel):
     runner: str
     isl: int
     osl: int
+    random_range_ratio: float = Field(alias=Fields.RANDOM_RANGE_RATIO.value)
     tp: int
     ep: int
     dp_attn: bool = Field(alias=Fields.DP_ATTN.value)
@@ -85,6 +102,15 @@ class SingleNodeMatrixEntry(BaseModel):
     max_model_len: int = Field(alias=Fields.MAX_MODEL_LEN.value)
     exp_name: str = Field(alias=Fields.EXP_NAME.value)
     disagg: bool
+    # Scheduling annotations, only present when the generator was asked to estimate runtimes or
+    # to pin entries to runner nodes. They are left out of model dumps.
+    est_minutes: Optional[float] = Field(default=None, alias=Fields.EST_MINUTES.value, exclude=True)
+    runner_node: Optional[str] = Field(default=None, alias=Fields.RUNNER_NODE.value, exclude=True)
+    # Content hash of the entry, set by the generator (see identity.py)
+    job_id: Optional[str] = Field(default=None, alias=Fields.JOB_ID.value)
+    # Hash of the job-id and the scripts the entry executes (see job_inputs.py), recorded with
+    # its results for reuse. Only set by process_changelog.py.
+    input_hash: Optional[str] = Field(default=None, alias=Fields.INPUT_HASH.value)
 
 
 class WorkerConfig(BaseModel):
@@ -115,12 +141,22 @@ class MultiNodeMatrixEntry(BaseModel):
     runner: str
     isl: int
     osl: int
+    random_range_ratio: float = Field(alias=Fields.RANDOM_RANGE_RATIO.value)
     prefill: WorkerConfig
     decode: WorkerConfig
     conc: List[int]
     max_model_len: int = Field(alias=Fields.MAX_MODEL_LEN.value)
     exp_name: str = Field(alias=Fields.EXP_NAME.value)
     disagg: bool
+    # Scheduling annotations, only present when the generator was asked to estimate runtimes or
+    # to pin entries to runner nodes. They are left out of model dumps.
+    est_minutes: Optional[float] = Field(default=None, alias=Fields.EST_MINUTES.value, exclude=True)
+    runner_node: Optional[str] = Field(default=None, alias=Fields.RUNNER_NODE.value, exclude=True)
+    # Content hash of the entry, set by the generator (see identity.py)
+    job_id: Optional[str] = Field(default=None, alias=Fields.JOB_ID.value)
+    # Hash of the job-id and the scripts the entry executes (see job_inputs.py), recorded with
+    # its results for reuse. Only set by process_changelog.py.
+    input_hash: Optional[str] = Field(default=None, alias=Fields.INPUT_HASH.value)
 
 
 def validate_matrix_entry(entry: dict, is_multinode: bool) -> dict:
@@ -140,6 +176,42 @@ def validate_matrix_entry(entry: dict, is_multinode: bool) -> dict:
     return entry
 
 
+# Built once: constructing the validators is the expensive part of a TypeAdapter
+_SINGLE_NODE_ENTRIES = TypeAdapter(List[SingleNodeMatrixEntry])
+_MULTINODE_ENTRIES = TypeAdapter(List[MultiNodeMatrixEntry])
+
+
+def validate_matrix_entries(entries: list) -> list:
+    """Validate a whole matrix at once, with one validator call per entry type.
+
+    Multinode entries are told apart from single-node ones by their prefill field. Equivalent
+    to calling validate_matrix_entry on every entry, and about as fast (see bench_validation.py):
+    the validation cost is only saved by skipping it for entries of a validated master config.
+
+    Raises ValueError naming the first entry that fails validation.
+    Returns the original list if all entries are valid.
+    """
+    multinode = [entry for entry in entries if Fields.PREFILL.value in entry]
+    single_node = [entry for entry in entries if Fields.PREFILL.value not in entry]
+    for group, adapter in ((single_node, _SINGLE_NODE_ENTRIES), (multinode, _MULTINODE_ENTRIES)):
+        try:
+            adapter.validate_python(group)
+        except ValidationError as e:
+            entry = group[e.errors()[0]['loc'][0]]
+            raise ValueError(
+                f"The following parsed matrix entry failed validation:\n{pprint.pformat(entry)}\n{e}")
+    return entries
+
+
+# Seq-len profiles shipped with the master configs, found relative to this file so that loading
+# doesn't depend on the working directory
+SEQ_LEN_PROFILES_FILE = str(Path(__file__).resolve().parents[2] / '.github' / 'configs' / 'seq-len-profiles.yaml')
+
+# Random range ratio of seq-len-configs that give isl and osl directly, the default of the
+# benchmark templates
+DEFAULT_RANDOM_RANGE_RATIO = 0.8
+
+
 """
     Below is the validation logic for the INPUT to utils/matrix_logic/generate_sweep_configs.py, i.e., 
     the master configuration files found in .github/configs. The validation enforces a strict set of 
@@ -230,25 +302,59 @@ class MultiNodeSearchSpaceEntry(BaseModel):
         return _validate_conc_fields(self)
 
 
+def _validate_seq_len_fields(self):
+    """Ensure either a profile OR isl and osl are provided, but not both."""
+    has_lengths = self.isl is not None and self.osl is not None
+
+    if self.profile is not None:
+        if self.isl is not None or self.osl is not None or self.random_range_ratio is not None:
+            raise ValueError(
+                f"Cannot specify '{Fields.ISL.value}', '{Fields.OSL.value}' or "
+                f"'{Fields.RANDOM_RANGE_RATIO.value}' together with '{Fields.PROFILE.value}'. "
+                "The profile defines them."
+            )
+    elif not has_lengths:
+        raise ValueError(
+            f"Must specify either '{Fields.PROFILE.value}' or both "
+            f"'{Fields.ISL.value}' and '{Fields.OSL.value}'."
+        )
+
+    return self
+
+
 class SingleNodeSeqLenConfig(BaseModel):
     """Single node sequence length configuration."""
     model_config = ConfigDict(extra='forbid', populate_by_name=True)
 
-    isl: int
-    osl: int
+    profile: Optional[str] = None
+    isl: Optional[int] = None
+    osl: Optional[int] = None
+    random_range_ratio: Optional[float] = Field(
+        default=None, alias=Fields.RANDOM_RANGE_RATIO.value, ge=0, le=1)
     search_space: List[SingleNodeSearchSpaceEntry] = Field(
         alias=Fields.SEARCH_SPACE.value)
 
+    @model_validator(mode='after')
+    def validate_seq_len_fields(self):
+        return _validate_seq_len_fields(self)
+
 
 class MultiNodeSeqLenConfig(BaseModel):
     """Multinode sequence length configuration."""
     model_config = ConfigDict(extra='forbid', populate_by_name=True)
 
-    isl: int
-    osl: int
+    profile: Optional[str] = None
+    isl: Optional[int] = None
+    osl: Optional[int] = None
+    random_range_ratio: Optional[float] = Field(
+        default=None, alias=Fields.RANDOM_RANGE_RATIO.value, ge=0, le=1)
     search_space: List[MultiNodeSearchSpaceEntry] = Field(
         alias=Fields.SEARCH_SPACE.value)
 
+    @model_validator(mode='after')
+    def validate_seq_len_fields(self):
+        return _validate_seq_len_fields(self)
+
 
 class SingleNodeMasterConfigEntry(BaseModel):
     """Top-level single node master configuration entry."""
@@ -297,6 +403,59 @@ def validate_master_config(master_configs: dict) -> List[dict]:
                 f"Master config entry '{key}' failed validation:\n{e}")
     return master_configs
 
+# Seq-Len Profile Validation
+
+
+class SeqLenProfile(BaseModel):
+    """Named sequence length profile in seq-len-profiles.yaml."""
+    model_config = ConfigDict(extra='forbid', populate_by_name=True)
+
+    isl: int = Field(gt=0)
+    osl: int = Field(gt=0)
+    random_range_ratio: float = Field(
+        default=DEFAULT_RANDOM_RANGE_RATIO, alias=Fields.RANDOM_RANGE_RATIO.value, ge=0, le=1)
+
+
+def validate_seq_len_profiles(profiles: dict) -> dict:
+    """Validate seq-len profiles structure."""
+    if not isinstance(profiles, dict):
+        raise ValueError(
+            f"Seq-len profiles must be a dictionary of profile name to profile, got {type(profiles).__name__}")
+    for name, profile in profiles.items():
+        if not isinstance(profile, dict):
+            raise ValueError(
+                f"Seq-len profile '{name}' must be a dictionary, got {type(profile).__name__}")
+        try:
+            SeqLenProfile(**profile)
+        except ValidationError as e:
+            raise ValueError(f"Seq-len profile '{name}' failed validation:\n{e}")
+    return profiles
+
+
+def resolve_seq_len_profiles(master_configs: dict, profiles: dict) -> dict:
+    """Fill in isl, osl and random-range-ratio of every seq-len-config that names a profile, in place.
+
+    Seq-len-configs that give isl and osl directly are left untouched.
+
+    Raises:
+        ValueError: If a seq-len-config names a profile that doesn't exist.
+    """
+    for key, entry in master_configs.items():
+        for seq_len_config in entry.get(Fields.SEQ_LEN_CONFIGS.value) or []:
+            name = seq_len_config.get(Fields.PROFILE.value)
+            if name is None:
+                continue
+            if name not in profiles:
+                raise ValueError(
+                    f"Master config entry '{key}' uses unknown seq-len profile '{name}'. "
+                    f"Known profiles: {', '.join(profiles)}")
+            profile = SeqLenProfile(**profiles[name])
+            seq_len_config[Fields.ISL.value] = profile.isl
+            seq_len_config[Fields.OSL.value] = profile.osl
+            seq_len_config[Fields.RANDOM_RANGE_RATIO.value] = profile.random_range_ratio
+    return master_configs
+
+
 # Runner Config Validation
 
 
@@ -334,6 +493,14 @@ class ChangelogEntry(BaseModel):
     pr_link: str = Field(alias="pr-link")
 
 
+class ChangelogJobOrigin(BaseModel):
+    """Pydantic model for the config key and changelog entry a job was run for."""
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    config_key: str = Field(alias="config-key")
+    pr_link: str = Field(alias="pr-link")
+
+
 class ChangelogMetadata(BaseModel):
     """Pydantic model for validating changelog metadata structure."""
     model_config = ConfigDict(extra="forbid")
@@ -341,6 +508,12 @@ class ChangelogMetadata(BaseModel):
     base_ref: str
     head_ref: str
     entries: list[ChangelogEntry]
+    # Job ids of the entries whose results were reused from the result cache instead of run
+    cached_job_ids: list[str] = Field(default_factory=list)
+    # Input hashes of those entries; their results were measured by an earlier sweep
+    cached_input_hashes: list[str] = Field(default_factory=list)
+    # Origin of every job by input hash, which results record, to link results to the changelog
+    job_origins: dict[str, ChangelogJobOrigin] = Field(default_factory=dict)
 
 
 class ChangelogMatrixEntry(BaseModel):
@@ -357,63 +530,264 @@ class ChangelogMatrixEntry(BaseModel):
     changelog_metadata: ChangelogMetadata
 
 
+# =============================================================================
+# Master Config Indexing
+# =============================================================================
+
+
+class ConfigIndex:
+    """Secondary indexes over master config entries.
+
+    Built once per loaded master config so that filtered selection is a set intersection over
+    the matching entries instead of a scan of every entry with repeated string checks.
+    """
+
+    def __init__(self, all_config_data: dict):
+        # Position of each key in the master config, used to return selections in file order
+        self._position = {key: i for i, key in enumerate(all_config_data)}
+        self._sorted_keys = sorted(all_config_data)
+
+        self.by_model_prefix = defaultdict(set)
+        self.by_precision = defaultdict(set)
+        self.by_framework = defaultdict(set)
+        self.by_runner = defaultdict(set)
+        self.by_multinode = defaultdict(set)
+        for key, val in all_config_data.items():
+            if not isinstance(val, dict):
+                continue
+            self.by_model_prefix[val.get(Fields.MODEL_PREFIX.value)].add(key)
+            self.by_precision[val.get(Fields.PRECISION.value)].add(key)
+            self.by_framework[val.get(Fields.FRAMEWORK.value)].add(key)
+            self.by_runner[val.get(Fields.RUNNER.value)].add(key)
+            self.by_multinode[bool(val.get(Fields.MULTINODE.value, False))].add(key)
+
+    def keys_with_prefix(self, prefix: str) -> set:
+        """Config keys starting with prefix, found by bisecting the sorted keys."""
+        keys = set()
+        for key in self._sorted_keys[bisect_left(self._sorted_keys, prefix):]:
+            if not key.startswith(prefix):
+                break
+            keys.add(key)
+        return keys
+
+    @staticmethod
+    def _union(index: dict, values: Iterable) -> set:
+        return set().union(*(index.get(v, ()) for v in values))
+
+    def select(self,
+               key_prefixes: Optional[Iterable[str]] = None,
+               model_prefixes: Optional[Iterable[str]] = None,
+               precisions: Optional[Iterable[str]] = None,
+               frameworks: Optional[Iterable[str]] = None,
+               runners: Optional[Iterable[str]] = None,
+               multinode: Optional[bool] = None) -> List[str]:
+        """Return config keys matching all given filters, in master config order.
+
+        Filters that are None (or empty) are not applied. Within one filter, any of the values
+        may match.
+        """
+        candidates = []
+        if key_prefixes:
+            candidates.append(set().union(*(self.keys_with_prefix(p) for p in key_prefixes)))
+        for index, values in ((self.by_model_prefix, model_prefixes),
+                              (self.by_precision, precisions),
+                              (self.by_framework, frameworks),
+                              (self.by_runner, runners)):
+            if values:
+                candidates.append(self._union(index, values))
+        if multinode is not None:
+            candidates.append(self.by_multinode[multinode])
+
+        if not candidates:
+            return list(self._position)
+
+        # Intersect starting from the smallest candidate set
+        candidates.sort(key=len)
+        selected = candidates[0].intersection(*candidates[1:])
+        return sorted(selected, key=self._position.__getitem__)
+
+
+class MasterConfig(dict):
+    """Merged master config entries keyed by config key, carrying a ConfigIndex over them.
+
+    The index is built on construction; the config is not meant to be mutated afterwards.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = ConfigIndex(self)
+
+
+def get_config_index(all_config_data: dict) -> ConfigIndex:
+    """Return the index of a loaded MasterConfig, or build one for a plain dict."""
+    # Checked by attribute rather than isinstance: this module is imported both as `validation`
+    # and as `matrix_logic.validation`, and each import defines its own MasterConfig class.
+    index = getattr(all_config_data, 'index', None)
+    if index is not None:
+        return index
+    return ConfigIndex(all_config_data)
+
+
+# =============================================================================
+# Config Snapshot Cache
+# =============================================================================
+
+# Environment variable naming a directory for config snapshots, used when no cache_dir is passed
+CONFIG_CACHE_DIR_ENV = "INFMAX_CONFIG_CACHE_DIR"
+
+
+def _snapshot_key(kind: str, file_contents: List[tuple], validate: bool) -> str:
+    """Hash the inputs a loaded config depends on.
+
+    The key covers the path and content of every YAML file (in load order), whether the data was
+    validated, and the source of this module, so schema or loader changes invalidate snapshots.
+    """
+    h = hashlib.sha256()
+    h.update(Path(__file__).read_bytes())
+    h.update(f"{kind}\0{validate}\0".encode())
+    for path, content in file_contents:
+        h.update(f"{path}\0{len(content)}\0".encode())
+        h.update(content)
+    return h.hexdigest()
+
+
+def _read_snapshot(cache_dir: str, key: str):
+    """Return the snapshot stored under key, or None if there is none or it can't be read."""
+    try:
+        with open(Path(cache_dir) / f"{key}.pickle", 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write_snapshot(cache_dir: str, key: str, data) -> None:
+    """Store data under key, atomically so concurrent readers never see a partial snapshot."""
+    cache_path = Path(cache_dir)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path / f"{key}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path / f"{key}.pickle")
+
+
+def _resolve_cache_dir(cache_dir: Optional[str]) -> Optional[str]:
+    return cache_dir or os.environ.get(CONFIG_CACHE_DIR_ENV) or None
+
+
 # =============================================================================
 # File Loading Functions
 # =============================================================================
 
 
-def load_config_files(config_files: List[str], validate: bool = True) -> dict:
+def load_config_files(config_files: List[str], validate: bool = True,
+                      cache_dir: Optional[str] = None,
+                      seq_len_profiles_file: str = SEQ_LEN_PROFILES_FILE) -> dict:
     """Load and merge configuration files.
 
+    Seq-len-configs that name a profile get the isl, osl and random-range-ratio of that profile
+    from seq_len_profiles_file.
+
     Args:
         config_files: List of paths to YAML configuration files.
         validate: If True, run validate_master_config on loaded data. Defaults to True.
+        cache_dir: Directory for snapshots of the loaded config, keyed by the content hash of
+            the files. A fresh snapshot is returned without parsing or validating the YAML again.
+            Defaults to $INFMAX_CONFIG_CACHE_DIR; no caching if neither is set.
+        seq_len_profiles_file: Path to the seq-len profiles YAML file.
 
     Returns:
-        Merged configuration dictionary.
+        Merged configuration dictionary as a MasterConfig, indexed for filtered selection.
 
     Raises:
         ValueError: If file doesn't exist, isn't a dict, or has duplicate keys.
     """
-    all_config_data = {}
+    file_contents = []
     for config_file in config_files:
         try:
-            with open(config_file, 'r') as f:
-                config_data = yaml.safe_load(f)
-                assert isinstance(
-                    config_data, dict), f"Config file '{config_file}' must contain a dictionary"
-
-                # Don't allow '*' wildcard in master config keys as we need to reserve these
-                # for expansion in process_changelog.py
-                for key in config_data.keys():
-                    if "*" in key:
-                        raise ValueError(
-                            f" Wildcard '*' is not allowed in master config keys: '{key}'")
-
-                # Check for duplicate keys
-                duplicate_keys = set(all_config_data.keys()) & set(
-                    config_data.keys())
-                if duplicate_keys:
-                    raise ValueError(
-                        f"Duplicate configuration keys found in '{config_file}': {', '.join(sorted(duplicate_keys))}"
-                    )
-
-                all_config_data.update(config_data)
+            file_contents.append((config_file, Path(config_file).read_bytes()))
         except FileNotFoundError:
             raise ValueError(f"Input file '{config_file}' does not exist.")
+    try:
+        profiles_content = Path(seq_len_profiles_file).read_bytes()
+    except FileNotFoundError:
+        raise ValueError(f"Seq-len profiles file '{seq_len_profiles_file}' does not exist.")
+
+    cache_dir = _resolve_cache_dir(cache_dir)
+    if cache_dir:
+        snapshot_key = _snapshot_key(
+            "master", file_contents + [(seq_len_profiles_file, profiles_content)], validate)
+        snapshot = _read_snapshot(cache_dir, snapshot_key)
+        if isinstance(snapshot, dict):
+            return MasterConfig(snapshot)
+
+    all_config_data = {}
+    for config_file, content in file_contents:
+        config_data = yaml.safe_load(content)
+        assert isinstance(
+            config_data, dict), f"Config file '{config_file}' must contain a dictionary"
+
+        # Don't allow '*' wildcard in master config keys as we need to reserve these
+        # for expansion in process_changelog.py
+        for key in config_data.keys():
+            if "*" in key:
+                raise ValueError(
+                    f" Wildcard '*' is not allowed in master config keys: '{key}'")
+
+        # Check for duplicate keys
+        duplicate_keys = set(all_config_data.keys()) & set(
+            config_data.keys())
+        if duplicate_keys:
+            raise ValueError(
+                f"Duplicate configuration keys found in '{config_file}': {', '.join(sorted(duplicate_keys))}"
+            )
+
+        all_config_data.update(config_data)
 
     if validate:
         validate_master_config(all_config_data)
+    profiles = yaml.safe_load(profiles_content) or {}
+    if validate:
+        validate_seq_len_profiles(profiles)
+    resolve_seq_len_profiles(all_config_data, profiles)
 
-    return all_config_data
+    master_config = MasterConfig(all_config_data)
+    if cache_dir:
+        # Stored as a plain dict so the pickle doesn't reference this module's import path
+        _write_snapshot(cache_dir, snapshot_key, dict(master_config))
+    return master_config
 
 
-def load_runner_file(runner_file: str, validate: bool = True) -> dict:
+def load_seq_len_profiles(seq_len_profiles_file: str = SEQ_LEN_PROFILES_FILE, validate: bool = True) -> dict:
+    """Load the seq-len profiles file.
+
+    Returns:
+        Dictionary of profile name to a dict of isl, osl and random-range-ratio.
+
+    Raises:
+        ValueError: If the file doesn't exist or fails validation.
+    """
+    try:
+        content = Path(seq_len_profiles_file).read_bytes()
+    except FileNotFoundError:
+        raise ValueError(f"Seq-len profiles file '{seq_len_profiles_file}' does not exist.")
+
+    profiles = yaml.safe_load(content) or {}
+    if validate:
+        validate_seq_len_profiles(profiles)
+    return {
+        name: SeqLenProfile(**profile).model_dump(by_alias=True)
+        for name, profile in profiles.items()
+    }
+
+
+def load_runner_file(runner_file: str, validate: bool = True,
+                     cache_dir: Optional[str] = None) -> dict:
     """Load runner configuration file.
 
     Args:
         runner_file: Path to the runner YAML configuration file.
         validate: If True, run validate_runner_config on loaded data. Defaults to True.
+        cache_dir: Snapshot directory, as for load_config_files.
 
     Returns:
         Runner configuration dictionary.
@@ -422,13 +796,23 @@ def load_runner_file(runner_file: str, validate: bool = True) -> dict:
         ValueError: If file doesn't exist or fails validation.
     """
     try:
-        with open(runner_file, 'r') as f:
-            runner_config = yaml.safe_load(f)
+        content = Path(runner_file).read_bytes()
     except FileNotFoundError:
         raise ValueError(
             f"Runner config file '{runner_file}' does not exist.")
 
+    cache_dir = _resolve_cache_dir(cache_dir)
+    if cache_dir:
+        snapshot_key = _snapshot_key("runner", [(runner_file, content)], validate)
+        snapshot = _read_snapshot(cache_dir, snapshot_key)
+        if isinstance(snapshot, dict):
+            return snapshot
+
+    runner_config = yaml.safe_load(content)
+
     if validate:
         validate_runner_config(runner_config)
 
+    if cache_dir:
+        _write_snapshot(cache_dir, snapshot_key, runner_config)
     return runner_config
@@ -0,0 +1,192 @@
+import argparse
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from constants import MASTER_CONFIGS
+from matrix_logic.generate_sweep_configs import expand_conc_values
+from matrix_logic.validation import Fields, load_config_files
+from plot_trends import layout_label
+from summarize import load_results
+
+# Heatmap metrics as (result field, colorbar label)
+HEATMAP_METRICS = {
+    'tput_per_gpu': ('tput_per_gpu', 'Throughput per GPU (tok/s)'),
+    'interactivity': ('median_intvty', 'Interactivity (tok/s/user)'),
+    'goodput': ('tput_per_gpu', 'Goodput per GPU (tok/s, 0 if SLO missed)'),
+}
+
+# Cell states for points without a value
+NOT_SWEPT = 'not swept'
+MISSING = 'missing'
+
+
+def group_key(result):
+    """Key of one heatmap: model, precision, hardware, framework and sequence lengths."""
+    return (result['infmax_model_prefix'], result['precision'], result['hw'], result['framework'],
+            result['isl'], result['osl'])
+
+
+def meets_slo(result, min_intvty, max_ttft):
+    if min_intvty is not None and result['median_intvty'] < min_intvty:
+        return False
+    if max_ttft is not None and result['median_ttft'] * 1000 > max_ttft:
+        return False
+    return True
+
+
+def cell_value(result, metric, min_intvty=None, max_ttft=None):
+    field, _ = HEATMAP_METRICS[metric]
+    if metric == 'goodput' and not meets_slo(result, min_intvty, max_ttft):
+        return 0.0
+    return result[field]
+
+
+def configured_cells(master_config):
+    """Expand the master config search spaces into the (layout, conc) cells they schedule.
+
+    Returns:
+        Dict mapping the group_key of each config and sequence length pair to a set of
+        (layout label, conc) cells.
+    """
+    cells = defaultdict(set)
+    for val in master_config.values():
+        is_multinode = val.get(Fields.MULTINODE.value, False)
+        for seq_len_config in val[Fields.SEQ_LEN_CONFIGS.value]:
+            key = (val[Fields.MODEL_PREFIX.value], val[Fields.PRECISION.value], val[Fields.RUNNER.value],
+                   val[Fields.FRAMEWORK.value], seq_len_config[Fields.ISL.value], seq_len_config[Fields.OSL.value])
+            for bmk in seq_len_config[Fields.SEARCH_SPACE.value]:
+                if is_multinode:
+                    prefill, decode = bmk[Fields.PREFILL.value], bmk[Fields.DECODE.value]
+                    layout = layout_label({
+                        'is_multinode': True,
+                        'prefill_num_workers': prefill[Fields.NUM_WORKER.value],
+                        'prefill_tp': prefill[Fields.TP.value],
+                        'prefill_ep': prefill[Fields.EP.value],
+                        'prefill_dp_attention': prefill[Fields.DP_ATTN.value],
+                        'decode_num_workers': decode[Fields.NUM_WORKER.value],
+                        'decode_tp': decode[Fields.TP.value],
+                        'decode_ep': decode[Fields.EP.value],
+                        'decode_dp_attention': decode[Fields.DP_ATTN.value],
+                    })
+                else:
+                    layout = layout_label({
+                        'is_multinode': False,
+                        'tp': bmk[Fields.TP.value],
+                        'ep': bmk.get(Fields.EP.value) or 1,
+                        'dp_attention': bmk.get(Fields.DP_ATTN.value, False),
+                    })
+                cells[key].update((layout, conc) for conc in expand_conc_values(bmk))
+    return cells
+
+
+def build_grid(results, metric, configured=(), min_intvty=None, max_ttft=None):
+    """Lay out results of one group as a layout x concurrency grid.
+
+    Cells without a result are NOT_SWEPT, or MISSING if they are part of the configured search
+    space (i.e. they were scheduled but produced no result). If several results land in the same
+    cell, the best value is kept.
+
+    Returns:
+        Tuple of (layouts, concs, values, states) where values is a 2D array (NaN where no result)
+        and states maps (row, col) of empty cells to NOT_SWEPT or MISSING.
+    """
+    by_cell = {}
+    for r in results:
+        cell = (layout_label(r), r['conc'])
+        value = cell_value(r, metric, min_intvty, max_ttft)
+        by_cell[cell] = max(value, by_cell.get(cell, value))
+
+    all_cells = set(by_cell) | set(configured)
+    layouts = sorted({layout for layout, _ in all_cells})
+    concs = sorted({conc for _, conc in all_cells})
+
+    values = np.full((len(layouts), len(concs)), np.nan)
+    states = {}
+    for i, layout in enumerate(layouts):
+        for j, conc in enumerate(concs):
+            if (layout, conc) in by_cell:
+                values[i, j] = by_cell[(layout, conc)]
+            else:
+                states[(i, j)] = MISSING if (layout, conc) in configured else NOT_SWEPT
+    return layouts, concs, values, states
+
+
+def plot_heatmap(key, layouts, concs, values, states, metric, output_dir):
+    model_prefix, precision, hw, framework, isl, osl = key
+    _, colorbar_label = HEATMAP_METRICS[metric]
+
+    fig, ax = plt.subplots(figsize=(max(6, 0.9 * len(concs) + 3), max(3, 0.5 * len(layouts) + 2)))
+    cmap = plt.get_cmap('viridis').copy()
+    cmap.set_bad('lightgray')
+    image = ax.imshow(np.ma.masked_invalid(values), cmap=cmap, aspect='auto')
+    fig.colorbar(image, ax=ax, label=colorbar_label)
+
+    for i in range(len(layouts)):
+        for j in range(len(concs)):
+            state = states.get((i, j))
+            if state == MISSING:
+                ax.text(j, i, 'missing', ha='center', va='center', fontsize=7, color='red')
+            elif state is None:
+                ax.text(j, i, f"{values[i, j]:.0f}", ha='center', va='center', fontsize=7, color='white')
+
+    ax.set_xticks(range(len(concs)))
+    ax.set_xticklabels(concs)
+    ax.set_yticks(range(len(layouts)))
+    ax.set_yticklabels(layouts)
+    ax.set_xlabel('Concurrency')
+    ax.set_ylabel('Parallelism layout')
+    ax.set_title(f'{model_prefix} {precision} {hw.upper()} {framework} (ISL {isl}, OSL {osl}) '
+                 f'- gray: not swept')
+    fig.tight_layout()
+
+    output_path = Path(output_dir) / f"heatmap_{metric}_{model_prefix}_{precision}_{hw}_{framework}_{isl}_{osl}.png"
+    fig.savefig(output_path, bbox_inches='tight')
+    plt.close(fig)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Plot a parallelism layout x concurrency heatmap per model/hardware/framework/sequence '
+                    'lengths, showing which parts of the search space were swept')
+    parser.add_argument('results', help='Results directory or aggregated results JSON')
+    parser.add_argument('--metric', choices=list(HEATMAP_METRICS), default='tput_per_gpu',
+                        help='Metric to color cells by (default: tput_per_gpu)')
+    parser.add_argument('--min-intvty', type=float,
+                        help='Goodput SLO: minimum median interactivity (tok/s/user)')
+    parser.add_argument('--max-ttft', type=float, help='Goodput SLO: maximum median TTFT (ms)')
+    parser.add_argument('--config-files', nargs='*', default=MASTER_CONFIGS,
+                        help='Master config files; configured cells without a result are marked as missing. '
+                             'Pass no files to skip.')
+    parser.add_argument('--output-dir', default='.', help='Directory to write the PNG files to')
+    args = parser.parse_args()
+
+    if args.metric == 'goodput' and args.min_intvty is None and args.max_ttft is None:
+        parser.error("--metric goodput requires --min-intvty and/or --max-ttft.")
+
+    results = load_results(args.results)
+    if not results:
+        print(f"No results found in '{args.results}'.", file=sys.stderr)
+        return
+
+    configured = {}
+    if args.config_files:
+        configured = configured_cells(load_config_files(args.config_files, validate=False))
+
+    results_by_group = defaultdict(list)
+    for r in results:
+        results_by_group[group_key(r)].append(r)
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    for key, group_results in sorted(results_by_group.items(), key=lambda item: str(item[0])):
+        grid = build_grid(group_results, args.metric, configured.get(key, set()),
+                          args.min_intvty, args.max_ttft)
+        print(plot_heatmap(key, *grid, args.metric, args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import re
+import sys
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import yaml
+
+from constants import MASTER_CONFIGS
+from matrix_logic.validation import Fields, load_config_files
+from summarize import load_results
+
+# Metrics plotted over time as (result field, axis label)
+TREND_METRICS = [
+    ('tput_per_gpu', 'Throughput per GPU (tok/s)'),
+    ('median_intvty', 'Interactivity (tok/s/user)'),
+]
+
+
+def load_history(history_dir):
+    """Load historical results, one run per entry of history_dir.
+
+    Each entry is either a directory of result JSONs or an aggregated results JSON (as uploaded
+    by collect-results.yml). Runs are ordered by entry name, so names should sort chronologically
+    (e.g. dates or workflow run IDs).
+
+    Returns:
+        List of (run_name, results) tuples.
+    """
+    history = []
+    for run_path in sorted(Path(history_dir).iterdir()):
+        results = load_results(run_path)
+        if results:
+            history.append((run_path.stem, results))
+    return history
+
+
+def index_config_keys(master_config):
+    """Map (model-prefix, precision, runner, framework) to the master config key defining it."""
+    return {
+        (val[Fields.MODEL_PREFIX.value], val[Fields.PRECISION.value],
+         val[Fields.RUNNER.value], val[Fields.FRAMEWORK.value]): key
+        for key, val in master_config.items()
+    }
+
+
+def changelog_entries_for_key(changelog, config_key):
+    """Return changelog entries whose config-keys (wildcards allowed) cover config_key."""
+    return [
+        entry for entry in changelog
+        if any(fnmatchcase(config_key, pattern) for pattern in entry['config-keys'])
+    ]
+
+
+def _parallelism_label(tp, ep, dp_attention):
+    label = f"TP{tp}/EP{ep}"
+    if str(dp_attention).lower() == 'true':
+        label += "/DPA"
+    return label
+
+
+def layout_label(result):
+    """Short label for the parallelism layout of a result, e.g. TP8/EP8/DPA or P5xTP4/EP4,D1xTP8/EP8/DPA."""
+    if result['is_multinode']:
+        return ",".join(
+            f"{role[0].upper()}{result[f'{role}_num_workers']}x"
+            f"{_parallelism_label(result[f'{role}_tp'], result[f'{role}_ep'], result[f'{role}_dp_attention'])}"
+            for role in ('prefill', 'decode'))
+
+    return _parallelism_label(result['tp'], result['ep'], result['dp_attention'])
+
+
+def series_label(result):
+    """Label identifying one line on a trend chart: the parallelism layout and concurrency."""
+    return f"{layout_label(result)} conc={result['conc']}"
+
+
+def build_trends(history, key_index, conc_filter=None):
+    """Group historical results by config key and sequence lengths.
+
+    Returns:
+        Dict mapping (config_key, isl, osl) to a dict of series label -> list of (run_idx, result).
+        Results whose config cannot be found in the master configs are skipped.
+    """
+    trends = defaultdict(lambda: defaultdict(list))
+    for run_idx, (_, results) in enumerate(history):
+        for r in results:
+            key = key_index.get((r['infmax_model_prefix'], r['precision'], r['hw'], r['framework']))
+            if key is None:
+                continue
+            if conc_filter and r['conc'] not in conc_filter:
+                continue
+            trends[(key, r['isl'], r['osl'])][series_label(r)].append((run_idx, r))
+    return trends
+
+
+def image_transitions(series):
+    """Return (run_idx, image) for every run where the served image differs from the previous run."""
+    images_by_run = {}
+    for points in series.values():
+        for run_idx, r in points:
+            images_by_run[run_idx] = r['image']
+
+    transitions = []
+    previous = None
+    for run_idx in sorted(images_by_run):
+        image = images_by_run[run_idx]
+        if previous is not None and image != previous:
+            transitions.append((run_idx, image))
+        previous = image
+    return transitions
+
+
+def describes_upgrade_to(text, image):
+    """Whether a changelog description mentions moving to the tag of image.
+
+    Descriptions usually read "from <old> to <new>", with or without the registry path and the
+    leading 'v' of the tag, so "to ... <version>" is preferred over a bare mention which may be the
+    old version of a later upgrade.
+    """
+    tag = image.rsplit(':', 1)[-1]
+    version = re.escape(tag.lstrip('v'))
+    if re.search(rf"(?:\bto|->)\s+['\"]?[\w./#:-]*?v?{version}(?![\w.])", text):
+        return True
+    return "from" not in text and re.search(rf"v?{version}(?![\w.])", text) is not None
+
+
+def match_entries_to_transitions(entries, transitions):
+    """Attribute changelog entries to the image transitions they describe.
+
+    An entry is attributed to a transition when its description mentions upgrading to the new
+    image tag. Entries that cannot be placed on the timeline are returned separately.
+    """
+    attributed = defaultdict(list)
+    unplaced = []
+    for entry in entries:
+        text = " ".join(entry['description'])
+        for run_idx, image in transitions:
+            if describes_upgrade_to(text, image):
+                attributed[run_idx].append(entry)
+                break
+        else:
+            unplaced.append(entry)
+    return attributed, unplaced
+
+
+def pr_label(entry):
+    return "#" + entry['pr-link'].rstrip('/').rsplit('/', 1)[-1]
+
+
+def plot_trend(config_key, isl, osl, series, run_names, entries, output_dir):
+    fig, axes = plt.subplots(len(TREND_METRICS), 1, sharex=True, figsize=(10, 4 * len(TREND_METRICS)))
+
+    for ax, (field, ylabel) in zip(axes, TREND_METRICS):
+        for label, points in sorted(series.items()):
+            xs = [run_idx for run_idx, _ in points]
+            ys = [r[field] for _, r in points]
+            ax.plot(xs, ys, marker='o', label=label)
+        ax.set_ylabel(ylabel)
+
+    transitions = image_transitions(series)
+    attributed, unplaced = match_entries_to_transitions(entries, transitions)
+    for run_idx, image in transitions:
+        prs = " ".join(pr_label(e) for e in attributed.get(run_idx, []))
+        for ax in axes:
+            ax.axvline(run_idx - 0.5, color='gray', linestyle='--', linewidth=1)
+        axes[0].annotate(f"{image.rsplit(':', 1)[-1]} {prs}".strip(), (run_idx - 0.5, 1.0),
+                         xycoords=('data', 'axes fraction'), rotation=90, va='top', ha='right', fontsize=7)
+
+    axes[-1].set_xticks(range(len(run_names)))
+    axes[-1].set_xticklabels(run_names, rotation=45, ha='right', fontsize=8)
+    axes[-1].set_xlabel('Run')
+    axes[0].set_title(f'{config_key} (ISL {isl}, OSL {osl})')
+    axes[0].legend(fontsize=7, ncol=2)
+
+    if unplaced:
+        footnote = "Other changelog entries: " + "; ".join(
+            f"{pr_label(e)} {e['description'][0]}" for e in unplaced)
+        fig.text(0.01, 0.0, footnote, fontsize=7, wrap=True, va='top')
+
+    fig.tight_layout()
+    output_path = Path(output_dir) / f"trend_{config_key}_{isl}_{osl}.png"
+    fig.savefig(output_path, bbox_inches='tight')
+    plt.close(fig)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Plot per-config throughput and interactivity trends across historical runs, '
+                    'annotated with the perf-changelog entries that touched each config')
+    parser.add_argument(
+        'history_dir',
+        help='Directory holding one results directory or aggregated results JSON per run; '
+             'runs are ordered by name'
+    )
+    parser.add_argument('--changelog-file', default='perf-changelog.yaml', help='Path to perf-changelog.yaml')
+    parser.add_argument('--config-files', nargs='+', default=MASTER_CONFIGS,
+                        help='Master config files used to map results to config keys')
+    parser.add_argument('--config-keys', nargs='+',
+                        help='Only plot these config keys (wildcards allowed, e.g. gptoss*)')
+    parser.add_argument('--conc', nargs='+', type=int, help='Only plot these concurrency values')
+    parser.add_argument('--output-dir', default='.', help='Directory to write the PNG files to')
+    args = parser.parse_args()
+
+    history = load_history(args.history_dir)
+    if not history:
+        print(f"No results found in '{args.history_dir}'.", file=sys.stderr)
+        return
+
+    key_index = index_config_keys(load_config_files(args.config_files, validate=False))
+    with open(args.changelog_file) as f:
+        changelog = yaml.safe_load(f) or []
+
+    run_names = [name for name, _ in history]
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    trends = build_trends(history, key_index, set(args.conc or []))
+    for (config_key, isl, osl), series in sorted(trends.items()):
+        if args.config_keys and not any(fnmatchcase(config_key, p) for p in args.config_keys):
+            continue
+        entries = changelog_entries_for_key(changelog, config_key)
+        print(plot_trend(config_key, isl, osl, series, run_names, entries, args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
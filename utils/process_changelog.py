@@ -1,61 +1,147 @@
 import argparse
 import json
-import re
+import math
+import os
+import sys
 import subprocess
-from collections import defaultdict
+from collections import Counter, defaultdict
+from typing import Optional
 
 import yaml
-from constants import GENERATE_SWEEPS_PY_SCRIPT, MASTER_CONFIGS, RUNNER_CONFIG
-from matrix_logic.generate_sweep_configs import seq_len_to_str
+from constants import MASTER_CONFIGS, RUNNER_CONFIG, SEQ_LEN_PROFILES
+from matrix_logic.generate_sweep_configs import entry_seq_len_name, generate_config_key_sweep
+from matrix_logic.capacity import enforce_capacity
+from matrix_logic.cost_model import RuntimeModel
+from matrix_logic.identity import assign_job_ids
+from matrix_logic.impact import format_impact_report, impacted_config_keys
+from matrix_logic.job_inputs import JobInputs
+from matrix_logic.key_patterns import ConfigKeyResolver, format_resolution_report
+from matrix_logic.plan import EntryPlan, format_plan_report
+from matrix_logic.result_cache import load_result_cache, split_cached
+from matrix_logic.scheduling import MAX_MATRIX_JOBS, shard_lpt
 from matrix_logic.validation import (
     ChangelogEntry,
     ChangelogMatrixEntry,
     load_config_files,
+    load_runner_file,
+    resolve_seq_len_profiles,
 )
 
+# Seq-len profiles that run-sweep.yml dispatches as matrices of their own; entries of any other
+# profile, or with isl/osl given directly, are dispatched together as OTHER_SEQ_LENS
+RUN_SWEEP_SEQ_LENS = ("1k1k", "1k8k", "8k1k")
+OTHER_SEQ_LENS = "other"
 
-def get_added_lines(base_ref: str, head_ref: str, filepath: str) -> str:
+
+def git_show(ref: str, filepath: str) -> Optional[str]:
+    """Contents of a file as of a git ref, or None if it doesn't exist at that ref."""
     result = subprocess.run(
-        ["git", "diff", base_ref, head_ref, "--", filepath],
+        ["git", "show", f"{ref}:./{os.path.relpath(filepath)}"],
         capture_output=True,
         text=True,
     )
+    return result.stdout if result.returncode == 0 else None
+
+
+def _canonical_entry(entry) -> str:
+    return json.dumps(entry, sort_keys=True, default=str)
+
+
+def get_added_entries(base_ref: str, head_ref: str, filepath: str) -> list:
+    """Changelog entries present at head_ref but not at base_ref, in changelog order.
+
+    Entries are compared as parsed YAML, so reformatting or moving an entry is not a change.
+
+    Raises:
+        ValueError: If the changelog doesn't exist at head_ref, isn't a list, or an entry
+            present at base_ref was removed or modified.
+    """
+    head_text = git_show(head_ref, filepath)
+    if head_text is None:
+        raise ValueError(f"Changelog file {filepath} does not exist at {head_ref}.")
+    base_entries = yaml.safe_load(git_show(base_ref, filepath) or "") or []
+    head_entries = yaml.safe_load(head_text) or []
+    for entries, ref in ((base_entries, base_ref), (head_entries, head_ref)):
+        if not isinstance(entries, list):
+            raise ValueError(f"Changelog file {filepath} must contain a list of entries at {ref}.")
 
-    added_lines = []
-    for line in result.stdout.split("\n"):
-        if line.startswith("-") and not line.startswith("---"):
-            # Don't allow deletions in the changelog
-            # By convention, it should act as a running log of performance changes,
-            # so we only want to see additions
+    unmatched = Counter(_canonical_entry(entry) for entry in base_entries)
+    added_entries = []
+    for entry in head_entries:
+        canonical = _canonical_entry(entry)
+        if unmatched[canonical]:
+            unmatched[canonical] -= 1
+        else:
+            added_entries.append(entry)
+
+    # Don't allow deletions in the changelog
+    # By convention, it should act as a running log of performance changes,
+    # so we only want to see additions
+    for entry in base_entries:
+        canonical = _canonical_entry(entry)
+        if unmatched[canonical]:
             raise ValueError(
                 f"Deletions are not allowed in {filepath}. "
                 f"Only additions to the changelog are permitted. "
-                f"Found deleted line: {line[1:]}"
+                f"Found removed or modified entry: {entry}"
             )
-        elif line.startswith("+") and not line.startswith("+++"):
-            added_lines.append(line[1:])
-
-    return "\n".join(added_lines)
-
-
-def get_config_keys_from_master(
-    config_keys: list[str], master_config: dict
-) -> list[str]:
-    resolved_keys = set()
-    for key in config_keys:
-        if "*" in key:
-            pattern = re.compile(re.escape(key).replace(r"\*", ".*"))
-            matched_keys = [k for k in master_config if pattern.fullmatch(k)]
-            if not matched_keys:
-                raise ValueError(
-                    f"No config keys matched the wildcard pattern '{key}' in master configs."
-                )
-            resolved_keys.update(matched_keys)
-        elif key not in master_config:
-            raise ValueError(f"Config key '{key}' not found in master configs.")
+    return added_entries
+
+
+def get_changed_files(base_ref: str, head_ref: str) -> list[str]:
+    result = subprocess.run(
+        ["git", "diff", "--name-only", base_ref, head_ref],
+        capture_output=True,
+        text=True,
+    )
+    return [line for line in result.stdout.split("\n") if line]
+
+
+def get_master_config_at_ref(ref: str) -> dict:
+    """Merged master configs as of a git ref, unvalidated; files missing at the ref are skipped.
+
+    Seq-len profiles are resolved with the profiles file at the same ref, so that changing a
+    profile changes the config keys that use it.
+    """
+    master_config = {}
+    for config_file in MASTER_CONFIGS:
+        content = git_show(ref, config_file)
+        if content is not None:
+            master_config.update(yaml.safe_load(content) or {})
+    profiles = yaml.safe_load(git_show(ref, SEQ_LEN_PROFILES) or "") or {}
+    return resolve_seq_len_profiles(master_config, profiles)
+
+
+def bucket_matrix(results: list) -> dict:
+    """Group matrix entries into the single_node and multi_node matrices dispatched by run-sweep.yml.
+
+    Entries are keyed by the name of their seq-len profile, or OTHER_SEQ_LENS for profiles that
+    run-sweep.yml has no jobs of their own for.
+    """
+    matrices = {"single_node": defaultdict(list), "multi_node": defaultdict(list)}
+    for result in results:
+        seq_len_name = entry_seq_len_name(result)
+        if seq_len_name not in RUN_SWEEP_SEQ_LENS:
+            seq_len_name = OTHER_SEQ_LENS
+        if "prefill" in result and result["prefill"] is not None:
+            matrices["multi_node"][seq_len_name].append(result)
         else:
-            resolved_keys.add(key)
-    return list(resolved_keys)
+            matrices["single_node"][seq_len_name].append(result)
+    return matrices
+
+
+def shard_single_node(single_node: dict, min_shards: int) -> dict:
+    """Split each seq-len matrix into shards of similar estimated runtime, keyed <seq-len>-<shard>.
+
+    Each matrix is split into at least min_shards shards, and into as many as it takes to keep every
+    shard within the GitHub Actions matrix limit. Entries must carry est-minutes.
+    """
+    shards = {}
+    for seq_len_str, seq_len_entries in single_node.items():
+        num_shards = max(min_shards, math.ceil(len(seq_len_entries) / MAX_MATRIX_JOBS))
+        for shard_idx, shard in enumerate(shard_lpt(seq_len_entries, num_shards)):
+            shards[f"{seq_len_str}-{shard_idx}"] = shard
+    return shards
 
 
 def main():
@@ -63,21 +149,53 @@ def main():
     parser.add_argument("--base-ref", type=str, required=True)
     parser.add_argument("--head-ref", type=str, required=True)
     parser.add_argument("--changelog-file", type=str, required=True)
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="Split each single-node matrix into at least this many matrices balanced by "
+        "estimated runtime, and into more if it exceeds the matrix limit of "
+        f"{MAX_MATRIX_JOBS} jobs, keyed <seq-len>-<shard> (e.g. 1k1k-0, 1k1k-1)",
+    )
+    parser.add_argument(
+        "--runtime-history",
+        type=str,
+        default=None,
+        help="Results directory to fit the runtime estimates used by --shards and --plan from",
+    )
+    parser.add_argument(
+        "--result-cache",
+        type=str,
+        default=None,
+        help="Results directory of earlier sweeps; entries whose input hash already has results "
+        "for all of their concurrencies and whose image is pinned by digest are not run again",
+    )
+    parser.add_argument(
+        "--cached-results-out",
+        type=str,
+        default=None,
+        help="File to write the reused results of --result-cache hits to, as aggregated results JSON",
+    )
+    parser.add_argument(
+        "--narrow-to-impact",
+        action="store_true",
+        help="Only run requested config keys that execute a file changed between the refs, or "
+        "whose master config definition changed",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Instead of the matrix, print the config keys, jobs per runner type and seq-len, "
+        "estimated GPU-hours and queue time of each added changelog entry",
+    )
     args = parser.parse_args()
 
-    added_yaml = get_added_lines(args.base_ref, args.head_ref, args.changelog_file)
-
-    if not added_yaml.strip():
-        raise ValueError("No additions found in the changelog file.")
-
-    changelog_data = yaml.safe_load(added_yaml)
+    changelog_data = get_added_entries(args.base_ref, args.head_ref, args.changelog_file)
 
     if not changelog_data:
-        raise ValueError("No valid YAML entries found in the changelog additions.")
+        raise ValueError("No additions found in the changelog file.")
 
     final_results = {
-        "single_node": defaultdict(list),
-        "multi_node": defaultdict(list),
         "changelog_metadata": {
             "base_ref": args.base_ref,
             "head_ref": args.head_ref,
@@ -85,53 +203,126 @@ def main():
         },
     }
 
+    # Load and validate the master configs once; matrices for all entries are generated in-process
+    master_config = load_config_files(MASTER_CONFIGS)
+    enforce_capacity(master_config)
+    runner_data = load_runner_file(RUNNER_CONFIG)
+    job_inputs = JobInputs(runner_data)
+
+    # Config keys that execute a changed script or whose definition changed, to check the
+    # config keys requested by the changelog against
+    impact = impacted_config_keys(
+        get_changed_files(args.base_ref, args.head_ref),
+        master_config,
+        job_inputs,
+        get_master_config_at_ref(args.base_ref),
+    )
+
+    # Resolve the config-keys patterns of all entries against the master config in one pass
+    entries = [ChangelogEntry.model_validate(entry_data) for entry_data in changelog_data]
+    matches = ConfigKeyResolver(
+        [pattern for entry in entries for pattern in entry.config_keys]
+    ).resolve(master_config)
+    print(format_resolution_report(matches), file=sys.stderr)
+
     all_results = []
     # Deduplicate repeated configs, if for some reason a config key appears multiple times
     # in one commit, we don't want to run that config two times (there will just be twice as many
-    # data points for that config, which is not useful)
+    # data points for that config, which is not useful). A config key is run as part of the first
+    # entry whose patterns match it.
     all_configs_to_run = set()
+    job_origins = []
+    entry_config_keys = []
+    for entry in entries:
+        configs_to_run = []
+        for pattern in entry.config_keys:
+            for key in matches[pattern]:
+                if key not in all_configs_to_run:
+                    all_configs_to_run.add(key)
+                    configs_to_run.append(key)
+
+        if args.narrow_to_impact:
+            configs_to_run = [c for c in configs_to_run if c in impact]
+        entry_config_keys.append(configs_to_run)
+
+        # Entries are validated as a whole by ChangelogMatrixEntry below. Keys are generated one
+        # at a time to record which config key and changelog entry each job was run for.
+        for key in configs_to_run:
+            key_results = generate_config_key_sweep([key], master_config, validate_entries=False)
+            all_results.extend(key_results)
+            job_origins.extend((result, key, entry) for result in key_results)
+
+    print(format_impact_report(impact, all_configs_to_run), file=sys.stderr)
+    if args.narrow_to_impact:
+        skipped = len([c for c in all_configs_to_run if c not in impact])
+        print(f"Skipped {skipped} requested config key(s) not affected by the change", file=sys.stderr)
+
+    assign_job_ids(all_results)
+    job_inputs.assign_input_hashes(all_results)
+    # Results record the input hash of their job, which links them back to the changelog
+    final_results["changelog_metadata"]["job_origins"] = {
+        result["input-hash"]: {"config-key": key, "pr-link": entry.pr_link}
+        for result, key, entry in job_origins
+    }
 
-    for entry_data in changelog_data:
-        entry = ChangelogEntry.model_validate(entry_data)
-        configs_to_run = get_config_keys_from_master(
-            entry.config_keys, load_config_files(MASTER_CONFIGS)
+    # Reuse earlier results of entries whose image, flags and scripts are all unchanged
+    hits = []
+    if args.result_cache:
+        all_results, hits, cached_results, unpinned = split_cached(
+            all_results, load_result_cache(args.result_cache)
         )
+        final_results["changelog_metadata"]["cached_job_ids"] = [
+            hit["job-id"] for hit in hits
+        ]
+        final_results["changelog_metadata"]["cached_input_hashes"] = [
+            hit["input-hash"] for hit in hits
+        ]
+        print(
+            f"Reusing {len(cached_results)} cached result(s) of {len(hits)} unchanged job(s)",
+            file=sys.stderr,
+        )
+        if unpinned:
+            print(
+                f"Running {len(unpinned)} job(s) with cached results again, as their image "
+                "isn't pinned by digest (@sha256:)",
+                file=sys.stderr,
+            )
+        if args.cached_results_out:
+            with open(args.cached_results_out, "w") as f:
+                json.dump(cached_results, f, indent=2)
+
+    if args.shards or args.plan:
+        runtime_model = (
+            RuntimeModel.from_history(args.runtime_history)
+            if args.runtime_history
+            else RuntimeModel([])
+        )
+        for result in all_results:
+            result["est-minutes"] = round(runtime_model.estimate_minutes(result), 1)
 
-        # Skip configs already processed
-        configs_to_run = [c for c in configs_to_run if c not in all_configs_to_run]
-        if not configs_to_run:
-            continue
-        all_configs_to_run.update(configs_to_run)
-
-        try:
-            result = subprocess.run(
-                [
-                    "python3",
-                    GENERATE_SWEEPS_PY_SCRIPT,
-                    "test-config",
-                    "--config-keys",
-                    *configs_to_run,
-                    "--config-files",
-                    *MASTER_CONFIGS,
-                    "--runner-config",
-                    RUNNER_CONFIG,
-                ],
-                capture_output=True,
-                text=True,
-                check=True,
+    # Reviewers check the plan of a changelog change before labelling it for a sweep
+    if args.plan:
+        running = {result["job-id"] for result in all_results}
+        plans = [
+            EntryPlan(
+                entry.pr_link,
+                {pattern: matches[pattern] for pattern in entry.config_keys},
+                config_keys,
+                [result for result, _, origin in job_origins
+                 if origin is entry and result["job-id"] in running],
             )
-        except subprocess.CalledProcessError as e:
-            print(e.stderr)
-            raise
+            for entry, config_keys in zip(entries, entry_config_keys)
+        ]
+        print(format_plan_report(plans, runner_data, cached_jobs=len(hits),
+                                 has_history=runtime_model.has_history))
+        return
 
-        all_results.extend(json.loads(result.stdout))
+    final_results.update(bucket_matrix(all_results))
 
-    for result in all_results:
-        seq_len_str = seq_len_to_str(result["isl"], result["osl"])
-        if "prefill" in result and result["prefill"] is not None:
-            final_results["multi_node"][seq_len_str].append(result)
-        else:
-            final_results["single_node"][seq_len_str].append(result)
+    # Large single-node sweeps can exceed the matrix size limit of a workflow job, so split them
+    # into shards of similar runtime that run-sweep.yml dispatches as separate matrices
+    if args.shards:
+        final_results["single_node"] = shard_single_node(final_results["single_node"], args.shards)
 
     # Validate final results structure
     validated = ChangelogMatrixEntry.model_validate(final_results)
@@ -56,6 +56,16 @@ data = {
     'osl': int(osl),
 }
 
+# Benchmark duration and size, used to fit the runtime estimates of generate_sweep_configs.py
+if 'duration' in bmk_result:
+    data['duration'] = float(bmk_result['duration'])
+if 'num_prompts' in bmk_result:
+    data['num_prompts'] = int(bmk_result['num_prompts'])
+
+# Input hash of the job, used by process_changelog.py to reuse results of unchanged jobs
+if os.environ.get('INPUT_HASH'):
+    data['input_hash'] = os.environ['INPUT_HASH']
+
 is_multinode = os.environ.get('IS_MULTINODE', 'false').lower() == 'true'
 
 if is_multinode:
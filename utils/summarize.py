@@ -1,7 +1,10 @@
-import sys
+import argparse
+import csv
 import json
+import sys
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from tabulate import tabulate
 
 # Header constants
 MODEL = "Model"
@@ -33,95 +36,488 @@ DECODE_DP_ATTN = "Decode DP Attn"
 DECODE_WORKERS = "Decode Workers"
 DECODE_GPUS = "Decode GPUs"
 
-results = []
-results_dir = Path(sys.argv[1])
-for result_path in results_dir.rglob('*.json'):
-    with open(result_path) as f:
-        result = json.load(f)
-    results.append(result)
-
-single_node_results = [r for r in results if not r['is_multinode']]
-multinode_results = [r for r in results if r['is_multinode']]
-
-# Single-node and multi-node results have different fields and therefore need to be printed separately
-if single_node_results:
-    single_node_results.sort(key=lambda r: (
-        r['infmax_model_prefix'], r['hw'], r['framework'], r['precision'], r['isl'], r['osl'], r['tp'], r['ep'], r['conc']))
-
-    single_node_headers = [
-        MODEL, SERVED_MODEL, HARDWARE, FRAMEWORK, PRECISION, ISL, OSL, TP, EP, DP_ATTENTION,
-        CONC, TTFT, TPOT, INTERACTIVITY, E2EL, TPUT_PER_GPU, OUTPUT_TPUT_PER_GPU, INPUT_TPUT_PER_GPU
-    ]
-
-    single_node_rows = [
-        [
-            r['infmax_model_prefix'],
-            r['model'],
-            r['hw'].upper(),
-            r['framework'].upper(),
-            r['precision'].upper(),
-            r['isl'],
-            r['osl'],
-            r['tp'],
-            r['ep'],
-            r['dp_attention'],
-            r['conc'],
-            f"{r['median_ttft'] * 1000:.4f}",
-            f"{r['median_tpot'] * 1000:.4f}",
-            f"{r['median_intvty']:.4f}",
-            f"{r['median_e2el']:.4f}",
-            f"{r['tput_per_gpu']:.4f}",
-            f"{r['output_tput_per_gpu']:.4f}",
-            f"{r['input_tput_per_gpu']:.4f}",
-        ]
-        for r in single_node_results
-    ]
-
-    print("## Single-Node Results\n")
-    print(tabulate(single_node_rows, headers=single_node_headers, tablefmt="github"))
-    print("\n")
-
-if multinode_results:
-    multinode_results.sort(key=lambda r: (r['infmax_model_prefix'], r['hw'], r['framework'], r['precision'], r['isl'],
-                           r['osl'], r['prefill_tp'], r['prefill_ep'], r['decode_tp'], r['decode_ep'], r['conc']))
-
-    multinode_headers = [
-        MODEL, SERVED_MODEL, HARDWARE, FRAMEWORK, PRECISION, ISL, OSL,
-        PREFILL_TP, PREFILL_EP, PREFILL_DP_ATTN, PREFILL_WORKERS, PREFILL_GPUS,
-        DECODE_TP, DECODE_EP, DECODE_DP_ATTN, DECODE_WORKERS, DECODE_GPUS,
-        CONC, TTFT, TPOT, INTERACTIVITY, E2EL, TPUT_PER_GPU, OUTPUT_TPUT_PER_GPU, INPUT_TPUT_PER_GPU
-    ]
-
-    multinode_rows = [
-        [
-            r['infmax_model_prefix'],
-            r['model'],
-            r['hw'].upper(),
-            r['framework'].upper(),
-            r['precision'].upper(),
-            r['isl'],
-            r['osl'],
-            r['prefill_tp'],
-            r['prefill_ep'],
-            r['prefill_dp_attention'],
-            r['prefill_num_workers'],
-            r['num_prefill_gpu'],
-            r['decode_tp'],
-            r['decode_ep'],
-            r['decode_dp_attention'],
-            r['decode_num_workers'],
-            r['num_decode_gpu'],
-            r['conc'],
-            f"{r['median_ttft'] * 1000:.4f}",
-            f"{r['median_tpot'] * 1000:.4f}",
-            f"{r['median_intvty']:.4f}",
-            f"{r['median_e2el']:.4f}",
-            f"{r['tput_per_gpu']:.4f}",
-            f"{r['output_tput_per_gpu']:.4f}",
-            f"{r['input_tput_per_gpu']:.4f}",
-        ]
-        for r in multinode_results
-    ]
-
-    print("## Multi-Node Results\n")
-    print(tabulate(multinode_rows, headers=multinode_headers, tablefmt="github"))
+
+def _upper(value):
+    return str(value).upper()
+
+
+def _float(value):
+    return f"{value:.4f}"
+
+
+def _ms(value):
+    return f"{value * 1000:.4f}"
+
+
+# Column definitions as (result field, header, formatter). The result field doubles as the
+# column id accepted by --columns so that selections survive header renames.
+SINGLE_NODE_COLUMNS = [
+    ('infmax_model_prefix', MODEL, str),
+    ('model', SERVED_MODEL, str),
+    ('hw', HARDWARE, _upper),
+    ('framework', FRAMEWORK, _upper),
+    ('precision', PRECISION, _upper),
+    ('isl', ISL, str),
+    ('osl', OSL, str),
+    ('tp', TP, str),
+    ('ep', EP, str),
+    ('dp_attention', DP_ATTENTION, str),
+    ('conc', CONC, str),
+    ('median_ttft', TTFT, _ms),
+    ('median_tpot', TPOT, _ms),
+    ('median_intvty', INTERACTIVITY, _float),
+    ('median_e2el', E2EL, _float),
+    ('tput_per_gpu', TPUT_PER_GPU, _float),
+    ('output_tput_per_gpu', OUTPUT_TPUT_PER_GPU, _float),
+    ('input_tput_per_gpu', INPUT_TPUT_PER_GPU, _float),
+]
+
+MULTINODE_COLUMNS = [
+    ('infmax_model_prefix', MODEL, str),
+    ('model', SERVED_MODEL, str),
+    ('hw', HARDWARE, _upper),
+    ('framework', FRAMEWORK, _upper),
+    ('precision', PRECISION, _upper),
+    ('isl', ISL, str),
+    ('osl', OSL, str),
+    ('prefill_tp', PREFILL_TP, str),
+    ('prefill_ep', PREFILL_EP, str),
+    ('prefill_dp_attention', PREFILL_DP_ATTN, str),
+    ('prefill_num_workers', PREFILL_WORKERS, str),
+    ('num_prefill_gpu', PREFILL_GPUS, str),
+    ('decode_tp', DECODE_TP, str),
+    ('decode_ep', DECODE_EP, str),
+    ('decode_dp_attention', DECODE_DP_ATTN, str),
+    ('decode_num_workers', DECODE_WORKERS, str),
+    ('num_decode_gpu', DECODE_GPUS, str),
+    ('conc', CONC, str),
+    ('median_ttft', TTFT, _ms),
+    ('median_tpot', TPOT, _ms),
+    ('median_intvty', INTERACTIVITY, _float),
+    ('median_e2el', E2EL, _float),
+    ('tput_per_gpu', TPUT_PER_GPU, _float),
+    ('output_tput_per_gpu', OUTPUT_TPUT_PER_GPU, _float),
+    ('input_tput_per_gpu', INPUT_TPUT_PER_GPU, _float),
+]
+
+# Each markdown section holds the results of one model/isl/osl/hw combination. The group fields
+# lead the sort key so that every group is a contiguous run of the sort index.
+GROUP_FIELDS = ('infmax_model_prefix', 'isl', 'osl', 'hw')
+SINGLE_NODE_SORT_FIELDS = GROUP_FIELDS + ('framework', 'precision', 'tp', 'ep', 'conc')
+MULTINODE_SORT_FIELDS = GROUP_FIELDS + (
+    'framework', 'precision', 'prefill_tp', 'prefill_ep', 'decode_tp', 'decode_ep', 'conc')
+
+# Fields identifying the same benchmark point across runs, used to pair results with a baseline
+SINGLE_NODE_IDENTITY_FIELDS = (
+    'infmax_model_prefix', 'hw', 'framework', 'precision', 'spec_decoding', 'isl', 'osl',
+    'tp', 'ep', 'dp_attention', 'conc')
+MULTINODE_IDENTITY_FIELDS = (
+    'infmax_model_prefix', 'hw', 'framework', 'precision', 'spec_decoding', 'isl', 'osl',
+    'prefill_tp', 'prefill_ep', 'prefill_dp_attention', 'prefill_num_workers',
+    'decode_tp', 'decode_ep', 'decode_dp_attention', 'decode_num_workers', 'conc')
+
+# Metrics compared in delta mode as (result field, header, formatter)
+DELTA_METRICS = [
+    ('tput_per_gpu', TPUT_PER_GPU, _float),
+    ('median_intvty', INTERACTIVITY, _float),
+    ('median_ttft', TTFT, _ms),
+]
+
+# Maps --<flag> filter names to the result field they match against
+FILTER_FIELDS = {
+    'model_prefix': 'infmax_model_prefix',
+    'hw': 'hw',
+    'framework': 'framework',
+    'precision': 'precision',
+    'isl': 'isl',
+    'osl': 'osl',
+}
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def _export_value(fmt, value):
+    """Machine-readable counterpart of a column formatter.
+
+    Values keep the unit named by the column header (e.g. milliseconds for TTFT) but stay numeric.
+    """
+    if fmt is _ms:
+        return value * 1000
+    if fmt is _upper:
+        return _upper(value)
+    return value
+
+
+class CsvExporter:
+    """Writes rows to a CSV file whose header row holds the column headers."""
+
+    def __init__(self, path, headers):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write_row(self, values):
+        self._writer.writerow(values)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlExporter:
+    """Writes one JSON object per row, keyed by column header."""
+
+    def __init__(self, path, headers):
+        self._file = open(path, 'w')
+        self._headers = headers
+
+    def write_row(self, values):
+        self._file.write(json.dumps(dict(zip(self._headers, values))) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetExporter:
+    """Buffers rows column-wise and writes a Parquet file on close. Requires pyarrow."""
+
+    def __init__(self, path, headers):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow).")
+        self._pa = pyarrow
+        self._path = path
+        self._headers = headers
+        self._columns = [[] for _ in headers]
+
+    def write_row(self, values):
+        for column, value in zip(self._columns, values):
+            column.append(value)
+
+    def close(self):
+        table = self._pa.table(dict(zip(self._headers, self._columns)))
+        self._pa.parquet.write_table(table, self._path)
+
+
+EXPORTERS = {
+    'csv': CsvExporter,
+    'jsonl': JsonlExporter,
+    'parquet': ParquetExporter,
+}
+
+
+def open_exporters(export_dir, export_formats, name, columns):
+    """Open one exporter per format, writing to <export_dir>/<name>.<format>."""
+    if not export_dir:
+        return []
+
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    headers = [c[1] for c in columns]
+    return [EXPORTERS[fmt](export_dir / f"{name}.{fmt}", headers) for fmt in export_formats]
+
+
+def load_results(results_path):
+    """Load results from a directory of result JSONs or from an aggregated results JSON.
+
+    Directories are searched recursively. Aggregated files (as written by collect_results.py)
+    hold a list of results, individual result files hold a single result.
+    """
+    results_path = Path(results_path)
+    paths = [results_path] if results_path.is_file() else results_path.rglob('*.json')
+
+    results = []
+    for result_path in paths:
+        with open(result_path) as f:
+            result = json.load(f)
+        if isinstance(result, list):
+            results.extend(result)
+        else:
+            results.append(result)
+    return results
+
+
+def filter_results(results, filters):
+    """Keep results whose fields match every non-empty filter.
+
+    Args:
+        results: List of result dicts.
+        filters: Mapping of result field to the collection of accepted values. Values are compared
+            as strings so that CLI input matches numeric fields like isl/osl.
+    """
+    active = {field: {str(v) for v in values} for field, values in filters.items() if values}
+    if not active:
+        return results
+    return [r for r in results if all(str(r.get(field)) in values for field, values in active.items())]
+
+
+def select_columns(columns, column_ids):
+    """Restrict column definitions to column_ids, preserving the order they were requested in."""
+    if not column_ids:
+        return columns
+
+    by_id = {c[0]: c for c in columns}
+    return [by_id[column_id] for column_id in column_ids if column_id in by_id]
+
+
+def sort_index(results, sort_fields):
+    """Return the permutation of result indices that orders results by sort_fields.
+
+    Keys are extracted once up front instead of on every comparison.
+    """
+    keys = list(map(itemgetter(*sort_fields), results))
+    return sorted(range(len(results)), key=keys.__getitem__)
+
+
+def group_heading(result):
+    return (f"### {result['infmax_model_prefix']} {_upper(result['hw'])} "
+            f"(ISL {result['isl']}, OSL {result['osl']})")
+
+
+def write_table_header(out, columns):
+    out.write("| " + " | ".join(c[1] for c in columns) + " |\n")
+    out.write("|" + "|".join("-" * (len(c[1]) + 2) for c in columns) + "|\n")
+
+
+def write_grouped_tables(out, results, columns, sort_fields, exporters=()):
+    """Stream one markdown table per model/isl/osl/hw group to out.
+
+    Each row is also handed to every exporter in the same pass, in the same order.
+    """
+    order = sort_index(results, sort_fields)
+    group_key = itemgetter(*GROUP_FIELDS)
+    fields = [c[0] for c in columns]
+    formatters = [c[2] for c in columns]
+
+    for _, group in groupby((results[i] for i in order), key=group_key):
+        first = next(group)
+        out.write(group_heading(first) + "\n\n")
+        write_table_header(out, columns)
+        for r in (first, *group):
+            out.write("| " + " | ".join(fmt(r[field]) for field, fmt in zip(fields, formatters)) + " |\n")
+            if exporters:
+                values = [_export_value(fmt, r[field]) for field, fmt in zip(fields, formatters)]
+                for exporter in exporters:
+                    exporter.write_row(values)
+        out.write("\n")
+
+
+def summarize(results, out=sys.stdout, column_ids=None, export_dir=None, export_formats=()):
+    """Write the markdown summary of results to out.
+
+    If export_dir is given, the same rows are also written there as single_node.<format> and
+    multi_node.<format> for each of export_formats. Files are only written for non-empty splits.
+
+    Raises:
+        ValueError: If none of column_ids apply to the single-node or multi-node results present.
+    """
+    single_node_results = [r for r in results if not r['is_multinode']]
+    multinode_results = [r for r in results if r['is_multinode']]
+
+    # Single-node and multi-node results have different fields and therefore need to be printed separately.
+    # Columns are selected for both before anything is written, so a bad selection leaves no partial output.
+    splits = []
+    for title, name, split_results, columns, sort_fields in (
+        ("Single-Node", "single_node", single_node_results, SINGLE_NODE_COLUMNS, SINGLE_NODE_SORT_FIELDS),
+        ("Multi-Node", "multi_node", multinode_results, MULTINODE_COLUMNS, MULTINODE_SORT_FIELDS),
+    ):
+        if not split_results:
+            continue
+
+        selected = select_columns(columns, column_ids)
+        if not selected:
+            raise ValueError(
+                f"None of the selected columns apply to {title.lower()} results. "
+                f"Valid columns are: {', '.join(c[0] for c in columns)}")
+        splits.append((title, name, split_results, selected, sort_fields))
+
+    for title, name, split_results, columns, sort_fields in splits:
+        exporters = open_exporters(export_dir, export_formats, name, columns)
+        try:
+            out.write(f"## {title} Results\n\n")
+            write_grouped_tables(out, split_results, columns, sort_fields, exporters)
+        finally:
+            for exporter in exporters:
+                exporter.close()
+
+
+def pct_change(current, baseline):
+    """Relative change from baseline to current in percent, or None if baseline is zero."""
+    if not baseline:
+        return None
+    return (current - baseline) / baseline * 100
+
+
+def average_duplicates(results, identity_fields):
+    """Merge results that share an identity into one whose DELTA_METRICS are their means.
+
+    Returns:
+        Tuple of (merged, duplicated), where merged maps each identity to its result, in order
+        of first appearance, and duplicated lists the identities that had several results.
+    """
+    identity = itemgetter(*identity_fields)
+    groups = {}
+    for r in results:
+        groups.setdefault(identity(r), []).append(r)
+
+    merged, duplicated = {}, []
+    for key, group in groups.items():
+        if len(group) == 1:
+            merged[key] = group[0]
+            continue
+        duplicated.append(key)
+        merged[key] = {**group[0], **{field: sum(r[field] for r in group) / len(group)
+                                      for field, _, _ in DELTA_METRICS}}
+    return merged, duplicated
+
+
+def compute_deltas(results, baseline_results, identity_fields):
+    """Pair results with baseline results by identity and compute per-metric deltas.
+
+    Baseline results that share an identity, e.g. from repeated runs, are compared as the mean of
+    their metrics.
+
+    Returns:
+        Tuple of (rows, added, removed, duplicated). rows is a list of (result, baseline_result,
+        deltas) sorted by the largest absolute metric change first, where deltas maps each
+        DELTA_METRICS field to its percentage change. added holds results without a baseline
+        counterpart, removed holds baseline results without a current counterpart and
+        duplicated the identities of baseline results that were averaged.
+    """
+    identity = itemgetter(*identity_fields)
+    baseline_by_identity, duplicated = average_duplicates(baseline_results, identity_fields)
+
+    rows, added, seen = [], [], set()
+    for r in results:
+        key = identity(r)
+        base = baseline_by_identity.get(key)
+        if base is None:
+            added.append(r)
+            continue
+        seen.add(key)
+        deltas = {field: pct_change(r[field], base[field]) for field, _, _ in DELTA_METRICS}
+        rows.append((r, base, deltas))
+
+    removed = [r for key, r in baseline_by_identity.items() if key not in seen]
+    rows.sort(key=lambda row: max((abs(d) for d in row[2].values() if d is not None), default=0),
+              reverse=True)
+    return rows, added, removed, duplicated
+
+
+def format_delta(value, delta, fmt):
+    if delta is None:
+        return f"{fmt(value)} (n/a)"
+    return f"{fmt(value)} ({delta:+.2f}%)"
+
+
+def write_delta_table(out, results, baseline_results, columns, identity_fields):
+    """Write one markdown table of current vs baseline metrics, largest change first."""
+    id_columns = [c for c in columns if c[0] in identity_fields]
+    rows, added, removed, duplicated = compute_deltas(results, baseline_results, identity_fields)
+
+    write_table_header(out, id_columns + [(f, f"{h} (vs baseline)", fmt) for f, h, fmt in DELTA_METRICS])
+    for r, _, deltas in rows:
+        cells = [fmt(r[field]) for field, _, fmt in id_columns]
+        cells += [format_delta(r[field], deltas[field], fmt) for field, _, fmt in DELTA_METRICS]
+        out.write("| " + " | ".join(cells) + " |\n")
+    out.write("\n")
+
+    if added:
+        out.write(f"{len(added)} result(s) have no baseline counterpart.\n\n")
+    if removed:
+        out.write(f"{len(removed)} baseline result(s) are missing from this run.\n\n")
+    if duplicated:
+        out.write(f"{len(duplicated)} baseline configuration(s) have several results; "
+                  f"deltas are against their mean.\n\n")
+
+
+def summarize_deltas(results, baseline_results, out=sys.stdout):
+    """Write the markdown delta summary of results against baseline_results to out."""
+    for title, is_multinode, columns, identity_fields in (
+        ("Single-Node", False, SINGLE_NODE_COLUMNS, SINGLE_NODE_IDENTITY_FIELDS),
+        ("Multi-Node", True, MULTINODE_COLUMNS, MULTINODE_IDENTITY_FIELDS),
+    ):
+        current = [r for r in results if r['is_multinode'] == is_multinode]
+        baseline = [r for r in baseline_results if r['is_multinode'] == is_multinode]
+        if not current:
+            continue
+        out.write(f"## {title} Changes vs Baseline\n\n")
+        write_delta_table(out, current, baseline, columns, identity_fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Summarize benchmark results as grouped markdown tables')
+    parser.add_argument(
+        'results',
+        help='Directory of result JSON files (searched recursively) or an aggregated results JSON file'
+    )
+    parser.add_argument(
+        '--columns',
+        nargs='+',
+        required=False,
+        help='Result fields to show as columns, in order (e.g., conc median_ttft tput_per_gpu). '
+             'Fields that do not apply to single-node or multi-node results are skipped for that table.'
+    )
+    parser.add_argument(
+        '--baseline',
+        required=False,
+        help='Baseline results directory or aggregated results JSON. When given, each result is shown '
+             'with its percentage change vs the matching baseline result, sorted by largest change.'
+    )
+    parser.add_argument(
+        '--export-dir',
+        required=False,
+        help='Also write the summarized rows to this directory as single_node.<format> and '
+             'multi_node.<format>, with the markdown column headers as column names'
+    )
+    parser.add_argument(
+        '--export-format',
+        nargs='+',
+        choices=EXPORT_FORMATS,
+        default=['csv', 'jsonl'],
+        help='Export format(s) used with --export-dir (default: csv jsonl). parquet requires pyarrow.'
+    )
+    parser.add_argument('--model-prefix', nargs='+', help='Model prefix(es) to include (e.g., dsr1, gptoss)')
+    parser.add_argument('--hw', nargs='+', help='Hardware/runner(s) to include (e.g., h200, b200-trt)')
+    parser.add_argument('--framework', nargs='+', help='Framework(s) to include (e.g., vllm, sglang, trt)')
+    parser.add_argument('--precision', nargs='+', help='Precision(s) to include (e.g., fp4, fp8)')
+    parser.add_argument('--isl', nargs='+', help='Input sequence length(s) to include')
+    parser.add_argument('--osl', nargs='+', help='Output sequence length(s) to include')
+    args = parser.parse_args()
+
+    all_column_ids = {c[0] for c in SINGLE_NODE_COLUMNS + MULTINODE_COLUMNS}
+    unknown_columns = set(args.columns or []) - all_column_ids
+    if unknown_columns:
+        parser.error(
+            f"Unknown column(s): {', '.join(sorted(unknown_columns))}. "
+            f"Valid columns are: {', '.join(sorted(all_column_ids))}")
+    if args.baseline and args.export_dir:
+        parser.error("--export-dir cannot be combined with --baseline.")
+    if args.baseline and args.columns:
+        # Delta tables always show the identity columns and the compared metrics
+        parser.error("--columns cannot be combined with --baseline.")
+    if args.export_dir and 'parquet' in args.export_format:
+        # Checked before anything is written, rather than when the exporter is opened mid-run
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            parser.error("--export-format parquet requires pyarrow (pip install pyarrow).")
+
+    filters = {field: getattr(args, flag) for flag, field in FILTER_FIELDS.items()}
+    results = filter_results(load_results(args.results), filters)
+
+    if args.baseline:
+        baseline_results = filter_results(load_results(args.baseline), filters)
+        summarize_deltas(results, baseline_results, sys.stdout)
+    else:
+        try:
+            summarize(results, sys.stdout, args.columns, args.export_dir, args.export_format)
+        except ValueError as e:
+            parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Tests for changelog_index.py"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from changelog_index import link_results, matches_pr, query_index, update_index
+from test_summarize import make_single_node_result
+
+SCRIPT_PATH = Path(__file__).parent / "changelog_index.py"
+
+PR_159 = "https://github.com/InferenceMAX/InferenceMAX/pull/159"
+PR_160 = "https://github.com/InferenceMAX/InferenceMAX/pull/160"
+
+
+def make_metadata(head_ref, job_origins, cached_input_hashes=()):
+    return {
+        "base_ref": f"{head_ref}~1",
+        "head_ref": head_ref,
+        "entries": [],
+        "job_origins": {
+            input_hash: {"config-key": key, "pr-link": pr_link}
+            for input_hash, (key, pr_link) in job_origins.items()
+        },
+        "cached_input_hashes": list(cached_input_hashes),
+    }
+
+
+def index_run(index, head_ref, key, pr_link, tput_per_gpu, input_hash="aaaa"):
+    records, _, _ = link_results(
+        make_metadata(head_ref, {input_hash: (key, pr_link)}),
+        [make_single_node_result(input_hash=input_hash, tput_per_gpu=tput_per_gpu)],
+    )
+    return update_index(index, records)
+
+
+class TestLinkResults:
+    """Tests for link_results and update_index."""
+
+    def test_results_linked_by_input_hash(self):
+        metadata = make_metadata("abc123", {
+            "aaaa": ("gptoss-fp4-h200-vllm", PR_159),
+            "bbbb": ("gptoss-fp4-b200-vllm", PR_159),
+        })
+        results = [
+            make_single_node_result(input_hash="aaaa"),
+            make_single_node_result(input_hash="bbbb", hw="b200"),
+            make_single_node_result(input_hash="cccc"),
+            make_single_node_result(),
+        ]
+        records, unlinked, reused = link_results(metadata, results)
+        assert [(r["config_key"], r["pr_link"], r["head_ref"]) for r in records] == [
+            ("gptoss-fp4-h200-vllm", PR_159, "abc123"),
+            ("gptoss-fp4-b200-vllm", PR_159, "abc123"),
+        ]
+        assert records[1]["result"]["hw"] == "b200"
+        assert unlinked == results[2:]
+        assert reused == []
+
+    def test_cached_results_not_indexed(self):
+        # bbbb was a result cache hit: its results were measured by an earlier sweep
+        metadata = make_metadata("abc123", {
+            "aaaa": ("gptoss-fp4-h200-vllm", PR_160),
+            "bbbb": ("gptoss-fp4-b200-vllm", PR_160),
+        }, cached_input_hashes=["bbbb"])
+        results = [
+            make_single_node_result(input_hash="aaaa"),
+            make_single_node_result(input_hash="bbbb", hw="b200"),
+        ]
+        records, unlinked, reused = link_results(metadata, results)
+        assert [r["config_key"] for r in records] == ["gptoss-fp4-h200-vllm"]
+        assert unlinked == []
+        assert reused == results[1:]
+
+    def test_rerun_replaces_records(self):
+        index = index_run([], "abc123", "gptoss-fp4-h200-vllm", PR_159, 1000.0)
+        index = index_run(index, "def456", "gptoss-fp4-h200-vllm", PR_160, 1100.0)
+        index = index_run(index, "abc123", "gptoss-fp4-h200-vllm", PR_159, 1200.0)
+        assert [(r["head_ref"], r["result"]["tput_per_gpu"]) for r in index] == [
+            ("def456", 1100.0), ("abc123", 1200.0),
+        ]
+
+
+class TestQueryIndex:
+    """Tests for query_index."""
+
+    def test_matches_pr(self):
+        assert matches_pr(PR_159, 159)
+        assert matches_pr(PR_159 + "/", "159")
+        assert matches_pr(PR_159, PR_159)
+        assert not matches_pr(PR_159, 15)
+
+    def test_baseline_is_previous_run_of_config_key(self):
+        index = index_run([], "r1", "gptoss-fp4-h200-vllm", PR_160, 1000.0)
+        index = index_run(index, "r2", "gptoss-fp4-b200-vllm", PR_160, 2000.0, input_hash="bbbb")
+        index = index_run(index, "r3", "gptoss-fp4-h200-vllm", PR_159, 1100.0)
+
+        comparisons = query_index(index, pr=159, config_key="gptoss-fp4-h200-vllm")
+        assert len(comparisons) == 1
+        comparison = comparisons[0]
+        assert (comparison.head_ref, comparison.pr_link) == ("r3", PR_159)
+        assert [r["tput_per_gpu"] for r in comparison.results] == [1100.0]
+        assert [r["tput_per_gpu"] for r in comparison.baseline_results] == [1000.0]
+
+        # The first run of a config key has no baseline
+        assert [(c.head_ref, c.baseline_results) for c in query_index(index, config_key="*-b200-*")] == [("r2", [])]
+        assert [c.head_ref for c in query_index(index, pr=160)] == ["r1", "r2"]
+
+
+class TestCLI:
+    """Tests for the build and query commands."""
+
+    def test_build_and_query(self, tmp_path):
+        index_path = tmp_path / "changelog_index.json"
+        for head_ref, pr_link, tput_per_gpu in (("r1", PR_160, 1000.0), ("r2", PR_159, 1100.0)):
+            metadata_path = tmp_path / f"{head_ref}_metadata.json"
+            metadata_path.write_text(json.dumps(
+                make_metadata(head_ref, {"aaaa": ("gptoss-fp4-h200-vllm", pr_link)})))
+            results_path = tmp_path / f"{head_ref}_agg_bmk.json"
+            results_path.write_text(json.dumps(
+                [make_single_node_result(input_hash="aaaa", tput_per_gpu=tput_per_gpu)]))
+            subprocess.run([sys.executable, str(SCRIPT_PATH), "build", "--index", str(index_path),
+                            "--metadata", str(metadata_path), "--results", str(results_path)],
+                           check=True, capture_output=True)
+
+        result = subprocess.run([sys.executable, str(SCRIPT_PATH), "query", "--index", str(index_path),
+                                 "--pr", "159", "--config-key", "gptoss-fp4-h200-vllm"],
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.startswith(f"# gptoss-fp4-h200-vllm at r2 ({PR_159})")
+        assert "(+10.00%)" in result.stdout
+
+        result = subprocess.run([sys.executable, str(SCRIPT_PATH), "query", "--index", str(index_path),
+                                 "--pr", "1"], capture_output=True, text=True)
+        assert result.returncode == 1
@@ -0,0 +1,109 @@
+"""Tests for plot_heatmap.py"""
+import math
+
+from plot_heatmap import MISSING, NOT_SWEPT, build_grid, configured_cells
+from test_summarize import make_multinode_result, make_single_node_result
+
+
+SINGLE_NODE_CONFIG = {
+    "gptoss-fp4-h200-vllm": {
+        "image": "vllm/vllm-openai:v0.11.0",
+        "model": "openai/gpt-oss-120b",
+        "model-prefix": "gptoss",
+        "precision": "fp4",
+        "framework": "vllm",
+        "runner": "h200",
+        "multinode": False,
+        "seq-len-configs": [{
+            "isl": 1024,
+            "osl": 1024,
+            "search-space": [
+                {"tp": 8, "conc-start": 4, "conc-end": 16},
+                {"tp": 4, "ep": 4, "dp-attn": True, "conc-list": [64]},
+            ],
+        }],
+    },
+}
+
+MULTINODE_CONFIG = {
+    "dsr1-fp4-gb200-dynamo-trt": {
+        "image": "nvcr.io#nvidia/ai-dynamo/tensorrtllm-runtime:0.5.1-rc0.pre3",
+        "model": "deepseek-r1-fp4",
+        "model-prefix": "dsr1",
+        "precision": "fp4",
+        "framework": "dynamo-trt",
+        "runner": "gb200",
+        "multinode": True,
+        "seq-len-configs": [{
+            "isl": 1024,
+            "osl": 1024,
+            "search-space": [
+                {"prefill": {"num-worker": 5, "tp": 4, "ep": 4, "dp-attn": True},
+                 "decode": {"num-worker": 1, "tp": 8, "ep": 8, "dp-attn": True},
+                 "conc-list": [2150]},
+                {"prefill": {"num-worker": 5, "tp": 4, "ep": 4, "dp-attn": True},
+                 "decode": {"num-worker": 1, "tp": 8, "ep": 8, "dp-attn": False},
+                 "conc-list": [2150]},
+            ],
+        }],
+    },
+}
+
+
+class TestConfiguredCells:
+    """Tests for configured_cells."""
+
+    def test_single_node(self):
+        assert configured_cells(SINGLE_NODE_CONFIG) == {
+            ("gptoss", "fp4", "h200", "vllm", 1024, 1024): {
+                ("TP8/EP1", 4), ("TP8/EP1", 8), ("TP8/EP1", 16), ("TP4/EP4/DPA", 64),
+            },
+        }
+
+    def test_multinode_layouts_include_ep_and_dpa(self):
+        assert configured_cells(MULTINODE_CONFIG) == {
+            ("dsr1", "fp4", "gb200", "dynamo-trt", 1024, 1024): {
+                ("P5xTP4/EP4/DPA,D1xTP8/EP8/DPA", 2150), ("P5xTP4/EP4/DPA,D1xTP8/EP8", 2150),
+            },
+        }
+
+
+class TestBuildGrid:
+    """Tests for build_grid."""
+
+    def test_grid(self):
+        results = [
+            make_single_node_result(conc=4, tput_per_gpu=1000.0),
+            make_single_node_result(conc=4, tput_per_gpu=1200.0),
+            make_single_node_result(conc=64, tp=4, ep=4, dp_attention="true", tput_per_gpu=900.0),
+        ]
+        configured = configured_cells(SINGLE_NODE_CONFIG)[("gptoss", "fp4", "h200", "vllm", 1024, 1024)]
+        layouts, concs, values, states = build_grid(results, "tput_per_gpu", configured)
+
+        assert layouts == ["TP4/EP4/DPA", "TP8/EP1"]
+        assert concs == [4, 8, 16, 64]
+        # The best of several results in a cell is kept
+        assert values[1, 0] == 1200.0
+        assert values[0, 3] == 900.0
+        assert states == {
+            (0, 0): NOT_SWEPT, (0, 1): NOT_SWEPT, (0, 2): NOT_SWEPT,
+            (1, 1): MISSING, (1, 2): MISSING, (1, 3): NOT_SWEPT,
+        }
+        assert all(math.isnan(values[cell]) for cell in states)
+
+    def test_goodput(self):
+        results = [
+            make_single_node_result(conc=4, median_intvty=50.0),
+            make_single_node_result(conc=64, median_intvty=20.0),
+        ]
+        _, _, values, _ = build_grid(results, "goodput", min_intvty=30.0)
+        assert values.tolist() == [[1500.0, 0.0]]
+
+    def test_multinode_layouts_differing_in_dpa_are_separate_rows(self):
+        results = [
+            make_multinode_result(tput_per_gpu=1000.0),
+            make_multinode_result(decode_dp_attention="false", tput_per_gpu=800.0),
+        ]
+        layouts, _, values, _ = build_grid(results, "tput_per_gpu")
+        assert layouts == ["P5xTP4/EP4/DPA,D1xTP8/EP8", "P5xTP4/EP4/DPA,D1xTP8/EP8/DPA"]
+        assert values.tolist() == [[800.0], [1000.0]]
@@ -0,0 +1,64 @@
+"""Tests for the changelog attribution of plot_trends.py"""
+from plot_trends import describes_upgrade_to, image_transitions, match_entries_to_transitions
+from test_summarize import make_single_node_result
+
+VLLM = "vllm/vllm-openai"
+
+
+def make_series(images, **overrides):
+    """Series of one layout and concurrency with one result per run, served with images[run_idx]."""
+    return {"TP8/EP1 conc=64": [(run_idx, make_single_node_result(image=image, **overrides))
+                                for run_idx, image in enumerate(images)]}
+
+
+def make_entry(pr, *description):
+    return {"config-keys": ["gptoss-fp4-h200-vllm"], "description": list(description),
+            "pr-link": f"https://github.com/InferenceMAX/InferenceMAX/pull/{pr}"}
+
+
+class TestImageTransitions:
+    """Tests for image_transitions."""
+
+    def test_transitions(self):
+        series = make_series([f"{VLLM}:v0.10.2", f"{VLLM}:v0.10.2", f"{VLLM}:v0.11.0", f"{VLLM}:v0.12.0"])
+        assert image_transitions(series) == [(2, f"{VLLM}:v0.11.0"), (3, f"{VLLM}:v0.12.0")]
+
+    def test_runs_are_merged_across_series(self):
+        series = make_series([f"{VLLM}:v0.10.2", f"{VLLM}:v0.11.0"])
+        series["TP4/EP1 conc=4"] = [(2, make_single_node_result(image=f"{VLLM}:v0.11.0", tp=4, conc=4))]
+        assert image_transitions(series) == [(1, f"{VLLM}:v0.11.0")]
+
+
+class TestDescribesUpgradeTo:
+    """Tests for describes_upgrade_to."""
+
+    def test_from_to(self):
+        assert describes_upgrade_to("Update vLLM from v0.10.2 to v0.11.0", f"{VLLM}:v0.11.0")
+        assert describes_upgrade_to("Update image from v0.10.2 -> v0.11.0", f"{VLLM}:v0.11.0")
+        assert describes_upgrade_to(f"Bump image to {VLLM}:v0.11.0", f"{VLLM}:v0.11.0")
+
+    def test_v_prefix(self):
+        # Tags and descriptions may each leave out the leading 'v'
+        assert describes_upgrade_to("Update vLLM from 0.10.2 to 0.11.0", f"{VLLM}:v0.11.0")
+        assert describes_upgrade_to("Update vLLM from v0.10.2 to v0.11.0", f"{VLLM}:0.11.0")
+        assert describes_upgrade_to("Use vLLM 0.11.0", f"{VLLM}:v0.11.0")
+
+    def test_old_version_of_upgrade(self):
+        assert not describes_upgrade_to("Update vLLM from v0.11.0 to v0.12.0", f"{VLLM}:v0.11.0")
+        # Longer versions sharing a prefix are other versions
+        assert not describes_upgrade_to("Update vLLM from v0.10.2 to v0.11.0.1", f"{VLLM}:v0.11.0")
+
+
+class TestMatchEntriesToTransitions:
+    """Tests for match_entries_to_transitions."""
+
+    def test_entries_attributed_to_the_upgrade_they_describe(self):
+        transitions = [(2, f"{VLLM}:v0.11.0"), (3, f"{VLLM}:v0.12.0")]
+        first = make_entry(1, "Update vLLM from v0.10.2 to v0.11.0")
+        # Names the new version of the first transition, but as the old version of the second
+        second = make_entry(2, "Update vLLM from v0.11.0 to v0.12.0", "Enable async scheduling")
+        other = make_entry(3, "Tune max-num-batched-tokens")
+
+        attributed, unplaced = match_entries_to_transitions([first, second, other], transitions)
+        assert dict(attributed) == {2: [first], 3: [second]}
+        assert unplaced == [other]
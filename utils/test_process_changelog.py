@@ -0,0 +1,149 @@
+"""Tests for the changelog diff of process_changelog.py"""
+import subprocess
+
+import pytest
+from matrix_logic.generate_sweep_configs import generate_config_key_sweep
+from matrix_logic.validation import load_config_files
+from process_changelog import OTHER_SEQ_LENS, bucket_matrix, get_added_entries, shard_single_node
+
+
+ENTRY_1 = """\
+- config-keys:
+    - dsr1-fp8-h200-sglang
+  description:
+    - "Update SGLang image"
+  pr-link: https://github.com/InferenceMAX/InferenceMAX/pull/1
+"""
+
+ENTRY_2 = """\
+- config-keys:
+    - gptoss-fp4-*-vllm
+  description:
+    - "Update vLLM image"
+  pr-link: https://github.com/InferenceMAX/InferenceMAX/pull/2
+"""
+
+
+@pytest.fixture
+def changelog_repo(tmp_path, monkeypatch):
+    """Git repository with one commit of perf-changelog.yaml; returns a function to commit a new version."""
+    monkeypatch.chdir(tmp_path)
+
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                       check=True, capture_output=True)
+
+    def commit(content):
+        (tmp_path / "perf-changelog.yaml").write_text(content)
+        git("add", "perf-changelog.yaml")
+        git("commit", "-q", "-m", "update changelog")
+
+    git("init", "-q")
+    commit(ENTRY_1)
+    return commit
+
+
+class TestGetAddedEntries:
+    """Tests for get_added_entries."""
+
+    def test_added_entries(self, changelog_repo):
+        changelog_repo(ENTRY_1 + "\n" + ENTRY_2)
+        added = get_added_entries("HEAD~1", "HEAD", "perf-changelog.yaml")
+        assert [entry["pr-link"] for entry in added] == ["https://github.com/InferenceMAX/InferenceMAX/pull/2"]
+
+    def test_reformatted_entries_are_not_changes(self, changelog_repo):
+        reflowed = ("- {config-keys: [dsr1-fp8-h200-sglang], description: ['Update SGLang image'],\n"
+                    "   pr-link: 'https://github.com/InferenceMAX/InferenceMAX/pull/1'}\n")
+        changelog_repo(ENTRY_2 + reflowed)
+        added = get_added_entries("HEAD~1", "HEAD", "perf-changelog.yaml")
+        assert [entry["config-keys"] for entry in added] == [["gptoss-fp4-*-vllm"]]
+
+    def test_modified_entries_are_rejected(self, changelog_repo):
+        changelog_repo(ENTRY_1.replace("Update SGLang image", "Update the SGLang image") + ENTRY_2)
+        with pytest.raises(ValueError, match="Deletions are not allowed"):
+            get_added_entries("HEAD~1", "HEAD", "perf-changelog.yaml")
+
+    def test_new_changelog(self, changelog_repo, tmp_path):
+        (tmp_path / "other.yaml").write_text(ENTRY_2)
+        subprocess.run(["git", "add", "other.yaml"], check=True)
+        subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com",
+                        "commit", "-q", "-m", "add"], check=True)
+        assert len(get_added_entries("HEAD~1", "HEAD", str(tmp_path / "other.yaml"))) == 1
+
+
+class TestShardSingleNode:
+    """Tests for shard_single_node."""
+
+    def test_shards_follow_matrix_limit(self):
+        single_node = {
+            "1k1k": [{"runner": "h200", "conc": conc, "est-minutes": 30.0} for conc in range(600)],
+            "8k1k": [{"runner": "h200", "conc": 4, "est-minutes": 30.0}],
+        }
+        shards = shard_single_node(single_node, 1)
+        assert {key: len(shard) for key, shard in shards.items()} == {
+            "1k1k-0": 200, "1k1k-1": 200, "1k1k-2": 200, "8k1k-0": 1,
+        }
+        # Small matrices are still split into the requested minimum of shards
+        assert list(shard_single_node({"1k1k": single_node["1k1k"][:4]}, 2)) == ["1k1k-0", "1k1k-1"]
+
+
+def make_matrix_entry(seq_len_name, multinode=False):
+    entry = {"model-prefix": "gptoss", "exp-name": f"gptoss_{seq_len_name}", "isl": 1024, "osl": 1024}
+    if multinode:
+        entry["prefill"] = {"num-worker": 1, "tp": 4, "ep": 4, "dp-attn": False}
+    return entry
+
+
+MASTER_CONFIG = """\
+gptoss-fp4-h200-vllm:
+  image: vllm/vllm-openai:v0.11.0
+  model: openai/gpt-oss-120b
+  model-prefix: gptoss
+  runner: h200
+  precision: fp4
+  framework: vllm
+  multinode: false
+  seq-len-configs:
+  - profile: 1k1k
+    search-space:
+    - { tp: 8, conc-start: 4, conc-end: 4 }
+  - profile: rag-32k1k
+    search-space:
+    - { tp: 8, conc-start: 4, conc-end: 8 }
+"""
+
+
+class TestBucketMatrix:
+    """Tests for bucket_matrix."""
+
+    def test_buckets_by_profile_name(self):
+        entries = [
+            make_matrix_entry("1k1k"),
+            make_matrix_entry("rag-32k1k"),
+            # Same isl/osl as 1k1k, but a different profile
+            make_matrix_entry("1k1k-narrow"),
+            make_matrix_entry("8k1k", multinode=True),
+            make_matrix_entry("rag-32k1k", multinode=True),
+        ]
+        matrices = bucket_matrix(entries)
+        assert {key: [e["exp-name"] for e in bucket] for key, bucket in matrices["single_node"].items()} == {
+            "1k1k": ["gptoss_1k1k"],
+            OTHER_SEQ_LENS: ["gptoss_rag-32k1k", "gptoss_1k1k-narrow"],
+        }
+        assert {key: len(bucket) for key, bucket in matrices["multi_node"].items()} == {
+            "8k1k": 1, OTHER_SEQ_LENS: 1,
+        }
+
+    def test_profiles_file_end_to_end(self, tmp_path):
+        """Master configs naming a profile of seq-len-profiles.yaml reach the other bucket."""
+        master_config_file = tmp_path / "master.yaml"
+        master_config_file.write_text(MASTER_CONFIG)
+        master_config = load_config_files([str(master_config_file)])
+        matrices = bucket_matrix(generate_config_key_sweep(["gptoss-fp4-h200-vllm"], master_config))
+
+        assert [entry["conc"] for entry in matrices["single_node"]["1k1k"]] == [4]
+        rag = matrices["single_node"][OTHER_SEQ_LENS]
+        assert [(e["exp-name"], e["isl"], e["osl"], e["random-range-ratio"], e["conc"]) for e in rag] == [
+            ("gptoss_rag-32k1k", 32768, 1024, 0.5, 4),
+            ("gptoss_rag-32k1k", 32768, 1024, 0.5, 8),
+        ]
@@ -487,3 +487,38 @@ class TestEdgeCases:
 
         output_data = json.loads(result.stdout)
         assert output_data["conc"] == 128
+
+    def test_duration_and_num_prompts_recorded(self, tmp_path, sample_benchmark_result, single_node_env_vars):
+        """Test that benchmark duration and num_prompts are kept for runtime estimation."""
+        benchmark_result = {**sample_benchmark_result, "duration": 312.5, "num_prompts": 640}
+        env = {**single_node_env_vars, "IMAGE": "test-image"}
+
+        result = run_script(tmp_path, env, benchmark_result)
+        assert result.returncode == 0, f"Script failed: {result.stderr}"
+
+        output_data = json.loads(result.stdout)
+        assert output_data["duration"] == 312.5
+        assert output_data["num_prompts"] == 640
+
+    def test_duration_optional(self, tmp_path, sample_benchmark_result, single_node_env_vars):
+        """Test that results without duration and num_prompts are still processed."""
+        env = {**single_node_env_vars, "IMAGE": "test-image"}
+
+        result = run_script(tmp_path, env, sample_benchmark_result)
+        assert result.returncode == 0, f"Script failed: {result.stderr}"
+
+        output_data = json.loads(result.stdout)
+        assert "duration" not in output_data
+        assert "num_prompts" not in output_data
+
+    def test_input_hash_recorded(self, tmp_path, sample_benchmark_result, single_node_env_vars):
+        """Test that the job's input hash is recorded when set, for result reuse."""
+        env = {**single_node_env_vars, "IMAGE": "test-image", "INPUT_HASH": "e0289e6d03974200"}
+
+        result = run_script(tmp_path, env, sample_benchmark_result)
+        assert result.returncode == 0, f"Script failed: {result.stderr}"
+        assert json.loads(result.stdout)["input_hash"] == "e0289e6d03974200"
+
+        env["INPUT_HASH"] = ""
+        result = run_script(tmp_path, env, sample_benchmark_result)
+        assert "input_hash" not in json.loads(result.stdout)
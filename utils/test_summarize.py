@@ -0,0 +1,465 @@
+"""Tests for summarize.py"""
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from summarize import (
+    MULTINODE_COLUMNS,
+    SINGLE_NODE_COLUMNS,
+    SINGLE_NODE_SORT_FIELDS,
+    SINGLE_NODE_IDENTITY_FIELDS,
+    TPUT_PER_GPU,
+    TTFT,
+    compute_deltas,
+    filter_results,
+    load_results,
+    select_columns,
+    sort_index,
+    summarize,
+    summarize_deltas,
+)
+
+SCRIPT_PATH = Path(__file__).parent / "summarize.py"
+
+
+# =============================================================================
+# Test Fixtures - Based on process_result.py output structure
+# =============================================================================
+
+def make_single_node_result(**overrides):
+    result = {
+        "hw": "h200",
+        "conc": 64,
+        "image": "vllm/vllm-openai:v0.11.0",
+        "model": "openai/gpt-oss-120b",
+        "infmax_model_prefix": "gptoss",
+        "framework": "vllm",
+        "precision": "fp4",
+        "spec_decoding": "none",
+        "disagg": False,
+        "isl": 1024,
+        "osl": 1024,
+        "is_multinode": False,
+        "tp": 8,
+        "ep": 1,
+        "dp_attention": "false",
+        "tput_per_gpu": 1500.0,
+        "output_tput_per_gpu": 750.0,
+        "input_tput_per_gpu": 750.0,
+        "median_ttft": 0.15,
+        "median_tpot": 0.025,
+        "median_intvty": 40.0,
+        "median_e2el": 1.5,
+    }
+    result.update(overrides)
+    return result
+
+
+def make_multinode_result(**overrides):
+    result = {
+        "hw": "gb200",
+        "conc": 2150,
+        "image": "nvcr.io#nvidia/ai-dynamo/tensorrtllm-runtime:0.5.1-rc0.pre3",
+        "model": "deepseek-r1-fp4",
+        "infmax_model_prefix": "dsr1",
+        "framework": "dynamo-trt",
+        "precision": "fp4",
+        "spec_decoding": "none",
+        "disagg": True,
+        "isl": 1024,
+        "osl": 1024,
+        "is_multinode": True,
+        "prefill_tp": 4,
+        "prefill_ep": 4,
+        "prefill_dp_attention": "true",
+        "prefill_num_workers": 5,
+        "decode_tp": 8,
+        "decode_ep": 8,
+        "decode_dp_attention": "true",
+        "decode_num_workers": 1,
+        "num_prefill_gpu": 20,
+        "num_decode_gpu": 8,
+        "tput_per_gpu": 3000.0,
+        "output_tput_per_gpu": 5000.0,
+        "input_tput_per_gpu": 2000.0,
+        "median_ttft": 0.5,
+        "median_tpot": 0.05,
+        "median_intvty": 20.0,
+        "median_e2el": 50.0,
+    }
+    result.update(overrides)
+    return result
+
+
+@pytest.fixture
+def mixed_results():
+    return [
+        make_single_node_result(hw="h200", conc=64),
+        make_single_node_result(hw="h200", conc=4),
+        make_single_node_result(hw="b200", conc=16, tp=4),
+        make_single_node_result(infmax_model_prefix="dsr1", model="deepseek-ai/DeepSeek-R1-0528",
+                                precision="fp8", framework="sglang"),
+        make_multinode_result(),
+    ]
+
+
+def render(results, column_ids=None):
+    out = io.StringIO()
+    summarize(results, out, column_ids)
+    return out.getvalue()
+
+
+# =============================================================================
+# Test loading
+# =============================================================================
+
+class TestLoadResults:
+    """Tests for load_results function."""
+
+    def test_load_directory_recursively(self, tmp_path):
+        """Should load individual result files from nested directories."""
+        nested = tmp_path / "bmk_a"
+        nested.mkdir()
+        (nested / "agg_a.json").write_text(json.dumps(make_single_node_result()))
+        (tmp_path / "agg_b.json").write_text(json.dumps(make_multinode_result()))
+
+        results = load_results(tmp_path)
+        assert len(results) == 2
+
+    def test_load_aggregated_file(self, tmp_path):
+        """Should flatten aggregated result lists."""
+        agg = tmp_path / "agg_bmk.json"
+        agg.write_text(json.dumps([make_single_node_result(), make_single_node_result(conc=4)]))
+
+        results = load_results(agg)
+        assert [r["conc"] for r in results] == [64, 4]
+
+
+# =============================================================================
+# Test filtering, column selection and ordering
+# =============================================================================
+
+class TestFilterResults:
+    """Tests for filter_results function."""
+
+    def test_no_filters(self, mixed_results):
+        """Should return all results when no filters are active."""
+        assert filter_results(mixed_results, {"hw": None}) == mixed_results
+
+    def test_filter_by_string_field(self, mixed_results):
+        """Should keep only matching values."""
+        filtered = filter_results(mixed_results, {"hw": ["b200"]})
+        assert len(filtered) == 1
+        assert filtered[0]["hw"] == "b200"
+
+    def test_filter_numeric_field_with_cli_strings(self, mixed_results):
+        """Numeric fields should match values passed as strings."""
+        filtered = filter_results(mixed_results, {"isl": ["1024"], "infmax_model_prefix": ["dsr1"]})
+        assert len(filtered) == 2
+
+    def test_filter_multiple_values(self, mixed_results):
+        """Multiple values for a filter should be OR-ed."""
+        filtered = filter_results(mixed_results, {"hw": ["b200", "gb200"]})
+        assert {r["hw"] for r in filtered} == {"b200", "gb200"}
+
+
+class TestSelectColumns:
+    """Tests for select_columns function."""
+
+    def test_default_all_columns(self):
+        assert select_columns(SINGLE_NODE_COLUMNS, None) == SINGLE_NODE_COLUMNS
+
+    def test_requested_order(self):
+        selected = select_columns(SINGLE_NODE_COLUMNS, ["tput_per_gpu", "conc"])
+        assert [c[0] for c in selected] == ["tput_per_gpu", "conc"]
+
+    def test_inapplicable_columns_skipped(self):
+        """Single-node-only fields should be dropped from the multi-node table."""
+        selected = select_columns(MULTINODE_COLUMNS, ["tp", "decode_tp", "conc"])
+        assert [c[0] for c in selected] == ["decode_tp", "conc"]
+
+
+class TestSortIndex:
+    """Tests for sort_index function."""
+
+    def test_sorted_by_fields(self, mixed_results):
+        single = [r for r in mixed_results if not r["is_multinode"]]
+        order = sort_index(single, SINGLE_NODE_SORT_FIELDS)
+        ordered = [single[i] for i in order]
+        assert [(r["infmax_model_prefix"], r["hw"], r["conc"]) for r in ordered] == [
+            ("dsr1", "h200", 64),
+            ("gptoss", "b200", 16),
+            ("gptoss", "h200", 4),
+            ("gptoss", "h200", 64),
+        ]
+
+
+# =============================================================================
+# Test rendering
+# =============================================================================
+
+class TestSummarize:
+    """Tests for markdown rendering."""
+
+    def test_sections_present(self, mixed_results):
+        output = render(mixed_results)
+        assert "## Single-Node Results" in output
+        assert "## Multi-Node Results" in output
+
+    def test_one_section_per_group(self, mixed_results):
+        output = render(mixed_results)
+        headings = [line for line in output.splitlines() if line.startswith("### ")]
+        assert headings == [
+            "### dsr1 H200 (ISL 1024, OSL 1024)",
+            "### gptoss B200 (ISL 1024, OSL 1024)",
+            "### gptoss H200 (ISL 1024, OSL 1024)",
+            "### dsr1 GB200 (ISL 1024, OSL 1024)",
+        ]
+
+    def test_row_formatting(self):
+        output = render([make_single_node_result()])
+        row = [line for line in output.splitlines() if line.startswith("| gptoss")][0]
+        cells = [c.strip() for c in row.strip("|").split("|")]
+        assert cells[2] == "H200"
+        # TTFT is rendered in milliseconds
+        assert cells[11] == "150.0000"
+        assert cells[15] == "1500.0000"
+
+    def test_column_selection(self):
+        output = render([make_single_node_result()], ["conc", "tput_per_gpu"])
+        assert f"| Conc | {TPUT_PER_GPU} |" in output
+        assert "| 64 | 1500.0000 |" in output
+
+    def test_column_selection_without_applicable_columns(self, mixed_results):
+        with pytest.raises(ValueError, match="None of the selected columns apply to single-node results"):
+            render(mixed_results, ["decode_tp"])
+        # Selections only need to apply to the results present
+        assert "| 1 |" in render([make_multinode_result()], ["decode_num_workers"])
+
+    def test_only_single_node(self):
+        output = render([make_single_node_result()])
+        assert "## Multi-Node Results" not in output
+
+    def test_empty_results(self):
+        assert render([]) == ""
+
+    @pytest.mark.slow
+    def test_large_input_is_fast(self):
+        """Tens of thousands of rows should render well under a second."""
+        results = [
+            make_single_node_result(hw=f"hw{i % 7}", conc=2 ** (i % 9), tp=2 ** (i % 4),
+                                    isl=1024 * (1 + i % 3))
+            for i in range(50000)
+        ]
+        start = time.perf_counter()
+        output = render(results)
+        elapsed = time.perf_counter() - start
+
+        assert output.count("\n| gptoss") == 50000
+        assert elapsed < 1.0
+
+
+# =============================================================================
+# Test machine-readable export
+# =============================================================================
+
+class TestExport:
+    """Tests for exporting summarized rows alongside the markdown."""
+
+    def test_csv_and_jsonl(self, tmp_path, mixed_results):
+        out = io.StringIO()
+        summarize(mixed_results, out, None, tmp_path, ["csv", "jsonl"])
+
+        with open(tmp_path / "single_node.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == [c[1] for c in SINGLE_NODE_COLUMNS]
+        # Same order as the markdown tables
+        assert [row[0] for row in rows[1:]] == ["dsr1", "gptoss", "gptoss", "gptoss"]
+
+        with open(tmp_path / "multi_node.jsonl") as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 1
+        assert records[0][TTFT] == pytest.approx(500.0)
+        assert records[0][TPUT_PER_GPU] == 3000.0
+        assert records[0]["Hardware"] == "GB200"
+
+    def test_values_stay_numeric(self, tmp_path):
+        summarize([make_single_node_result()], io.StringIO(), None, tmp_path, ["jsonl"])
+        with open(tmp_path / "single_node.jsonl") as f:
+            record = json.loads(f.readline())
+        assert record["Conc"] == 64
+        assert record[TTFT] == pytest.approx(150.0)
+
+    def test_column_selection_applies(self, tmp_path):
+        summarize([make_single_node_result()], io.StringIO(), ["conc", "tput_per_gpu"], tmp_path, ["csv"])
+        with open(tmp_path / "single_node.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows == [["Conc", TPUT_PER_GPU], ["64", "1500.0"]]
+
+    def test_empty_split_not_written(self, tmp_path):
+        summarize([make_single_node_result()], io.StringIO(), None, tmp_path, ["csv"])
+        assert (tmp_path / "single_node.csv").exists()
+        assert not (tmp_path / "multi_node.csv").exists()
+
+    def test_parquet(self, tmp_path, mixed_results):
+        pq = pytest.importorskip("pyarrow.parquet")
+        summarize(mixed_results, io.StringIO(), None, tmp_path, ["parquet"])
+        table = pq.read_table(tmp_path / "single_node.parquet")
+        assert table.column_names == [c[1] for c in SINGLE_NODE_COLUMNS]
+        assert table.num_rows == 4
+
+
+# =============================================================================
+# Test delta mode
+# =============================================================================
+
+class TestComputeDeltas:
+    """Tests for compute_deltas function."""
+
+    def test_pairs_by_identity(self):
+        current = [make_single_node_result(conc=4, tput_per_gpu=110.0),
+                   make_single_node_result(conc=64, tput_per_gpu=1500.0)]
+        baseline = [make_single_node_result(conc=64, tput_per_gpu=1000.0),
+                    make_single_node_result(conc=4, tput_per_gpu=100.0)]
+
+        rows, added, removed, _ = compute_deltas(current, baseline, SINGLE_NODE_IDENTITY_FIELDS)
+        assert not added and not removed
+        assert [r["conc"] for r, _, _ in rows] == [64, 4]
+        assert rows[0][2]["tput_per_gpu"] == pytest.approx(50.0)
+        assert rows[1][2]["tput_per_gpu"] == pytest.approx(10.0)
+
+    def test_sorted_by_largest_absolute_change(self):
+        current = [make_single_node_result(conc=4, median_ttft=0.05),
+                   make_single_node_result(conc=8, tput_per_gpu=1575.0)]
+        baseline = [make_single_node_result(conc=4), make_single_node_result(conc=8)]
+
+        rows, _, _, _ = compute_deltas(current, baseline, SINGLE_NODE_IDENTITY_FIELDS)
+        # TTFT dropped by 66%, which outranks the 5% throughput gain
+        assert [r["conc"] for r, _, _ in rows] == [4, 8]
+
+    def test_added_and_removed(self):
+        current = [make_single_node_result(conc=4), make_single_node_result(conc=128)]
+        baseline = [make_single_node_result(conc=4), make_single_node_result(tp=4)]
+
+        rows, added, removed, _ = compute_deltas(current, baseline, SINGLE_NODE_IDENTITY_FIELDS)
+        assert len(rows) == 1
+        assert [r["conc"] for r in added] == [128]
+        assert [r["tp"] for r in removed] == [4]
+
+    def test_duplicate_baseline_results_are_averaged(self):
+        current = [make_single_node_result(tput_per_gpu=1200.0)]
+        baseline = [make_single_node_result(tput_per_gpu=900.0, median_ttft=0.1),
+                    make_single_node_result(tput_per_gpu=1100.0, median_ttft=0.3)]
+
+        rows, added, removed, duplicated = compute_deltas(current, baseline, SINGLE_NODE_IDENTITY_FIELDS)
+        assert not added and not removed
+        assert len(duplicated) == 1
+        assert rows[0][1]["tput_per_gpu"] == pytest.approx(1000.0)
+        assert rows[0][2]["tput_per_gpu"] == pytest.approx(20.0)
+        assert rows[0][1]["median_ttft"] == pytest.approx(0.2)
+
+        out = io.StringIO()
+        summarize_deltas(current, baseline, out)
+        assert "1 baseline configuration(s) have several results; deltas are against their mean." in out.getvalue()
+
+    def test_zero_baseline(self):
+        current = [make_single_node_result()]
+        baseline = [make_single_node_result(tput_per_gpu=0.0)]
+
+        rows, _, _, _ = compute_deltas(current, baseline, SINGLE_NODE_IDENTITY_FIELDS)
+        assert rows[0][2]["tput_per_gpu"] is None
+
+
+class TestSummarizeDeltas:
+    """Tests for delta markdown rendering."""
+
+    def test_render(self):
+        current = [make_single_node_result(tput_per_gpu=1650.0), make_multinode_result()]
+        baseline = [make_single_node_result(), make_multinode_result(tput_per_gpu=4000.0)]
+        out = io.StringIO()
+        summarize_deltas(current, baseline, out)
+        output = out.getvalue()
+
+        assert "## Single-Node Changes vs Baseline" in output
+        assert "## Multi-Node Changes vs Baseline" in output
+        assert "1650.0000 (+10.00%)" in output
+        assert "3000.0000 (-25.00%)" in output
+        assert "150.0000 (+0.00%)" in output
+
+
+class TestCli:
+    """Tests for running summarize.py as a script."""
+
+    def test_script_with_filters(self, tmp_path, mixed_results):
+        agg = tmp_path / "agg_bmk.json"
+        agg.write_text(json.dumps(mixed_results))
+
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), str(agg), "--hw", "h200", "--columns", "hw", "conc"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "| H200 | 4 |" in result.stdout
+        assert "B200" not in result.stdout
+        assert "## Multi-Node Results" not in result.stdout
+
+    def test_script_with_baseline(self, tmp_path):
+        current_dir = tmp_path / "results"
+        current_dir.mkdir()
+        (current_dir / "agg_a.json").write_text(json.dumps(make_single_node_result(tput_per_gpu=1800.0)))
+        baseline = tmp_path / "agg_baseline.json"
+        baseline.write_text(json.dumps([make_single_node_result()]))
+
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), str(current_dir), "--baseline", str(baseline)],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "1800.0000 (+20.00%)" in result.stdout
+
+    def test_script_rejects_columns_with_baseline(self, tmp_path):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), str(tmp_path), "--baseline", str(tmp_path), "--columns", "conc"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode != 0
+        assert "--columns cannot be combined with --baseline." in result.stderr
+
+    def test_script_parquet_without_pyarrow(self, tmp_path, mixed_results):
+        # A pyarrow package that fails to import stands in for a missing one
+        (tmp_path / "pyarrow").mkdir()
+        (tmp_path / "pyarrow" / "__init__.py").write_text("raise ImportError('No module named pyarrow')\n")
+        agg = tmp_path / "agg_bmk.json"
+        agg.write_text(json.dumps(mixed_results))
+        export_dir = tmp_path / "export"
+
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), str(agg), "--export-dir", str(export_dir),
+             "--export-format", "csv", "parquet"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": str(tmp_path)},
+        )
+        assert result.returncode != 0
+        assert "--export-format parquet requires pyarrow" in result.stderr
+        assert result.stdout == ""
+        assert not export_dir.exists()
+
+    def test_script_unknown_column(self, tmp_path):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), str(tmp_path), "--columns", "bogus"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode != 0
+        assert "Unknown column(s): bogus" in result.stderr